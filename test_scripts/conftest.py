@@ -4,33 +4,45 @@ pytest configuration and fixtures for HIL testing
 """
 
 import pytest
+import asyncio
+import inspect
 import logging
 import json
+import re
 from datetime import datetime
 from pathlib import Path
 
+from utilities import can_codec
+from utilities.async_hil import AsyncHILInterface
+from utilities.can_backend import BusPool
+from utilities.can_trace import CANTraceRecorder
+from utilities.clock import create_clock
+from utilities.data_logger import DataLogger
+from utilities.hil_interface import HILInterface
+from utilities.logging_pipeline import start_logging, stop_logging
+from utilities.results_db import ResultsDatabase
+from utilities.shard_merge import merge_directory, merge_trace_shards, shard_path, worker_id
+from utilities.signal_generator import SignalGenerator
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('reports/test_execution.log'),
-        logging.StreamHandler()
-    ]
-)
 
 logger = logging.getLogger(__name__)
 
+# Test case ID leading each test docstring ('TC-HEAT-008: ...')
+_TEST_CASE_ID = re.compile(r'\s*(TC-[A-Z]+-\d+)')
+
 
 class TestConfig:
     """Global test configuration"""
     
     # CAN Configuration
-    CAN_INTERFACE = 'virtual'
-    CAN_CHANNEL = 0
+    CAN_INTERFACE = 'virtual'  # python-can interface ('virtual', 'socketcan') or 'simulated'
+    CAN_CHANNEL = 0  # e.g. 'vcan0' for socketcan
     CAN_BITRATE = 500000
     CAN_TIMEOUT = 1.0  # seconds
+    RX_BUFFER_SIZE = 256  # frames kept per arbitration ID
+    CAN_TRACE_FILE = None  # binary trace of all tester traffic, e.g. 'reports/can_trace.bin'
+    CAN_REPLAY_FILE = None  # trace played back when CAN_INTERFACE = 'replay'
+    CAN_REPLAY_PACING = 'original'  # 'original' recorded timing or 'fast' (virtual clock)
     
     # Message IDs
     MSG_SEAT_CTRL_CMD = 0x100
@@ -43,6 +55,7 @@ class TestConfig:
     HEAT_MAX_TEMP = 65.0
     HEAT_SAFE_TEMP = 68.0
     HEAT_TEMP_TOLERANCE = 2.0
+    HEAT_AMBIENT_TEMP = 20.0
     
     # Massage Parameters
     MASSAGE_MIN_PRESSURE = 0.5
@@ -54,6 +67,7 @@ class TestConfig:
     CAN_CYCLE_TOLERANCE = 0.01  # ±10ms
     CAN_TIMEOUT_LOSS = 0.5  # 500ms
     PUMP_START_TIME = 0.5  # 500ms
+    PLANT_STEP_TIME = 0.001  # 1ms fixed solver step for simulated plants
     
     # Test Timeouts
     TEST_TIMEOUT = 30  # seconds per test
@@ -66,18 +80,137 @@ class TestConfig:
     
     # Log capacity
     MAX_FAULT_EVENTS = 100
+    
+    # Execution mode ('virtual' advances simulated time instantly, 'wall' uses real time)
+    CLOCK_MODE = 'virtual'
+    
+    # Execution log (rotated and gzip-compressed when it reaches LOG_MAX_BYTES)
+    LOG_FILE = 'reports/test_execution.log'
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUP_COUNT = 5
+    
+    # DataLogger CSV rows buffered per write, and whether each logger also streams its
+    # results and measurements to a .jsonl file next to the CSV (always done by parallel
+    # workers, as the combined report is built from those streams)
+    LOG_FLUSH_COUNT = 50
+    REPORT_JSONL = False
+    
+    # Historical results database (SQLite), e.g. 'reports/results.db'; None disables it
+    RESULTS_DB = None
+    
+    # Seed of the randomized signals (noise, jitter, CAN timing); None picks a fresh one per run
+    RANDOM_SEED = None
 
 
 @pytest.fixture(scope='session')
-def config():
+def config(request):
     """Provide test configuration to all tests"""
-    return TestConfig()
+    test_config = TestConfig()
+    replay_file = request.config.getoption('--can-replay')
+    if replay_file:
+        test_config.CAN_INTERFACE = 'replay'
+        test_config.CAN_REPLAY_FILE = replay_file
+        test_config.CAN_REPLAY_PACING = request.config.getoption('--replay-pacing')
+    return test_config
+
+
+@pytest.fixture(scope='session')
+def test_session_id(request):
+    """Unique session ID for the test run, shared by all parallel workers"""
+    return request.config._session_id
+
+
+@pytest.fixture(scope='session')
+def clock(request, config):
+    """Provide the time source shared by the HIL interface and the tests
+    
+    A fast replay always runs on the virtual clock.
+    """
+    mode = request.config.getoption('--clock') or config.CLOCK_MODE
+    if config.CAN_INTERFACE == 'replay' and config.CAN_REPLAY_PACING == 'fast':
+        mode = 'virtual'
+    return create_clock(mode)
+
+
+@pytest.fixture(scope='session')
+def bus_pool():
+    """Keep CAN bus handles open across the whole session"""
+    pool = BusPool()
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture(scope='session')
+def hil_session(request, config, clock, bus_pool):
+    """HIL interface connected once per session, tracing its traffic if requested"""
+    hil = HILInterface(config, clock=clock, bus_pool=bus_pool)
+    trace_file = request.config.getoption('--can-trace') or config.CAN_TRACE_FILE
+    if trace_file:
+        hil.attach_trace(CANTraceRecorder(shard_path(trace_file)))
+    yield hil
+    recorder = hil.detach_trace()
+    if recorder is not None:
+        recorder.close()
+    hil.close()
+
+
+@pytest.fixture(scope='function')
+def hil(request, hil_session):
+    """Pooled HIL interface reset to power-on state for each test"""
+    hil_session.reset(request.node.nodeid)
+    return hil_session
+
+
+@pytest.fixture(scope='function')
+def async_hil(hil):
+    """asyncio front end over the pooled HIL interface"""
+    return AsyncHILInterface(hil)
+
+
+@pytest.fixture(scope='session')
+def results_db(request, config):
+    """Historical results database, or None when not enabled"""
+    db_file = request.config.getoption('--results-db') or config.RESULTS_DB
+    if not db_file:
+        yield None
+        return
+    db = ResultsDatabase(db_file)
+    yield db
+    db.close()
 
 
 @pytest.fixture(scope='session')
-def test_session_id():
-    """Generate unique session ID for test run"""
-    return datetime.now().strftime('%Y%m%d_%H%M%S')
+def data_logger_pool(results_db):
+    """Session pool of DataLoggers keyed by log file, closed at session end"""
+    pool = {}
+    yield pool
+    for data_logger in pool.values():
+        data_logger.close()
+
+
+@pytest.fixture(scope='function')
+def data_loggers(request, config, data_logger_pool, results_db, test_session_id):
+    """Return a factory handing out pooled DataLoggers reset for this test"""
+    test_class = request.cls.__name__ if request.cls else None
+    markers = [marker.name for marker in request.node.iter_markers()]
+    stream_jsonl = (request.config.getoption('--report-jsonl') or config.REPORT_JSONL
+                    or worker_id() is not None)
+    
+    def get(log_file: str) -> DataLogger:
+        data_logger = data_logger_pool.get(log_file)
+        if data_logger is None:
+            # Parallel workers write private shards that are merged at session end
+            jsonl_file = shard_path(Path(log_file).with_suffix('.jsonl')) if stream_jsonl else None
+            data_logger = data_logger_pool[log_file] = DataLogger(
+                shard_path(log_file), flush_count=config.LOG_FLUSH_COUNT, jsonl_file=jsonl_file,
+                results_db=results_db, session_id=test_session_id
+            )
+        else:
+            data_logger.reset()
+        data_logger.set_context(test_class, markers)
+        request.node._data_logger = data_logger
+        return data_logger
+    return get
 
 
 @pytest.fixture(scope='function')
@@ -88,10 +221,11 @@ def test_logger(test_session_id):
 
 
 @pytest.fixture
-def test_report(test_session_id):
+def test_report(request, test_session_id):
     """Create test report data structure"""
     return {
         'session_id': test_session_id,
+        'random_seed': request.config._random_seed,
         'timestamp': datetime.now().isoformat(),
         'test_results': [],
         'statistics': {
@@ -104,8 +238,56 @@ def test_report(test_session_id):
     }
 
 
+def pytest_addoption(parser):
+    """Register command line options"""
+    parser.addoption(
+        '--clock', action='store', default=None, choices=['virtual', 'wall'],
+        help="Time source for HIL tests (default: TestConfig.CLOCK_MODE)"
+    )
+    parser.addoption(
+        '--can-trace', action='store', default=None, metavar='PATH',
+        help="Record every CAN frame to a binary trace file (default: TestConfig.CAN_TRACE_FILE)"
+    )
+    parser.addoption(
+        '--can-replay', action='store', default=None, metavar='PATH',
+        help="Replay SCM frames from a recorded CAN trace instead of using the bus"
+    )
+    parser.addoption(
+        '--replay-pacing', action='store', default=TestConfig.CAN_REPLAY_PACING,
+        choices=['original', 'fast'],
+        help="Deliver replayed frames at their recorded timing or as fast as possible (virtual clock)"
+    )
+    parser.addoption(
+        '--seed', action='store', type=int, default=None,
+        help="Seed for randomized signals, to repeat a run (default: TestConfig.RANDOM_SEED)"
+    )
+    parser.addoption(
+        '--report-jsonl', action='store_true', default=False,
+        help="Stream results and measurements to a .jsonl file next to each test log "
+             "(default: TestConfig.REPORT_JSONL; always on for parallel workers)"
+    )
+    parser.addoption(
+        '--results-db', action='store', default=None, metavar='PATH',
+        help="Persist test results to a SQLite database (default: TestConfig.RESULTS_DB)"
+    )
+
+
 def pytest_configure(config):
-    """Configure pytest with custom markers"""
+    """Configure pytest with custom markers and start the queued logging pipeline"""
+    if hasattr(config, 'workerinput'):
+        config._session_id = config.workerinput['session_id']
+        config._random_seed = config.workerinput['random_seed']
+    else:
+        config._session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        seed = config.getoption('--seed')
+        config._random_seed = SignalGenerator(TestConfig.RANDOM_SEED if seed is None else seed).seed
+    config._log_listener = start_logging(
+        shard_path(TestConfig.LOG_FILE),
+        max_bytes=TestConfig.LOG_MAX_BYTES,
+        backup_count=TestConfig.LOG_BACKUP_COUNT
+    )
+    logger.info("Session %s, random seed %s", config._session_id, config._random_seed)
+    
     config.addinivalue_line("markers", "heating: mark test as heating subsystem test")
     config.addinivalue_line("markers", "massage: mark test as massage subsystem test")
     config.addinivalue_line("markers", "integration: mark test as integration test")
@@ -116,6 +298,72 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "hil: mark test requiring HIL interface")
 
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Hand the controller's session ID and random seed to each xdist worker"""
+    node.workerinput['session_id'] = node.config._session_id
+    node.workerinput['random_seed'] = node.config._random_seed
+
+
+def pytest_report_header(config):
+    """Show the random seed so a run can be repeated with --seed"""
+    return f"random seed: {config._random_seed}"
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Log failed tests to their DataLogger, which only sees results the test logs itself"""
+    outcome = yield
+    report = outcome.get_result()
+    data_logger = getattr(item, '_data_logger', None)
+    if report.when != 'call' or not report.failed or data_logger is None:
+        return
+    match = _TEST_CASE_ID.match(getattr(item.obj, '__doc__', None) or '')
+    test_id = match.group(1) if match else item.name
+    message = call.excinfo.exconly().splitlines()[0] if call.excinfo else 'Test failed'
+    data_logger.log_error(test_id, message, str(report.longrepr))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """Run async def tests to completion in a fresh event loop"""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    funcargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**funcargs))
+    return True
+
+
+def pytest_unconfigure(config):
+    """Flush and stop the logging pipeline"""
+    _stop_log_listener(config)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session, exitstatus):
+    """Merge per-worker shards into the combined logs, reports and CAN trace after a parallel run
+    
+    Runs after session teardown. The controller's logging pipeline is
+    stopped first so the execution log is closed while the worker logs are
+    appended to it.
+    """
+    if hasattr(session.config, 'workerinput'):
+        return  # xdist worker; the controller merges once every worker is done
+    _stop_log_listener(session.config)
+    merge_directory('reports')
+    trace_file = session.config.getoption('--can-trace') or TestConfig.CAN_TRACE_FILE
+    if trace_file:
+        merge_trace_shards(trace_file)
+
+
+def _stop_log_listener(config):
+    """Stop the logging pipeline started in pytest_configure, once"""
+    listener = getattr(config, '_log_listener', None)
+    if listener is not None:
+        config._log_listener = None
+        stop_logging(listener)
+
+
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to add markers"""
     for item in items:
@@ -134,28 +382,38 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(pytest.mark.stress)
 
 
+@pytest.fixture(scope='function')
+def signal_generator(request):
+    """SignalGenerator with this test's own random streams derived from the session seed
+    
+    Keyed by node ID, so a test draws the same values whatever worker or
+    order it runs in. Pass signal_generator.rng('noise') etc. as rng.
+    """
+    return SignalGenerator(request.config._random_seed, request.node.nodeid)
+
+
 @pytest.fixture(autouse=True)
 def test_execution_tracker(test_logger, request):
     """Track test execution timing and results"""
-    test_logger.info(f"Starting test: {request.node.name}")
+    test_logger.info("Starting test: %s", request.node.name)
     start_time = datetime.now()
     
     yield
     
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
-    test_logger.info(f"Completed test: {request.node.name} in {duration:.2f}s")
+    test_logger.info("Completed test: %s in %.2fs", request.node.name, duration)
 
 
 class HILMockData:
     """Mock data for HIL interface testing"""
     
     @staticmethod
-    def get_can_message(msg_id, data_dict):
-        """Create CAN message from ID and data dictionary"""
+    def get_can_message(msg_id, data):
+        """Create CAN message from ID and payload bytes"""
         return {
             'arbitration_id': msg_id,
-            'data': data_dict,
+            'data': data,
             'is_extended_id': False,
             'timestamp': datetime.now().timestamp()
         }
@@ -163,33 +421,28 @@ class HILMockData:
     @staticmethod
     def heat_status_message(temp_c, duty_cycle, flags=0):
         """Generate SEAT_HEAT_STATUS message"""
-        temp_byte = int((temp_c / 100.0) * 255)
-        duty_byte = int((duty_cycle / 100.0) * 255)
         return HILMockData.get_can_message(
             TestConfig.MSG_SEAT_HEAT_STATUS,
-            {'temp': temp_byte, 'duty': duty_byte, 'flags': flags}
+            can_codec.encode_heat_status(temp_c, duty_cycle, flags=flags)
         )
     
     @staticmethod
     def massage_status_message(pressure_kpa, duty_cycle, flags=0):
         """Generate SEAT_MASSAGE_STATUS message"""
-        pressure_byte = int((pressure_kpa / 200.0) * 255)
-        duty_byte = int((duty_cycle / 100.0) * 255)
         return HILMockData.get_can_message(
             TestConfig.MSG_SEAT_MASSAGE_STATUS,
-            {'pressure': pressure_byte, 'duty': duty_byte, 'flags': flags}
+            can_codec.encode_massage_status(pressure_kpa, duty_cycle, flags=flags)
         )
     
     @staticmethod
     def control_command(heat_enable, heat_intensity, massage_enable, 
                        massage_intensity, massage_pattern):
         """Generate SEAT_CTRL_CMD message"""
-        byte0 = (heat_enable & 0x01) | ((heat_intensity & 0x03) << 1)
-        byte1 = (massage_enable & 0x01) | ((massage_intensity & 0x07) << 1) | \
-                ((massage_pattern & 0x07) << 4)
         return HILMockData.get_can_message(
             TestConfig.MSG_SEAT_CTRL_CMD,
-            {'heat_ctrl': byte0, 'massage_ctrl': byte1}
+            can_codec.encode_control_command(
+                heat_enable, heat_intensity, massage_enable, massage_intensity, massage_pattern
+            )
         )
 
 
@@ -0,0 +1,87 @@
+"""
+Async HIL Interface Tests
+asyncio front end on the virtual and wall clocks
+"""
+
+import asyncio
+
+import pytest
+
+from utilities import can_codec
+from utilities.async_hil import AsyncHILInterface
+from utilities.clock import WallClock
+from utilities.hil_interface import HILInterface
+
+
+async def collect(frames, count):
+    """First count items of an async frame iterator"""
+    collected = []
+    async for frame in frames:
+        collected.append(frame)
+        if len(collected) == count:
+            break
+    return collected
+
+
+@pytest.fixture
+def wall_async_hil(config):
+    """Async front end over an in-process simulated SCM on the wall clock"""
+    wall_config = type(config)()
+    wall_config.CAN_INTERFACE = 'simulated'
+    hil = HILInterface(wall_config, clock=WallClock())
+    yield AsyncHILInterface(hil)
+    hil.close()
+
+
+class TestAsyncHIL:
+    """Commands, reads and frame streams through the asyncio API"""
+    
+    def test_message_ids_shared_with_codec(self):
+        """Status streams use the codec's message IDs"""
+        assert AsyncHILInterface.MSG_HEAT_STATUS == can_codec.MSG_SEAT_HEAT_STATUS
+        assert AsyncHILInterface.MSG_MASSAGE_STATUS == can_codec.MSG_SEAT_MASSAGE_STATUS
+    
+    async def test_command_and_read(self, async_hil, clock):
+        """Awaited reads see the state set by an awaited command"""
+        await async_hil.send_control_command(heat_enable=True, heat_intensity=2)
+        start = clock.monotonic()
+        await async_hil.sleep(0.5)
+        assert clock.monotonic() - start == pytest.approx(0.5)
+        status = await async_hil.read_heat_status()
+        assert status['heating_active']
+        assert (await async_hil.read_massage_status())['pump_active'] is False
+    
+    async def test_wait_for_message_timeout(self, async_hil):
+        """A message that never arrives raises asyncio.TimeoutError"""
+        message = await async_hil.wait_for_message(can_codec.MSG_SEAT_HEAT_STATUS, timeout=0.5)
+        assert message['arbitration_id'] == can_codec.MSG_SEAT_HEAT_STATUS
+        with pytest.raises(asyncio.TimeoutError):
+            await async_hil.wait_for_message(0x7E8, timeout=0.5)
+    
+    async def test_concurrent_streams_miss_no_frames(self, async_hil):
+        """Two streams awaited together each see every cycle of their own ID"""
+        heat, massage = await asyncio.gather(
+            collect(async_hil.heat_status_frames(), 20),
+            collect(async_hil.massage_status_frames(), 20)
+        )
+        for frames, msg_id in ((heat, can_codec.MSG_SEAT_HEAT_STATUS),
+                               (massage, can_codec.MSG_SEAT_MASSAGE_STATUS)):
+            assert {frame['arbitration_id'] for frame in frames} == {msg_id}
+            intervals = [b['timestamp'] - a['timestamp'] for a, b in zip(frames, frames[1:])]
+            assert intervals == pytest.approx([0.1] * 19, abs=1e-6)
+        assert 'temperature_c' in heat[0]['data'] and 'pressure_kpa' in massage[0]['data']
+    
+    async def test_stream_timeout(self, async_hil):
+        """A stream with no frames raises asyncio.TimeoutError"""
+        with pytest.raises(asyncio.TimeoutError):
+            await collect(async_hil.frames(0x7E8, timeout=0.3), 1)
+    
+    async def test_wall_clock_streams(self, wall_async_hil):
+        """On the wall clock blocking waits run in the executor, so streams interleave"""
+        await wall_async_hil.send_control_command(heat_enable=True, massage_enable=True)
+        heat, massage = await asyncio.wait_for(asyncio.gather(
+            collect(wall_async_hil.heat_status_frames(), 3),
+            collect(wall_async_hil.massage_status_frames(), 3)
+        ), timeout=5.0)
+        assert len(heat) == len(massage) == 3
+        assert heat[-1]['data']['heating_active'] and massage[-1]['data']['pump_active']
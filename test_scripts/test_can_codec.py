@@ -0,0 +1,168 @@
+"""
+CAN Codec Tests
+Round-trip of the SCM frame codec against the signal layout in the DBC
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utilities import can_codec
+
+
+DBC_FILE = Path(__file__).resolve().parent.parent / 'hil_config' / 'bus_definitions.dbc'
+
+
+def load_dbc_layout():
+    """Return {message ID: {signal name: (start bit, length)}} from the DBC"""
+    layout = {}
+    signals = None
+    for line in DBC_FILE.read_text().splitlines():
+        if line.startswith('ID='):
+            signals = layout[int(line[3:].rstrip('h'), 16)] = {}
+        match = re.match(r'SG=(\w+) (\d+) (\d+)', line)
+        if match and signals is not None:
+            signals[match.group(1)] = (int(match.group(2)), int(match.group(3)))
+    return layout
+
+
+def raw_signal(data: bytes, start_bit: int, length: int) -> int:
+    """Extract a little-endian (Intel) signal from a payload"""
+    return (int.from_bytes(data, 'little') >> start_bit) & ((1 << length) - 1)
+
+
+@pytest.fixture(scope='module')
+def dbc():
+    """Signal layout of the SCM messages from the DBC"""
+    return load_dbc_layout()
+
+
+class TestCodecLayout:
+    """Encoded payloads put every signal where the DBC defines it"""
+    
+    def test_control_command_matches_dbc(self, dbc):
+        """SEAT_CTRL_CMD fields sit at the DBC bit positions"""
+        signals = dbc[can_codec.MSG_SEAT_CTRL_CMD]
+        data = can_codec.encode_control_command(
+            heat_enable=True, heat_intensity=2, massage_enable=True,
+            massage_intensity=5, massage_pattern=2
+        )
+        assert len(data) == can_codec.DLC
+        assert raw_signal(data, *signals['HeatEnable']) == 1
+        assert raw_signal(data, *signals['HeatIntensity']) == 2
+        assert raw_signal(data, *signals['MassageEnable']) == 1
+        assert raw_signal(data, *signals['MassageIntensity']) == 5
+        assert raw_signal(data, *signals['MassagePattern']) == 2
+    
+    def test_heat_status_matches_dbc(self, dbc):
+        """SEAT_HEAT_STATUS raw values scale to the DBC physical range"""
+        signals = dbc[can_codec.MSG_SEAT_HEAT_STATUS]
+        data = can_codec.encode_heat_status(50.0, 100.0, heating_active=True, heater_fault=True)
+        assert raw_signal(data, *signals['Temperature']) == round(50.0 * 255 / 100)
+        assert raw_signal(data, *signals['HeaterDutyCycle']) == 255
+        assert raw_signal(data, *signals['HeatingActive']) == 1
+        assert raw_signal(data, *signals['TemperatureWarning']) == 0
+        assert raw_signal(data, *signals['HeaterFault']) == 1
+    
+    def test_massage_status_matches_dbc(self, dbc):
+        """SEAT_MASSAGE_STATUS raw values scale to the DBC physical range"""
+        signals = dbc[can_codec.MSG_SEAT_MASSAGE_STATUS]
+        data = can_codec.encode_massage_status(150.0, 40.0, pump_active=True, pressure_warning=True)
+        assert raw_signal(data, *signals['Pressure']) == round(150.0 * 255 / 200)
+        assert raw_signal(data, *signals['PumpDutyCycle']) == round(40.0 * 255 / 100)
+        assert raw_signal(data, *signals['PumpActive']) == 1
+        assert raw_signal(data, *signals['PressureWarning']) == 1
+        assert raw_signal(data, *signals['PumpFault']) == 0
+
+
+class TestCodecRoundTrip:
+    """decode(encode(x)) returns x within one raw quantization step"""
+    
+    def test_control_command_round_trip(self):
+        """Every control command combination survives encode and decode"""
+        for heat_intensity in range(4):
+            for massage_intensity in range(6):
+                for pattern in range(3):
+                    signals = {
+                        'heat_enable': heat_intensity > 0,
+                        'heat_intensity': heat_intensity,
+                        'massage_enable': massage_intensity > 0,
+                        'massage_intensity': massage_intensity,
+                        'massage_pattern': pattern
+                    }
+                    data = can_codec.encode(can_codec.MSG_SEAT_CTRL_CMD, signals)
+                    assert can_codec.decode(can_codec.MSG_SEAT_CTRL_CMD, data) == signals
+    
+    def test_status_round_trip_within_quantization(self):
+        """Status values decode to within half a raw step and clamp to the signal range"""
+        for temperature in (0.0, 21.3, 65.0, 100.0):
+            decoded = can_codec.decode_heat_status(can_codec.encode_heat_status(temperature, 33.3))
+            assert abs(decoded['temperature_c'] - temperature) <= 100.0 / 255 / 2
+            assert abs(decoded['duty_cycle'] - 33.3) <= 100.0 / 255 / 2
+        decoded = can_codec.decode_massage_status(can_codec.encode_massage_status(250.0, -5.0))
+        assert decoded['pressure_kpa'] == 200.0
+        assert decoded['duty_cycle'] == 0.0
+    
+    def test_status_bits_round_trip(self):
+        """Active/warning/fault bits decode as their own signals, not as flags"""
+        cases = (
+            (can_codec.MSG_SEAT_HEAT_STATUS, {'temperature_c': 50.0},
+             ('heating_active', 'temp_warning', 'heater_fault')),
+            (can_codec.MSG_SEAT_MASSAGE_STATUS, {'pressure_kpa': 50.0},
+             ('pump_active', 'pressure_warning', 'pump_fault'))
+        )
+        for msg_id, value, names in cases:
+            for bits in range(8):
+                for flags in (0, 0x08, 0xA0):
+                    signals = {name: bool(bits & (1 << i)) for i, name in enumerate(names)}
+                    signals.update(value, duty_cycle=50.0, flags=flags)
+                    data = can_codec.encode(msg_id, signals)
+                    assert data[2] == bits | flags
+                    decoded = can_codec.decode(msg_id, data)
+                    assert all(decoded[name] == signals[name] for name in names)
+                    assert decoded['flags'] == flags
+                    assert can_codec.decode_batch(msg_id, data)['flags'][0] == flags
+    
+    def test_unknown_message_rejected(self):
+        """Encoding or decoding an ID without a codec raises KeyError"""
+        with pytest.raises(KeyError):
+            can_codec.decode(0x7E8, bytes(8))
+        with pytest.raises(KeyError):
+            can_codec.decode_batch(0x7E8, bytes(8))
+
+
+class TestBatchDecode:
+    """Vectorized decoding agrees with the per-frame decoders"""
+    
+    def test_decode_batch_matches_scalar_decode(self):
+        """decode_batch gives the same signals as decode for each payload"""
+        rng = np.random.default_rng(5)
+        payloads = rng.integers(0, 256, size=(200, can_codec.DLC), dtype=np.uint8)
+        for msg_id in (can_codec.MSG_SEAT_CTRL_CMD, can_codec.MSG_SEAT_HEAT_STATUS,
+                       can_codec.MSG_SEAT_MASSAGE_STATUS):
+            batch = can_codec.decode_batch(msg_id, payloads.tobytes())
+            assert len(batch) == len(payloads)
+            for row, payload in zip(batch, payloads):
+                for name, value in can_codec.decode(msg_id, payload.tobytes()).items():
+                    assert row[name] == pytest.approx(value), name
+    
+    def test_decode_capture_groups_by_id(self):
+        """decode_capture splits a capture per known ID, keeps timestamps and skips the rest"""
+        frames = []
+        for i in range(10):
+            frames.append({'arbitration_id': can_codec.MSG_SEAT_HEAT_STATUS, 'timestamp': i * 0.1,
+                           'data': can_codec.encode_heat_status(20.0 + i, 50.0)})
+            frames.append({'arbitration_id': can_codec.MSG_SEAT_MASSAGE_STATUS, 'timestamp': i * 0.1 + 0.05,
+                           'data': can_codec.encode_massage_status(10.0 * i, 25.0, pump_active=True)})
+        frames.append({'arbitration_id': 0x7E8, 'timestamp': 2.0, 'data': bytes(8)})
+        
+        capture = can_codec.decode_capture(frames)
+        assert set(capture) == {can_codec.MSG_SEAT_HEAT_STATUS, can_codec.MSG_SEAT_MASSAGE_STATUS}
+        heat = capture[can_codec.MSG_SEAT_HEAT_STATUS]
+        massage = capture[can_codec.MSG_SEAT_MASSAGE_STATUS]
+        np.testing.assert_allclose(heat['timestamp'], np.arange(10) * 0.1)
+        np.testing.assert_allclose(heat['temperature_c'], 20.0 + np.arange(10), atol=100.0 / 255)
+        np.testing.assert_allclose(massage['pressure_kpa'], 10.0 * np.arange(10), atol=200.0 / 255)
+        assert massage['pump_active'].all()
@@ -0,0 +1,184 @@
+"""
+CAN Receiver Tests
+Per-ID ring buffers, cursors and waking on arrival for both clock modes
+"""
+
+import queue
+import threading
+
+import pytest
+
+from utilities.can_receiver import CANReceiver
+from utilities.clock import VirtualClock, WallClock
+
+
+HEAT_ID = 0x200
+MASSAGE_ID = 0x300
+
+
+def frame(msg_id, value, timestamp=0.0):
+    """Status frame carrying one payload byte"""
+    return {'arbitration_id': msg_id, 'data': bytes([value]), 'timestamp': timestamp}
+
+
+class ScheduledBus:
+    """Virtual-clock bus that delivers frames at scheduled simulated times
+    
+    recv() advances the clock to the next frame when it is due within the
+    timeout, like the simulated SCM does.
+    """
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.pending = []
+    
+    def schedule(self, due, message):
+        self.pending.append((due, message))
+        self.pending.sort(key=lambda entry: entry[0])
+    
+    def recv(self, timeout=None):
+        now = self.clock.monotonic()
+        if self.pending and self.pending[0][0] <= now + (timeout or 0.0):
+            due, message = self.pending.pop(0)
+            self.clock.sleep(due - now)
+            return message
+        self.clock.sleep(timeout or 0.0)
+        return None
+
+
+class QueueBus:
+    """Wall-clock bus fed from the test thread"""
+    
+    def __init__(self):
+        self.frames = queue.Queue()
+    
+    def recv(self, timeout=None):
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+@pytest.fixture
+def virtual_receiver():
+    """Receiver on a virtual clock with a small ring buffer per ID"""
+    clock = VirtualClock(start_time=1000.0)
+    bus = ScheduledBus(clock)
+    return CANReceiver(bus, clock, [HEAT_ID, MASSAGE_ID], capacity=4), bus
+
+
+@pytest.fixture
+def wall_receiver():
+    """Started receiver on the wall clock"""
+    bus = QueueBus()
+    receiver = CANReceiver(bus, WallClock(), [HEAT_ID, MASSAGE_ID], poll_timeout=0.01)
+    receiver.start()
+    yield receiver, bus
+    receiver.stop()
+
+
+class TestRingBuffers:
+    """Frames are kept per arbitration ID in bounded buffers"""
+    
+    def test_per_id_buffers(self, virtual_receiver):
+        """Each ID keeps its newest frames, oldest first; unknown IDs are dropped"""
+        receiver, bus = virtual_receiver
+        for i in range(6):
+            bus.schedule(0.0, frame(HEAT_ID, i))
+        bus.schedule(0.0, frame(MASSAGE_ID, 42))
+        bus.schedule(0.0, frame(0x7FF, 1))
+        assert [f['data'][0] for f in receiver.get_messages(HEAT_ID)] == [2, 3, 4, 5]
+        assert receiver.latest(HEAT_ID)['data'] == bytes([5])
+        assert receiver.latest(MASSAGE_ID)['data'] == bytes([42])
+        assert receiver.sequence(HEAT_ID) == 6 and receiver.sequence(MASSAGE_ID) == 1
+    
+    def test_clear_discards_late_frames(self, virtual_receiver):
+        """clear(before) drops buffered frames and later arrivals stamped before it"""
+        receiver, bus = virtual_receiver
+        bus.schedule(0.0, frame(HEAT_ID, 1, timestamp=10.0))
+        receiver.clear(before=20.0)
+        assert receiver.get_messages(HEAT_ID) == []
+        bus.schedule(0.0, frame(HEAT_ID, 2, timestamp=19.0))
+        bus.schedule(0.0, frame(HEAT_ID, 3, timestamp=21.0))
+        assert [f['data'][0] for f in receiver.get_messages(HEAT_ID)] == [3]
+
+
+class TestCursors:
+    """wait_for_sequence walks a stream without missing frames"""
+    
+    def test_walk_stream(self, virtual_receiver):
+        """Each call returns the next frame after the cursor and advances it"""
+        receiver, bus = virtual_receiver
+        cursor = receiver.sequence(HEAT_ID)
+        for i in range(3):
+            bus.schedule(0.1 * (i + 1), frame(HEAT_ID, i))
+        values = []
+        for _ in range(3):
+            message, cursor = receiver.wait_for_sequence(HEAT_ID, cursor, timeout=1.0)
+            values.append(message['data'][0])
+        assert values == [0, 1, 2] and cursor == 3
+        assert receiver.wait_for_sequence(HEAT_ID, cursor, timeout=0.5) == (None, 3)
+    
+    def test_overwritten_frames_skip_to_oldest(self, virtual_receiver):
+        """A cursor behind the ring buffer resumes at the oldest frame still held"""
+        receiver, bus = virtual_receiver
+        for i in range(10):
+            bus.schedule(0.0, frame(HEAT_ID, i))
+        message, cursor = receiver.wait_for_sequence(HEAT_ID, 0, timeout=0.0)
+        assert message['data'][0] == 6 and cursor == 7
+    
+    def test_wait_for_message_returns_next_frame(self, virtual_receiver):
+        """wait_for_message ignores frames that were already buffered"""
+        receiver, bus = virtual_receiver
+        bus.schedule(0.0, frame(HEAT_ID, 1))
+        receiver.latest(HEAT_ID)
+        bus.schedule(0.2, frame(HEAT_ID, 2))
+        assert receiver.wait_for_message(HEAT_ID, timeout=1.0)['data'][0] == 2
+
+
+class TestVirtualClock:
+    """Without a thread, waiting pumps the bus and advances simulated time"""
+    
+    def test_wait_advances_clock_to_arrival(self, virtual_receiver):
+        """The clock moves to the frame's due time, not to the timeout"""
+        receiver, bus = virtual_receiver
+        bus.schedule(0.25, frame(MASSAGE_ID, 7))
+        bus.schedule(0.5, frame(HEAT_ID, 8))
+        assert receiver.wait_for_message(HEAT_ID, timeout=1.0)['data'][0] == 8
+        assert receiver.clock.monotonic() == pytest.approx(0.5)
+        # The massage frame was pumped into its own buffer on the way
+        assert receiver.latest(MASSAGE_ID)['data'][0] == 7
+    
+    def test_timeout_advances_clock(self, virtual_receiver):
+        """A timed-out wait consumes exactly the timeout of simulated time"""
+        receiver, bus = virtual_receiver
+        bus.schedule(5.0, frame(HEAT_ID, 1))
+        assert receiver.wait_for_message(HEAT_ID, timeout=1.0) is None
+        assert receiver.clock.monotonic() == pytest.approx(1.0)
+        receiver.start()
+        assert receiver._thread is None
+
+
+class TestWallClock:
+    """The background thread fills the buffers and wakes waiters"""
+    
+    def test_wake_on_arrival(self, wall_receiver):
+        """A waiter returns as soon as its frame arrives, well before the timeout"""
+        receiver, bus = wall_receiver
+        timer = threading.Timer(0.05, bus.frames.put, args=(frame(HEAT_ID, 9),))
+        timer.start()
+        start = receiver.clock.monotonic()
+        message = receiver.wait_for_message(HEAT_ID, timeout=5.0)
+        timer.join()
+        assert message['data'][0] == 9
+        assert receiver.clock.monotonic() - start < 2.0
+    
+    def test_stop_ends_thread(self, wall_receiver):
+        """stop() joins the receive thread; start() brings it back"""
+        receiver, bus = wall_receiver
+        thread = receiver._thread
+        receiver.stop()
+        assert not thread.is_alive()
+        bus.frames.put(frame(HEAT_ID, 1))
+        receiver.start()
+        assert receiver.wait_for_sequence(HEAT_ID, 0, timeout=2.0)[0]['data'][0] == 1
@@ -0,0 +1,170 @@
+"""
+CAN Scheduler Tests
+Absolute deadline grid, pause/resume and jitter statistics of the cyclic transmitter
+"""
+
+import threading
+
+import pytest
+
+from utilities.can_scheduler import PeriodicTransmitter
+from utilities.clock import VirtualClock, WallClock
+
+
+PERIOD = 0.1
+COMMAND = {'arbitration_id': 0x100, 'data': bytes(8)}
+
+
+class RecordingBus:
+    """Bus that records every sent frame with the clock reading at send time"""
+    
+    def __init__(self, clock, block=None):
+        self.clock = clock
+        self.block = block
+        self.sent = []
+    
+    def send(self, message):
+        if self.block is not None:
+            self.block.wait()
+        self.sent.append((self.clock.monotonic(), message))
+
+
+@pytest.fixture
+def virtual_transmitter():
+    """Started transmitter on a virtual clock"""
+    clock = VirtualClock(start_time=1000.0)
+    bus = RecordingBus(clock)
+    transmitter = PeriodicTransmitter(bus, clock, PERIOD)
+    transmitter.set_message(COMMAND)
+    transmitter.start()
+    return transmitter, bus
+
+
+def sent_cycles(bus, clock_start=1000.0):
+    """Deadline index of every sent frame, from its timestamp"""
+    return [round((message['timestamp'] - clock_start) / PERIOD) for _, message in bus.sent]
+
+
+class TestDeadlineGrid:
+    """Frames are stamped on start + k * period whatever the pump pattern"""
+    
+    def test_irregular_pumping_stays_on_grid(self, virtual_transmitter):
+        """Pumping at odd times sends each passed deadline once, stamped exactly"""
+        transmitter, bus = virtual_transmitter
+        for step in (0.03, 0.25, 0.001, 0.37, 0.349):
+            transmitter.clock.advance(step)
+            transmitter.pump()
+        assert sent_cycles(bus) == list(range(1, 11))
+        for cycle, (_, message) in zip(range(1, 11), bus.sent):
+            assert message['timestamp'] == pytest.approx(1000.0 + cycle * PERIOD, abs=1e-9)
+        assert transmitter.sent_count == 10
+    
+    def test_message_update_takes_next_deadline(self, virtual_transmitter):
+        """set_message() changes the payload from the next deadline on"""
+        transmitter, bus = virtual_transmitter
+        transmitter.clock.advance(0.25)
+        transmitter.pump()
+        transmitter.set_message(dict(COMMAND, data=bytes([1] * 8)))
+        transmitter.clock.advance(0.1)
+        transmitter.pump()
+        assert [message['data'][0] for _, message in bus.sent] == [0, 0, 1]
+    
+    def test_stop_forgets_message(self, virtual_transmitter):
+        """After stop() nothing is sent and the counters start over"""
+        transmitter, bus = virtual_transmitter
+        transmitter.clock.advance(0.35)
+        transmitter.pump()
+        transmitter.stop()
+        transmitter.clock.advance(1.0)
+        transmitter.pump()
+        assert len(bus.sent) == 3
+        assert transmitter.sent_count == 0
+
+
+class TestPauseResume:
+    """Message loss injection keeps the original grid"""
+    
+    def test_resume_on_original_grid(self, virtual_transmitter):
+        """Deadlines passed while paused are not sent; resume picks the next grid point"""
+        transmitter, bus = virtual_transmitter
+        transmitter.clock.advance(0.35)
+        transmitter.pause()
+        transmitter.clock.advance(0.4)
+        transmitter.resume()
+        transmitter.clock.advance(0.25)
+        transmitter.pump()
+        assert sent_cycles(bus) == [1, 2, 3, 8, 9, 10]
+    
+    def test_pause_sends_due_frames_first(self, virtual_transmitter):
+        """Frames already due when pause() is called still go out"""
+        transmitter, bus = virtual_transmitter
+        transmitter.clock.advance(0.2)
+        transmitter.pause()
+        assert sent_cycles(bus) == [1, 2]
+
+
+class TestJitter:
+    """Lateness statistics"""
+    
+    def test_virtual_clock_has_no_samples(self, virtual_transmitter):
+        """Virtual-clock frames count as sent but add no lateness samples"""
+        transmitter, _ = virtual_transmitter
+        transmitter.clock.advance(1.0)
+        transmitter.pump()
+        jitter = transmitter.jitter()
+        assert jitter['samples'] == 0 and jitter['sent'] == 10
+        assert jitter['max'] == 0.0
+    
+    def test_statistics(self, virtual_transmitter):
+        """mean, std and max are computed over the recorded lateness samples"""
+        transmitter, _ = virtual_transmitter
+        for lateness in (0.001, 0.003, 0.002):
+            transmitter._record(lateness)
+        jitter = transmitter.jitter()
+        assert jitter['samples'] == 3 and jitter['sent'] == 3
+        assert jitter['mean'] == pytest.approx(0.002)
+        assert jitter['std'] == pytest.approx((2 / 3) ** 0.5 * 0.001)
+        assert jitter['max'] == 0.003
+    
+    def test_wall_clock_thread(self):
+        """The thread sends each frame at or after its deadline, stamped on the grid"""
+        clock = WallClock()
+        bus = RecordingBus(clock)
+        transmitter = PeriodicTransmitter(bus, clock, 0.02)
+        transmitter.set_message(COMMAND)
+        start = clock.monotonic()
+        transmitter.start()
+        clock.sleep(0.3)
+        transmitter.stop()
+        assert len(bus.sent) >= 5
+        for cycle, (sent_at, message) in enumerate(bus.sent, 1):
+            assert sent_at >= start + cycle * 0.02 - 1e-3
+        offsets = [(message['timestamp'] - bus.sent[0][1]['timestamp']) / 0.02 for _, message in bus.sent]
+        # Stamps are whole periods apart (to the precision of the epoch conversion)
+        assert offsets == pytest.approx([round(offset) for offset in offsets], abs=1e-3)
+        assert transmitter.jitter()['sent'] == 0  # cleared by stop()
+
+
+class TestThreadLifecycle:
+    """A send blocked in the bus never hangs stop() or start()"""
+    
+    def test_blocked_send(self):
+        """stop() and start() return while the old thread is stuck in send"""
+        clock = WallClock()
+        release = threading.Event()
+        bus = RecordingBus(clock, block=release)
+        transmitter = PeriodicTransmitter(bus, clock, 0.01)
+        transmitter.set_message(COMMAND)
+        transmitter.start()
+        clock.sleep(0.05)
+        old_thread = transmitter._thread
+        transmitter.stop()
+        transmitter.set_message(COMMAND)
+        transmitter.start()
+        assert transmitter._thread is not old_thread
+        release.set()
+        old_thread.join(timeout=1.0)
+        assert not old_thread.is_alive()
+        transmitter.stop()
+        # The frame the old thread was sending is not counted after stop()
+        assert transmitter.sent_count == 0
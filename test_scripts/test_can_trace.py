@@ -0,0 +1,166 @@
+"""
+CAN Trace Tests
+Binary trace write/read round-trip and bus tracing
+"""
+
+import numpy as np
+import pytest
+
+from utilities.can_replay import PACING_FAST, TraceReplayBus
+from utilities.can_trace import (DIRECTION_MARK, DIRECTION_RX, DIRECTION_TX, TRACE_DTYPE,
+                                 CANTraceRecorder, TracedBus, iter_trace, read_trace, segment_key)
+from utilities.clock import create_clock
+
+
+FRAMES = [
+    ({'arbitration_id': 0x100, 'data': bytes([1, 2, 0, 0, 0, 0, 0, 0]), 'timestamp': 1000.0}, DIRECTION_TX),
+    ({'arbitration_id': 0x200, 'data': bytes([51, 128, 1]), 'timestamp': 1000.05}, DIRECTION_RX),
+    ({'arbitration_id': 0x18DAF110, 'data': b'\x02\x3e', 'is_extended_id': True,
+      'timestamp': 1000.1}, DIRECTION_TX),
+    ({'arbitration_id': 0x7E8, 'data': b'', 'timestamp': 1000.123456789}, DIRECTION_RX),
+]
+
+
+class LoopbackBus:
+    """Bus that hands back every sent frame on recv()"""
+    
+    def __init__(self):
+        self.frames = []
+        self.channel_info = 'loopback'
+    
+    def send(self, message):
+        self.frames.append(message)
+    
+    def recv(self, timeout=None):
+        return self.frames.pop(0) if self.frames else None
+
+
+class TestTraceRoundTrip:
+    """Frames written by the recorder read back unchanged"""
+    
+    def test_write_read_round_trip(self, tmp_path):
+        """Every field survives, across several buffer flushes"""
+        trace_file = tmp_path / 'trace.bin'
+        with CANTraceRecorder(trace_file, buffer_frames=3) as recorder:
+            for frame, direction in FRAMES * 5:
+                recorder.record(frame, direction)
+        assert recorder.frames_written == len(FRAMES) * 5
+        assert trace_file.stat().st_size == 16 + TRACE_DTYPE.itemsize * len(FRAMES) * 5
+        
+        records = read_trace(trace_file)
+        assert records.dtype == TRACE_DTYPE
+        assert len(records) == len(FRAMES) * 5
+        
+        frames = list(iter_trace(trace_file))
+        for (original, direction), frame in zip(FRAMES * 5, frames):
+            assert frame['arbitration_id'] == original['arbitration_id']
+            assert frame['data'] == bytes(original['data'])
+            assert frame['is_extended_id'] == bool(original.get('is_extended_id'))
+            assert frame['timestamp'] == pytest.approx(original['timestamp'], abs=1e-9)
+            assert frame['direction'] == direction
+    
+    def test_direction_filter_and_marks(self, tmp_path):
+        """iter_trace filters by direction; marks are stored as their own records"""
+        trace_file = tmp_path / 'trace.bin'
+        with CANTraceRecorder(trace_file) as recorder:
+            for frame, direction in FRAMES:
+                recorder.record(frame, direction)
+            recorder.mark(1001.0)
+        
+        assert [f['arbitration_id'] for f in iter_trace(trace_file, DIRECTION_RX)] == [0x200, 0x7E8]
+        assert [f['arbitration_id'] for f in iter_trace(trace_file, DIRECTION_TX)] == [0x100, 0x18DAF110]
+        marks = read_trace(trace_file)
+        marks = marks[marks['direction'] == DIRECTION_MARK]
+        assert marks['timestamp_ns'].tolist() == [1001 * 10**9]
+    
+    def test_flush_makes_records_readable(self, tmp_path):
+        """Buffered records reach the file on flush() while recording continues"""
+        trace_file = tmp_path / 'trace.bin'
+        recorder = CANTraceRecorder(trace_file)
+        recorder.record(*FRAMES[0])
+        recorder.flush()
+        assert len(read_trace(trace_file)) == 1
+        recorder.close()
+        recorder.record(*FRAMES[1])  # ignored once closed
+        assert len(read_trace(trace_file)) == 1
+    
+    def test_rejects_foreign_file(self, tmp_path):
+        """A file without the trace header is refused"""
+        other = tmp_path / 'other.bin'
+        other.write_bytes(b'not a trace file at all')
+        with pytest.raises(ValueError):
+            read_trace(other)
+        other.write_bytes(b'SCMTRACE')
+        with pytest.raises(ValueError):
+            read_trace(other)
+
+
+class TestTracedBus:
+    """Tracing wrapper around a bus"""
+    
+    def test_traced_bus_records_both_directions(self, tmp_path):
+        """send() is recorded as TX, recv() as RX; other attributes pass through"""
+        trace_file = tmp_path / 'trace.bin'
+        with CANTraceRecorder(trace_file) as recorder:
+            bus = TracedBus(LoopbackBus(), recorder)
+            bus.send(FRAMES[0][0])
+            assert bus.recv(timeout=0.1)['arbitration_id'] == 0x100
+            assert bus.recv(timeout=0.1) is None
+            assert bus.channel_info == 'loopback'
+        
+        records = read_trace(trace_file)
+        assert records['direction'].tolist() == [DIRECTION_TX, DIRECTION_RX]
+        np.testing.assert_array_equal(records['data'][0], np.frombuffer(FRAMES[0][0]['data'], np.uint8))
+
+
+def record_two_tests(trace_file):
+    """Trace of two tests, each receiving status frames 0.1s apart with its own payload"""
+    with CANTraceRecorder(trace_file) as recorder:
+        for start, test_name, payload in ((1000.0, 'tests/test_a.py::test_one', 1),
+                                          (1010.0, 'tests/test_a.py::test_two', 2)):
+            recorder.mark(start, test_name)
+            for i in range(5):
+                recorder.record({'arbitration_id': 0x200, 'data': bytes([payload, i]),
+                                 'timestamp': start + 0.5 + i * 0.1}, DIRECTION_RX)
+
+
+class TestTraceReplay:
+    """Playback of a trace's per-test segments"""
+    
+    def test_segment_key_ignores_directory(self):
+        """Node IDs from different rootdirs map to the same key"""
+        assert segment_key('test_scripts/test_a.py::T::test') == segment_key('test_a.py::T::test')
+        assert segment_key('test_a.py::T::test') != segment_key('test_a.py::T::other')
+    
+    def test_segments_looked_up_by_test(self, tmp_path):
+        """Each test gets its own frames, at their recorded offsets, in any order"""
+        trace_file = tmp_path / 'trace.bin'
+        record_two_tests(trace_file)
+        clock = create_clock('virtual')
+        bus = TraceReplayBus(trace_file, clock, PACING_FAST)
+        assert len(bus) == 10
+        
+        for test_name, payload in (('test_a.py::test_two', 2), ('other/test_a.py::test_one', 1)):
+            bus.next_segment(test_name)
+            start = clock.monotonic()
+            # Frames are only released once due, so a non-blocking poll sees nothing yet
+            assert bus.recv(timeout=0.0) is None
+            frames = [bus.recv(timeout=1.0) for _ in range(5)]
+            assert [frame['data'] for frame in frames] == [bytes([payload, i]) for i in range(5)]
+            assert clock.monotonic() - start == pytest.approx(0.9)
+            assert bus.recv(timeout=1.0) is None  # segment exhausted
+    
+    def test_missing_segment_raises(self, tmp_path):
+        """Replaying a test that was not recorded fails clearly"""
+        trace_file = tmp_path / 'trace.bin'
+        record_two_tests(trace_file)
+        bus = TraceReplayBus(trace_file, create_clock('virtual'))
+        with pytest.raises(KeyError, match='test_three'):
+            bus.next_segment('tests/test_a.py::test_three')
+    
+    def test_fast_pacing_needs_virtual_clock(self, tmp_path):
+        """Fast pacing is refused on a wall clock"""
+        trace_file = tmp_path / 'trace.bin'
+        record_two_tests(trace_file)
+        with pytest.raises(ValueError):
+            TraceReplayBus(trace_file, create_clock('wall'), PACING_FAST)
@@ -0,0 +1,115 @@
+"""
+Data Logger Tests
+Reuse across tests, JSON Lines streaming and summary recovery after an interrupted run
+"""
+
+import json
+
+import pytest
+
+from utilities.data_logger import DataLogger, iter_jsonl_records, read_jsonl_summary
+
+
+def write_stream(tmp_path, results=(('TC-A-001', 'PASS'), ('TC-A-002', 'FAIL'), ('TC-A-003', 'PASS'))):
+    """Run a DataLogger with JSON Lines streaming and return the closed stream path"""
+    jsonl_file = tmp_path / 'results.jsonl'
+    with DataLogger(str(tmp_path / 'results.csv'), jsonl_file=str(jsonl_file)) as data_logger:
+        for test_id, status in results:
+            data_logger.log_test(test_id, status, 'message')
+            data_logger.log_measurement(test_id, 'temperature', 21.5, 'C')
+    return jsonl_file
+
+
+class TestReuse:
+    """A pooled logger serves one test after another"""
+    
+    def test_reset_keeps_session_data(self, tmp_path):
+        """reset() only drops the test context; exports still hold every test"""
+        with DataLogger(str(tmp_path / 'results.csv')) as data_logger:
+            for test_id, test_class in (('TC-A-001', 'TestA'), ('TC-B-001', 'TestB')):
+                data_logger.reset()
+                data_logger.set_context(test_class, ['heating'])
+                data_logger.log_measurement(test_id, 'temperature', 21.5, 'C')
+                data_logger.log_test(test_id, 'PASS', 'message')
+            data_logger.reset()
+            data_logger.log_test('TC-C-001', 'PASS', 'logged without a context')
+            data_logger.export_json_report(str(tmp_path / 'report.json'))
+        
+        report = json.loads((tmp_path / 'report.json').read_text())
+        assert [m['test_id'] for m in report['measurements']] == ['TC-A-001', 'TC-B-001']
+        assert report['summary']['total_tests'] == 3
+        assert set(report['breakdown']['by_class']) == {'TestA', 'TestB'}
+        assert report['breakdown']['by_marker']['heating']['total_tests'] == 2
+
+
+class TestBreakdown:
+    """Summaries per test class and per marker"""
+    
+    def test_breakdown_report(self, tmp_path):
+        """Results are counted under their class and each of their breakdown markers"""
+        with DataLogger(str(tmp_path / 'results.csv')) as data_logger:
+            for test_class, markers, status in (('TestHeat', ['heating', 'safety'], 'PASS'),
+                                                ('TestHeat', ['heating', 'slow'], 'FAIL'),
+                                                ('TestMassage', ['massage', 'safety'], 'PASS'),
+                                                (None, [], 'PASS')):
+                data_logger.reset()
+                data_logger.set_context(test_class, markers)
+                data_logger.log_test('TC-001', status, 'message')
+            breakdown = data_logger.generate_breakdown_report()
+        
+        assert set(breakdown['by_class']) == {'TestHeat', 'TestMassage'}
+        heat = breakdown['by_class']['TestHeat']
+        assert (heat['total_tests'], heat['passed'], heat['failed']) == (2, 1, 1)
+        assert heat['pass_rate'] == pytest.approx(50.0)
+        assert breakdown['by_class']['TestMassage']['pass_rate'] == pytest.approx(100.0)
+        # Markers outside BREAKDOWN_MARKERS are not counted
+        assert {name: counts['total_tests'] for name, counts in breakdown['by_marker'].items()} \
+            == {'heating': 2, 'safety': 2, 'massage': 1}
+        assert breakdown['by_marker']['safety']['failed'] == 0
+        # The overall summary still counts the result logged without a context
+        assert data_logger.generate_summary_report()['total_tests'] == 4
+
+
+class TestJsonLinesStream:
+    """Records written while the run is in progress"""
+    
+    def test_stream_ends_with_summary(self, tmp_path):
+        """Results and measurements are streamed, the summary is appended last"""
+        jsonl_file = write_stream(tmp_path)
+        records = list(iter_jsonl_records(str(jsonl_file)))
+        assert [r['type'] for r in records] == ['result', 'measurement'] * 3 + ['summary']
+        assert len(list(iter_jsonl_records(str(jsonl_file), 'result'))) == 3
+        summary = read_jsonl_summary(str(jsonl_file))
+        assert summary['type'] == 'summary'
+        assert (summary['total_tests'], summary['passed'], summary['failed']) == (3, 2, 1)
+    
+    def test_summary_rebuilt_without_summary_record(self, tmp_path):
+        """A run that died before close() still yields its summary"""
+        jsonl_file = write_stream(tmp_path)
+        lines = jsonl_file.read_text().splitlines(keepends=True)
+        jsonl_file.write_text(''.join(lines[:-1]))
+        summary = read_jsonl_summary(str(jsonl_file))
+        assert (summary['total_tests'], summary['passed'], summary['failed']) == (3, 2, 1)
+    
+    @pytest.mark.parametrize('cut', [1, 20, -2])
+    def test_truncated_last_line_skipped(self, tmp_path, cut):
+        """A half-written last record is skipped by the reader and the summary rebuild"""
+        jsonl_file = write_stream(tmp_path)
+        lines = jsonl_file.read_text().splitlines(keepends=True)
+        # Crash while writing the last result: drop the rest and cut that line short
+        partial = lines[4][:cut]
+        jsonl_file.write_text(''.join(lines[:4]) + partial)
+        
+        records = list(iter_jsonl_records(str(jsonl_file)))
+        assert [r['type'] for r in records] == ['result', 'measurement'] * 2
+        summary = read_jsonl_summary(str(jsonl_file))
+        assert (summary['total_tests'], summary['passed'], summary['failed']) == (2, 1, 1)
+    
+    def test_malformed_line_before_end_raises(self, tmp_path):
+        """Only the last line may be incomplete"""
+        jsonl_file = write_stream(tmp_path)
+        lines = jsonl_file.read_text().splitlines(keepends=True)
+        lines[2] = lines[2][:10] + '\n'
+        jsonl_file.write_text(''.join(lines))
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_jsonl_records(str(jsonl_file)))
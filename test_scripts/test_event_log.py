@@ -0,0 +1,74 @@
+"""
+Event Log Tests
+Bounded diagnostic event ring buffer
+"""
+
+import threading
+
+from utilities.event_log import EventLog
+
+
+def events(count, start=0):
+    """Numbered diagnostic events"""
+    return [{'timestamp': 1000.0 + i, 'event': f'EVENT_{i}'} for i in range(start, start + count)]
+
+
+class TestEventLog:
+    """Overwrite-oldest ring buffer semantics"""
+    
+    def test_order_oldest_first(self):
+        """pop() and drain() return events in the order they were logged"""
+        log = EventLog(capacity=10)
+        for event in events(5):
+            log.append(event)
+        assert log.pop()['event'] == 'EVENT_0'
+        assert [e['event'] for e in log.drain()] == ['EVENT_1', 'EVENT_2', 'EVENT_3', 'EVENT_4']
+        assert len(log) == 0
+        assert log.pop() is None
+        assert log.drain() == []
+    
+    def test_overwrite_oldest_when_full(self):
+        """Past capacity the oldest events are dropped and counted"""
+        log = EventLog(capacity=3)
+        for event in events(7):
+            log.append(event)
+        assert len(log) == 3
+        assert log.overwritten == 4
+        assert [e['event'] for e in log.drain()] == ['EVENT_4', 'EVENT_5', 'EVENT_6']
+        
+        # Room freed by pop() is reused without overwriting
+        for event in events(3, start=7):
+            log.append(event)
+        log.pop()
+        log.append(events(1, start=10)[0])
+        assert log.overwritten == 4
+        assert [e['event'] for e in log.drain()] == ['EVENT_8', 'EVENT_9', 'EVENT_10']
+    
+    def test_clear_resets_overwrite_count(self):
+        """clear() empties the log and starts the overwrite count over"""
+        log = EventLog(capacity=2)
+        for event in events(5):
+            log.append(event)
+        log.clear()
+        assert len(log) == 0 and log.overwritten == 0
+    
+    def test_concurrent_appends(self):
+        """Appends from several threads are neither lost nor double counted"""
+        log = EventLog(capacity=100)
+        
+        def produce(start):
+            for event in events(1000, start):
+                log.append(event)
+        
+        threads = [threading.Thread(target=produce, args=(i * 1000,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(log) == 100
+        assert log.overwritten == 3900
+        # Each producer's events stay in its own order
+        kept = [int(e['event'].split('_')[1]) for e in log.drain()]
+        for producer in range(4):
+            own = [i for i in kept if i // 1000 == producer]
+            assert own == sorted(own)
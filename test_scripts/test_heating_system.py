@@ -4,9 +4,6 @@ Tests for the Seat Comfort Module heating system
 """
 
 import pytest
-import time
-from utilities.hil_interface import HILInterface
-from utilities.data_logger import DataLogger
 
 
 @pytest.mark.heating
@@ -15,23 +12,24 @@ class TestHeatingBasics:
     """Test basic heating functionality"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each heating test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/heating_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/heating_tests.log')
     
     def test_heat_enable_disable_control(self):
         """TC-HEAT-001: Verify heating system responds to on/off commands"""
         # Send disable command
         self.hil.send_control_command(heat_enable=False, heat_intensity=0)
-        time.sleep(0.2)
+        self.clock.sleep(0.2)
         status = self.hil.read_heat_status()
         assert status['heating_active'] == False, "Heater should be disabled"
         
         # Send enable command
         self.hil.send_control_command(heat_enable=True, heat_intensity=2)
-        time.sleep(0.15)  # Allow up to 100ms response
+        self.clock.sleep(0.15)  # Allow up to 100ms response
         status = self.hil.read_heat_status()
         assert status['heating_active'] == True, "Heater should be enabled within 100ms"
         
@@ -40,7 +38,7 @@ class TestHeatingBasics:
     def test_low_intensity_heating_30w(self):
         """TC-HEAT-002: Verify low heating mode (30W ± 3W)"""
         self.hil.set_heat_intensity(1)  # Low intensity
-        time.sleep(1)  # Stabilization
+        self.clock.sleep(1)  # Stabilization
         
         power_readings = []
         for i in range(10):
@@ -48,7 +46,7 @@ class TestHeatingBasics:
             current = self.hil.read_current()
             power = voltage * current
             power_readings.append(power)
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
         
         avg_power = sum(power_readings) / len(power_readings)
         assert 27 <= avg_power <= 33, f"Power {avg_power}W outside range 27-33W"
@@ -58,7 +56,7 @@ class TestHeatingBasics:
     def test_medium_intensity_heating_50w(self):
         """TC-HEAT-003: Verify medium heating mode (50W ± 5W)"""
         self.hil.set_heat_intensity(2)  # Medium intensity
-        time.sleep(1)  # Stabilization
+        self.clock.sleep(1)  # Stabilization
         
         power_readings = []
         for i in range(10):
@@ -66,7 +64,7 @@ class TestHeatingBasics:
             current = self.hil.read_current()
             power = voltage * current
             power_readings.append(power)
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
         
         avg_power = sum(power_readings) / len(power_readings)
         assert 45 <= avg_power <= 55, f"Power {avg_power}W outside range 45-55W"
@@ -76,7 +74,7 @@ class TestHeatingBasics:
     def test_high_intensity_heating_70w(self):
         """TC-HEAT-004: Verify high heating mode (70W ± 7W)"""
         self.hil.set_heat_intensity(3)  # High intensity
-        time.sleep(1)  # Stabilization
+        self.clock.sleep(1)  # Stabilization
         
         power_readings = []
         for i in range(10):
@@ -84,7 +82,7 @@ class TestHeatingBasics:
             current = self.hil.read_current()
             power = voltage * current
             power_readings.append(power)
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
         
         avg_power = sum(power_readings) / len(power_readings)
         assert 63 <= avg_power <= 77, f"Power {avg_power}W outside range 63-77W"
@@ -98,11 +96,12 @@ class TestHeatingTemperature:
     """Test heating temperature control"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/heating_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/heating_tests.log')
     
     def test_temperature_sensor_accuracy(self):
         """TC-HEAT-005: Verify temperature sensor accuracy ±2°C"""
@@ -110,7 +109,7 @@ class TestHeatingTemperature:
         
         for target_temp in test_temps:
             self.hil.set_reference_temperature(target_temp)
-            time.sleep(0.5)
+            self.clock.sleep(0.5)
             
             sensor_reading = self.hil.read_temperature()
             error = abs(sensor_reading - target_temp)
@@ -123,18 +122,18 @@ class TestHeatingTemperature:
         self.hil.set_reference_temperature(20.0)  # Start at 20°C
         self.hil.send_control_command(heat_enable=True, heat_intensity=3)
         
-        start_time = time.time()
+        start_time = self.clock.time()
         target_reached = False
         
-        while time.time() - start_time < self.config.TEST_TIMEOUT:
+        while self.clock.time() - start_time < self.config.TEST_TIMEOUT:
             temp = self.hil.read_temperature()
             if temp >= 40.0:
-                elapsed = time.time() - start_time
+                elapsed = self.clock.time() - start_time
                 target_reached = True
                 assert elapsed <= 120.0, f"Time to reach 40°C: {elapsed}s (max 120s)"
                 self.logger.log_test("TC-HEAT-006", "PASS", f"Cold start: {elapsed:.1f}s")
                 break
-            time.sleep(0.5)
+            self.clock.sleep(0.5)
         
         assert target_reached, "Temperature never reached 40°C within 120 seconds"
     
@@ -144,12 +143,12 @@ class TestHeatingTemperature:
         
         max_temp_observed = 0.0
         monitoring_time = 300  # seconds
-        start_time = time.time()
+        start_time = self.clock.time()
         
-        while time.time() - start_time < monitoring_time:
+        while self.clock.time() - start_time < monitoring_time:
             temp = self.hil.read_temperature()
             max_temp_observed = max(max_temp_observed, temp)
-            time.sleep(1)
+            self.clock.sleep(1)
         
         assert max_temp_observed <= 65.0, f"Max temp {max_temp_observed}°C exceeds 65°C limit"
         self.logger.log_test("TC-HEAT-007", "PASS", f"Max temp verified: {max_temp_observed:.1f}°C")
@@ -160,7 +159,7 @@ class TestHeatingTemperature:
         self.hil.set_reference_temperature(69.0)
         self.hil.send_control_command(heat_enable=True, heat_intensity=3)
         
-        time.sleep(0.1)  # Allow 10ms response window
+        self.clock.sleep(0.1)  # Allow 10ms response window
         status = self.hil.read_heat_status()
         duty_cycle = status['duty_cycle']
         
@@ -174,11 +173,12 @@ class TestHeatingTelemetry:
     """Test heating telemetry and communication"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/heating_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/heating_tests.log')
     
     def test_telemetry_cycle_time(self):
         """TC-HEAT-009: Verify SEAT_HEAT_STATUS sent every 100ms ±10ms"""
@@ -188,7 +188,7 @@ class TestHeatingTelemetry:
         for i in range(11):  # Collect 11 messages to get 10 intervals
             msg = self.hil.read_heat_status_raw()
             timestamps.append(msg['timestamp'])
-            time.sleep(0.05)  # Allow time for next message
+            self.clock.sleep(0.05)  # Allow time for next message
         
         intervals = []
         for i in range(1, len(timestamps)):
@@ -202,7 +202,7 @@ class TestHeatingTelemetry:
         """TC-HEAT-010: Verify heating operates at minimum voltage (8V)"""
         self.hil.set_supply_voltage(8.0)
         self.hil.send_control_command(heat_enable=True, heat_intensity=3)
-        time.sleep(1)
+        self.clock.sleep(1)
         
         voltage = self.hil.read_voltage()
         status = self.hil.read_heat_status()
@@ -215,7 +215,7 @@ class TestHeatingTelemetry:
         """TC-HEAT-011: Verify heating operates at maximum voltage (14.4V)"""
         self.hil.set_supply_voltage(14.4)
         self.hil.send_control_command(heat_enable=True, heat_intensity=3)
-        time.sleep(1)
+        self.clock.sleep(1)
         
         voltage = self.hil.read_voltage()
         status = self.hil.read_heat_status()
@@ -231,28 +231,23 @@ class TestHeatingLogging:
     """Test heating event logging"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/heating_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/heating_tests.log')
     
     def test_heating_event_logging(self):
         """TC-HEAT-012: Verify all heating events logged with timestamp"""
-        events_logged = []
-        
         for i in range(5):
             self.hil.send_control_command(heat_enable=True)
-            time.sleep(0.5)
-            log_entry = self.hil.read_event_log()
-            if log_entry:
-                events_logged.append(log_entry)
+            self.clock.sleep(0.5)
             
             self.hil.send_control_command(heat_enable=False)
-            time.sleep(0.5)
-            log_entry = self.hil.read_event_log()
-            if log_entry:
-                events_logged.append(log_entry)
+            self.clock.sleep(0.5)
+        
+        events_logged = self.hil.drain_event_log()
         
         assert len(events_logged) >= 5, f"Expected at least 5 events, got {len(events_logged)}"
         
@@ -269,11 +264,12 @@ class TestHeatingStress:
     """Stress tests for heating subsystem"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/heating_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/heating_tests.log')
     
     def test_repeated_cold_start_cycles(self):
         """TC-STRESS-001: Verify heater handles 20 repeated cold-start cycles"""
@@ -283,19 +279,19 @@ class TestHeatingStress:
             self.hil.set_reference_temperature(20.0)
             self.hil.send_control_command(heat_enable=True, heat_intensity=3)
             
-            start_time = time.time()
-            while time.time() - start_time < 180:  # Max 180s per cycle
+            start_time = self.clock.time()
+            while self.clock.time() - start_time < 180:  # Max 180s per cycle
                 temp = self.hil.read_temperature()
                 if temp >= 50.0:
-                    cycle_time = time.time() - start_time
+                    cycle_time = self.clock.time() - start_time
                     cycle_times.append(cycle_time)
                     break
-                time.sleep(0.5)
+                self.clock.sleep(0.5)
             
             # Cool down
             self.hil.send_control_command(heat_enable=False)
             self.hil.set_reference_temperature(20.0)
-            time.sleep(60)
+            self.clock.sleep(60)
         
         avg_time = sum(cycle_times) / len(cycle_times)
         assert avg_time <= 120.0, f"Average cycle time {avg_time}s exceeds 120s limit"
@@ -3,10 +3,9 @@ Integration and System Tests
 Tests for system-level integration and safety features
 """
 
+import asyncio
+
 import pytest
-import time
-from utilities.hil_interface import HILInterface
-from utilities.data_logger import DataLogger
 
 
 @pytest.mark.integration
@@ -15,11 +14,12 @@ class TestSystemIntegration:
     """System integration tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/integration_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/integration_tests.log')
     
     def test_simultaneous_heating_and_massage(self):
         """TC-INT-001: Verify simultaneous heating and massage operation"""
@@ -33,9 +33,9 @@ class TestSystemIntegration:
         heat_active_count = 0
         massage_active_count = 0
         monitoring_time = 60
-        start_time = time.time()
+        start_time = self.clock.time()
         
-        while time.time() - start_time < monitoring_time:
+        while self.clock.time() - start_time < monitoring_time:
             heat_status = self.hil.read_heat_status()
             massage_status = self.hil.read_massage_status()
             
@@ -44,7 +44,7 @@ class TestSystemIntegration:
             if massage_status['pump_active']:
                 massage_active_count += 1
             
-            time.sleep(1)
+            self.clock.sleep(1)
         
         # Both systems should be active throughout
         assert heat_active_count > monitoring_time * 0.8, "Heating not consistently active"
@@ -52,37 +52,31 @@ class TestSystemIntegration:
         
         self.logger.log_test("TC-INT-001", "PASS", "Simultaneous operation verified")
     
-    def test_can_message_cycle_time_stability(self):
+    async def test_can_message_cycle_time_stability(self, async_hil):
         """TC-INT-002: Verify CAN cycle time stability"""
-        self.hil.send_control_command(heat_enable=True, massage_enable=True)
-        
-        heat_intervals = []
-        massage_intervals = []
-        last_heat_time = time.time()
-        last_massage_time = time.time()
+        await async_hil.send_control_command(heat_enable=True, massage_enable=True)
         monitoring_time = 10  # 10 seconds
-        start_time = time.time()
         
-        while time.time() - start_time < monitoring_time:
-            heat_msg = self.hil.read_heat_status_raw()
-            massage_msg = self.hil.read_massage_status_raw()
-            
-            current_time = time.time()
-            
-            interval_heat = current_time - last_heat_time
-            interval_massage = current_time - last_massage_time
-            
-            if interval_heat > 0.05:  # Only record if significant time passed
-                heat_intervals.append(interval_heat)
-                last_heat_time = current_time
-            
-            if interval_massage > 0.05:
-                massage_intervals.append(interval_massage)
-                last_massage_time = current_time
-            
-            time.sleep(0.01)
+        async def monitor_intervals(frames):
+            """Collect intervals between consecutive frame timestamps of one stream"""
+            timestamps = []
+            async for frame in frames:
+                timestamps.append(frame['timestamp'])
+                if timestamps[-1] - timestamps[0] >= monitoring_time:
+                    break
+            return [t1 - t0 for t0, t1 in zip(timestamps, timestamps[1:])]
+        
+        # Monitor both status streams concurrently
+        heat_intervals, massage_intervals = await asyncio.wait_for(
+            asyncio.gather(
+                monitor_intervals(async_hil.heat_status_frames()),
+                monitor_intervals(async_hil.massage_status_frames())
+            ),
+            timeout=monitoring_time * 2
+        )
         
         # Verify stability
+        assert heat_intervals and massage_intervals, "No status frames received"
         for interval in heat_intervals:
             assert 0.090 <= interval <= 0.110, f"Heat cycle {interval*1000:.1f}ms out of range"
         for interval in massage_intervals:
@@ -93,14 +87,16 @@ class TestSystemIntegration:
     def test_can_message_loss_handling(self):
         """TC-INT-003: Verify system handles 500ms CAN message loss"""
         self.hil.send_control_command(heat_enable=True, heat_intensity=2)
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         
         # Get initial state
         initial_status = self.hil.read_heat_status()
         initial_duty = initial_status['duty_cycle']
         
         # Simulate 600ms without CAN commands
-        time.sleep(0.6)
+        self.hil.pause_control_command()
+        self.clock.sleep(0.6)
+        self.hil.resume_control_command()
         
         # System should maintain state
         current_status = self.hil.read_heat_status()
@@ -111,11 +107,18 @@ class TestSystemIntegration:
         
         # System should recover when commands resume
         self.hil.send_control_command(heat_enable=False)
-        time.sleep(0.2)
+        self.clock.sleep(0.2)
         
         recovered_status = self.hil.read_heat_status()
         assert recovered_status['heating_active'] == False, "System didn't respond after CAN resume"
         
+        jitter = self.hil.control_command_jitter()
+        assert jitter['sent'] > 0, "SEAT_CTRL_CMD not transmitted cyclically"
+        if not self.clock.virtual:
+            # Virtual-clock frames are sent exactly on their deadlines; only real time has jitter
+            assert jitter['max'] <= self.config.CAN_CYCLE_TOLERANCE, \
+                f"SEAT_CTRL_CMD jitter {jitter['max'] * 1000:.1f}ms exceeds tolerance"
+        
         self.logger.log_test("TC-INT-003", "PASS", "CAN message loss handling verified")
 
 
@@ -125,17 +128,18 @@ class TestSafetyCritical:
     """Safety-critical system tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/safety_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/safety_tests.log')
     
     def test_microcontroller_fault_failsafe(self):
         """TC-SAFE-001: Verify failsafe state on MCU fault"""
         # Enable both systems
         self.hil.send_control_command(heat_enable=True, massage_enable=True)
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         
         # Both should be active
         assert self.hil.read_heat_status()['heating_active']
@@ -158,11 +162,11 @@ class TestSafetyCritical:
     def test_over_temperature_immediate_shutdown(self):
         """TC-SAFE-002: Verify immediate heating shutdown at >68°C"""
         self.hil.send_control_command(heat_enable=True, heat_intensity=3)
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         
         # Simulate over-temperature condition
         self.hil.set_reference_temperature(69.0)
-        time.sleep(0.1)  # Allow for 10ms response
+        self.clock.sleep(0.1)  # Allow for 10ms response
         
         # Heating should be immediately de-energized
         status = self.hil.read_heat_status()
@@ -173,11 +177,11 @@ class TestSafetyCritical:
     def test_over_pressure_pump_shutoff(self):
         """TC-SAFE-003: Verify pump shutoff at >150 kPa"""
         self.hil.send_control_command(massage_enable=True, massage_intensity=5)
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         
         # Simulate over-pressure
         self.hil.simulate_pump_overpressure()
-        time.sleep(0.1)  # Allow for response
+        self.clock.sleep(0.1)  # Allow for response
         
         status = self.hil.read_massage_status()
         pressure = status['pressure_kpa']
@@ -189,26 +193,21 @@ class TestSafetyCritical:
     def test_fault_event_logging(self):
         """TC-SAFE-004: Verify all faults logged with timestamps"""
         # Trigger multiple fault conditions
-        faults_detected = []
-        
         # Fault 1: Over-temperature
         self.hil.set_reference_temperature(69.0)
-        time.sleep(0.2)
+        self.clock.sleep(0.2)
         
         # Fault 2: Over-pressure
         self.hil.set_massage_intensity(5)
         self.hil.simulate_pump_overpressure()
-        time.sleep(0.2)
+        self.clock.sleep(0.2)
         
         # Fault 3: Pump failure
         self.hil.simulate_pump_fault()
-        time.sleep(0.2)
+        self.clock.sleep(0.2)
         
         # Check logs
-        log_entry = self.hil.read_event_log()
-        while log_entry:
-            faults_detected.append(log_entry)
-            log_entry = self.hil.read_event_log()
+        faults_detected = self.hil.drain_event_log()
         
         assert len(faults_detected) >= 1, "Faults not logged"
         
@@ -221,11 +220,12 @@ class TestDiagnostics:
     """Diagnostic interface tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/integration_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/integration_tests.log')
     
     def test_diagnostic_can_read_all_sensors(self):
         """TC-INT-005: Verify all sensor values accessible via diagnostic CAN"""
@@ -256,11 +256,12 @@ class TestEdgeCases:
     """Edge case tests"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/integration_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/integration_tests.log')
     
     def test_temperature_oscillation_stability(self):
         """TC-EDGE-001: Verify no excessive temperature oscillation"""
@@ -268,12 +269,12 @@ class TestEdgeCases:
         
         temperatures = []
         monitoring_time = 300  # 5 minutes
-        start_time = time.time()
+        start_time = self.clock.time()
         
-        while time.time() - start_time < monitoring_time:
+        while self.clock.time() - start_time < monitoring_time:
             temp = self.hil.read_temperature()
             temperatures.append(temp)
-            time.sleep(1)
+            self.clock.sleep(1)
         
         # Calculate oscillation metrics
         if len(temperatures) > 10:
@@ -287,7 +288,7 @@ class TestEdgeCases:
     def test_voltage_sag_recovery(self):
         """TC-EDGE-003: Verify system recovery from voltage sag"""
         self.hil.send_control_command(heat_enable=True, heat_intensity=3)
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         
         # Normal operation
         normal_status = self.hil.read_heat_status()
@@ -295,14 +296,14 @@ class TestEdgeCases:
         
         # Simulate voltage sag to 8V
         self.hil.set_supply_voltage(8.0)
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         
         sag_status = self.hil.read_heat_status()
         # System should continue operating (degraded)
         
         # Restore voltage
         self.hil.set_supply_voltage(13.2)
-        time.sleep(0.5)
+        self.clock.sleep(0.5)
         
         recovered_status = self.hil.read_heat_status()
         assert recovered_status['heating_active'], "System should recover from voltage sag"
@@ -315,11 +316,12 @@ class TestStressIntegration:
     """Stress tests for integrated system"""
     
     @pytest.fixture(autouse=True)
-    def setup(self, config):
+    def setup(self, config, clock, hil, data_loggers):
         """Setup for each test"""
         self.config = config
-        self.hil = HILInterface(config)
-        self.logger = DataLogger('reports/stress_tests.log')
+        self.clock = clock
+        self.hil = hil
+        self.logger = data_loggers('reports/stress_tests.log')
     
     def test_extended_simultaneous_operation(self):
         """TC-STRESS-003: Verify no degradation after 2 hours simultaneous operation"""
@@ -331,19 +333,19 @@ class TestStressIntegration:
         metrics_history = []
         monitoring_interval = 600  # Sample every 10 minutes
         total_time = 120 * 60  # 2 hours in seconds
-        start_time = time.time()
+        start_time = self.clock.time()
         
-        while time.time() - start_time < total_time:
+        while self.clock.time() - start_time < total_time:
             heat_status = self.hil.read_heat_status()
             massage_status = self.hil.read_massage_status()
             
             metrics_history.append({
                 'heat_duty': heat_status['duty_cycle'],
                 'massage_pressure': massage_status['pressure_kpa'],
-                'timestamp': time.time() - start_time
+                'timestamp': self.clock.time() - start_time
             })
             
-            time.sleep(monitoring_interval)
+            self.clock.sleep(monitoring_interval)
         
         # Check for degradation
         if len(metrics_history) > 1:
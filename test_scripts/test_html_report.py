@@ -0,0 +1,132 @@
+"""
+HTML Report Tests
+Min/max decimation of measurement charts and results paged over separate files
+"""
+
+import re
+
+import numpy as np
+import pytest
+
+from utilities.data_logger import DataLogger
+from utilities.html_report import decimate_minmax, page_path, render_html_report
+from utilities.measurement_store import MeasurementStore
+
+
+SUMMARY = {'total_tests': 0, 'passed': 0, 'failed': 0, 'pass_rate': 0.0}
+
+
+def results(count):
+    """Numbered result records"""
+    return [{'test_id': f'TC-{i:04d}', 'status': 'PASS' if i % 3 else 'FAIL',
+             'message': 'message', 'timestamp': f'2026-01-01T00:00:{i % 60:02d}'}
+            for i in range(count)]
+
+
+def row_ids(path):
+    """Test IDs of the result rows in a page file"""
+    return re.findall(r'<tr><td>(TC-\d+)</td>', open(path, encoding='utf-8').read())
+
+
+class TestDecimateMinmax:
+    """Peaks survive chart decimation"""
+    
+    def test_short_series_unchanged(self):
+        """A series already within max_points is returned as is"""
+        timestamps, values = np.arange(10.0), np.linspace(0, 1, 10)
+        out_t, out_v = decimate_minmax(timestamps, values, max_points=10)
+        assert np.array_equal(out_t, timestamps) and np.array_equal(out_v, values)
+    
+    def test_every_bucket_keeps_its_extremes(self):
+        """Each bucket's min and max are kept, so the overall extremes are too"""
+        rng = np.random.default_rng(7)
+        values = rng.normal(25.0, 0.5, 100_000)
+        values[12_345] = 90.0   # Spike
+        values[87_654] = -40.0  # Dropout
+        timestamps = 1000.0 + np.arange(len(values)) * 0.01
+        out_t, out_v = decimate_minmax(timestamps, values, max_points=200)
+        
+        assert len(out_v) == 200
+        assert out_v.max() == 90.0 and out_v.min() == -40.0
+        assert np.all(np.diff(out_t) >= 0)
+        edges = np.linspace(0, len(values), 101).astype(np.int64)
+        for bucket, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+            assert out_v[2 * bucket] == values[start:end].min()
+            assert out_v[2 * bucket + 1] == values[start:end].max()
+            assert timestamps[start] <= out_t[2 * bucket] <= timestamps[end - 1]
+    
+    def test_single_sample_spike(self):
+        """A one-sample spike between flat samples is drawn at full height"""
+        values = np.zeros(5001)
+        values[2500] = 1.0
+        _, out_v = decimate_minmax(np.arange(5001.0), values, max_points=10)
+        assert out_v.max() == 1.0 and out_v.min() == 0.0
+
+
+class TestPagedReport:
+    """Each result page is its own file"""
+    
+    def test_pages_split_across_files(self, tmp_path):
+        """Every page file holds only its own rows and links to its neighbours"""
+        output_file = str(tmp_path / 'report.html')
+        paths = render_html_report(output_file, SUMMARY, iter(results(1200)),
+                                   MeasurementStore(), page_size=500)
+        
+        assert paths == [output_file, str(tmp_path / 'report_page2.html'),
+                         str(tmp_path / 'report_page3.html')]
+        assert paths == [page_path(output_file, page) for page in (1, 2, 3)]
+        ids = [result['test_id'] for result in results(1200)]
+        assert row_ids(paths[0]) == ids[:500]
+        assert row_ids(paths[1]) == ids[500:1000]
+        assert row_ids(paths[2]) == ids[1000:]
+        
+        first, middle, last = (open(path, encoding='utf-8').read() for path in paths)
+        assert 'Total Tests' in first and 'Total Tests' not in middle
+        assert 'href="report_page2.html"' in first and 'Prev' not in first
+        assert 'href="report.html"' in middle and 'href="report_page3.html"' in middle
+        assert 'href="report_page2.html"' in last and 'Next' not in last
+    
+    def test_exact_multiple_has_no_empty_page(self, tmp_path):
+        """A result count that fills the last page exactly adds no empty page"""
+        paths = render_html_report(str(tmp_path / 'report.html'), SUMMARY, results(10),
+                                   MeasurementStore(), page_size=5)
+        assert len(paths) == 2
+        assert 'Next' not in open(paths[1], encoding='utf-8').read()
+    
+    def test_empty_results(self, tmp_path):
+        """With no results the report is a single page without a pager"""
+        paths = render_html_report(str(tmp_path / 'report.html'), SUMMARY, [],
+                                   MeasurementStore())
+        html = open(paths[0], encoding='utf-8').read()
+        assert len(paths) == 1
+        assert 'class="pager"' not in html and html.endswith('</html>\n')
+    
+    def test_charts_on_first_page(self, tmp_path):
+        """Measurement charts are drawn once, decimated, on the first page"""
+        store = MeasurementStore()
+        for i in range(5000):
+            store.append('TC-0000', 'temperature', 20.0 + (i == 1234) * 50.0, 'C', 1000.0 + i)
+        paths = render_html_report(str(tmp_path / 'report.html'), SUMMARY, results(3), store,
+                                   page_size=2, max_points=100)
+        first, second = (open(path, encoding='utf-8').read() for path in paths)
+        assert first.count('<svg class="chart"') == 1 and '<svg' not in second
+        points = re.search(r'<polyline points="([^"]*)"', first).group(1).split()
+        assert len(points) == 100
+        assert '5000 samples, 20.00 .. 70.00' in first
+    
+    def test_data_logger_export(self, tmp_path):
+        """DataLogger.export_html_report() pages the logged results"""
+        with DataLogger(str(tmp_path / 'results.csv')) as data_logger:
+            for i in range(7):
+                data_logger.log_test(f'TC-{i:03d}', 'PASS', 'message')
+            data_logger.export_html_report(str(tmp_path / 'report.html'), page_size=3)
+        assert sorted(p.name for p in tmp_path.glob('report*.html')) == \
+            ['report.html', 'report_page2.html', 'report_page3.html']
+    
+    def test_escaped(self, tmp_path):
+        """Result text is HTML-escaped"""
+        record = dict(results(1)[0], message='<script>alert(1)</script>')
+        paths = render_html_report(str(tmp_path / 'report.html'), SUMMARY, [record],
+                                   MeasurementStore())
+        html = open(paths[0], encoding='utf-8').read()
+        assert '<script>' not in html and '&lt;script&gt;' in html
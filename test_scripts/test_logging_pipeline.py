@@ -0,0 +1,101 @@
+"""
+Logging Pipeline Tests
+Formatting on the listener thread and gzip rotation of the execution log
+"""
+
+import gzip
+import logging
+import threading
+
+from utilities.logging_pipeline import DeferredQueueHandler, start_logging, stop_logging
+
+
+class ThreadRecorder:
+    """Log argument that notes which thread renders it"""
+    
+    def __init__(self):
+        self.threads = []
+    
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return 'recorded'
+
+
+def detach_root_handlers(monkeypatch):
+    """Leave the root logger without the session's and pytest's handlers until the test ends
+    
+    pytest attaches its capture handlers after fixture setup, so tests call
+    this themselves before starting a pipeline.
+    """
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [])
+    monkeypatch.setattr(root, 'level', root.level)
+
+
+class TestDeferredFormatting:
+    """The calling thread only enqueues records"""
+    
+    def test_prepare_does_not_format(self):
+        """The queued record keeps its message template, arguments and traceback"""
+        arg = ThreadRecorder()
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = logging.getLogger('test').makeRecord(
+                'test', logging.ERROR, __file__, 1, 'value %s', (arg,), exc_info=True)
+        prepared = DeferredQueueHandler(None).prepare(record)
+        assert prepared.msg == 'value %s' and prepared.args == (arg,)
+        assert prepared.exc_info is not None and prepared.exc_text is None
+        assert arg.threads == []
+    
+    def test_listener_thread_formats(self, monkeypatch, tmp_path):
+        """Messages and tracebacks are rendered by the listener, not the caller"""
+        detach_root_handlers(monkeypatch)
+        log_file = tmp_path / 'execution.log'
+        listener = start_logging(log_file)
+        arg = ThreadRecorder()
+        logger = logging.getLogger('pipeline_test')
+        logger.info('value %s', arg)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception('failed with %s', arg)
+        stop_logging(listener)
+        
+        caller = threading.current_thread().name
+        # Every rendering (one per handler) happens on the one listener thread
+        assert arg.threads and len(set(arg.threads)) == 1
+        assert caller not in arg.threads
+        text = log_file.read_text()
+        assert 'pipeline_test - INFO - value recorded' in text
+        assert 'ValueError: boom' in text
+
+
+class TestRotation:
+    """Size-based rotation into gzip backups"""
+    
+    def test_gzip_backups(self, monkeypatch, tmp_path):
+        """Backups are gzip files, oldest at the highest number, at most backup_count kept"""
+        detach_root_handlers(monkeypatch)
+        log_file = tmp_path / 'execution.log'
+        listener = start_logging(log_file, max_bytes=2000, backup_count=3)
+        logger = logging.getLogger('rotation_test')
+        for index in range(200):
+            logger.info('record %04d', index)
+        stop_logging(listener)
+        
+        names = sorted(path.name for path in tmp_path.iterdir())
+        assert names == ['execution.log', 'execution.log.1.gz', 'execution.log.2.gz',
+                         'execution.log.3.gz']
+        
+        def numbers(text):
+            return [int(line.rsplit(' ', 1)[1]) for line in text.splitlines()]
+        
+        chunks = [numbers(gzip.decompress((tmp_path / f'execution.log.{k}.gz').read_bytes()).decode())
+                  for k in (3, 2, 1)]
+        chunks.append(numbers(log_file.read_text()))
+        merged = [number for chunk in chunks for number in chunk]
+        # Contiguous and in order across the backups; the oldest records were dropped
+        assert merged == list(range(merged[0], 200))
+        assert merged[0] > 0
+        assert all(len(chunk) > 0 for chunk in chunks)
@@ -0,0 +1,116 @@
+"""
+Measurement Store Tests
+Columnar measurement channels, list compatibility and .npz round-trip
+"""
+
+import numpy as np
+import pytest
+
+from utilities.data_logger import DataLogger, load_measurements
+from utilities.measurement_store import MeasurementChannel, MeasurementStore
+
+
+def make_store():
+    """Store with two interleaved channels of one test"""
+    store = MeasurementStore()
+    for i in range(5):
+        store.append('TC-HEAT-005', 'temperature', 20.0 + i, 'C', 1000.0 + i)
+        store.append('TC-HEAT-005', 'duty', 10.0 * i, '%', 1000.5 + i)
+    return store
+
+
+class TestMeasurementChannel:
+    """Growable per-channel sample arrays"""
+    
+    def test_append_and_extend_grow_past_capacity(self):
+        """Samples survive reallocation and keep their order"""
+        channel = MeasurementChannel('TC-X-001', 'pressure', 'kPa', capacity=2)
+        for i in range(5):
+            channel.append(float(i), i * 2.0)
+        channel.extend(np.arange(5, 100, dtype=float), np.arange(5, 100) * 2.0)
+        assert channel.size == 100
+        np.testing.assert_array_equal(channel.timestamps, np.arange(100))
+        np.testing.assert_array_equal(channel.values, np.arange(100) * 2.0)
+    
+    def test_extend_rejects_mismatched_shapes(self):
+        """extend() needs one timestamp per value"""
+        channel = MeasurementChannel('TC-X-001', 'pressure', 'kPa')
+        with pytest.raises(ValueError):
+            channel.extend([1.0, 2.0], [1.0])
+
+
+class TestMeasurementStore:
+    """Channel bookkeeping and the list-of-dicts view"""
+    
+    def test_unit_change_rejected(self):
+        """A channel keeps the unit of its first sample"""
+        store = make_store()
+        with pytest.raises(ValueError):
+            store.append('TC-HEAT-005', 'temperature', 300.0, 'K', 2000.0)
+    
+    def test_list_compatibility(self):
+        """len(), iteration and indexing follow the order samples were logged"""
+        store = make_store()
+        assert len(store) == 10
+        records = list(store)
+        assert [r['measurement'] for r in records[:4]] == ['temperature', 'duty'] * 2
+        assert records == list(store.records())
+        assert store[0]['value'] == 20.0
+        assert store[-1] == records[-1]
+        assert store[-1]['measurement'] == 'duty' and store[-1]['value'] == 40.0
+        assert store[2:4] == records[2:4]
+        with pytest.raises(IndexError):
+            MeasurementStore()[-1]
+    
+    def test_order_sorted_once(self, monkeypatch):
+        """Indexing in a loop reuses one sort until new samples arrive"""
+        store = make_store()
+        sorts = []
+        argsort = np.argsort
+        monkeypatch.setattr(np, 'argsort', lambda *args, **kwargs: sorts.append(1) or argsort(*args, **kwargs))
+        values = [store[i]['value'] for i in range(len(store))]
+        assert values == [r['value'] for r in store]
+        assert len(sorts) == 1
+        
+        store.append('TC-HEAT-005', 'temperature', 99.0, 'C', 999.0)
+        assert store[0]['value'] == 99.0
+        store.channel('TC-HEAT-005', 'duty').extend([2000.0], [77.0])
+        assert store[-1]['value'] == 77.0
+        assert len(sorts) == 3
+    
+    def test_clear(self):
+        """clear() drops every channel"""
+        store = make_store()
+        assert len(list(store)) == 10
+        store.clear()
+        assert len(store) == 0
+        assert list(store) == []
+        assert store.channels() == []
+        store.append('TC-X-001', 'pressure', 1.0, 'kPa', 1.0)
+        assert [r['measurement'] for r in store] == ['pressure']
+
+
+class TestMeasurementExport:
+    """.npz export through the DataLogger and loading it back"""
+    
+    def test_npz_round_trip(self, tmp_path):
+        """load_measurements restores every channel exactly"""
+        data_logger = DataLogger(str(tmp_path / 'results.csv'))
+        for i in range(50):
+            data_logger.log_measurement('TC-MASS-004', 'pressure', 1.5 * i, 'kPa')
+            data_logger.log_measurement('TC-HEAT-005', 'temperature', 20.0 + i / 10, 'C')
+        data_logger.export_measurements(str(tmp_path / 'measurements.npz'))
+        data_logger.close()
+        
+        loaded = load_measurements(str(tmp_path / 'measurements.npz'))
+        assert len(loaded) == len(data_logger.measurements) == 100
+        for original in data_logger.measurements.channels():
+            channel = loaded.channel(original.test_id, original.name)
+            assert channel.unit == original.unit
+            np.testing.assert_array_equal(channel.timestamps, original.timestamps)
+            np.testing.assert_array_equal(channel.values, original.values)
+    
+    def test_empty_store_round_trip(self, tmp_path):
+        """An empty store exports and loads back empty"""
+        MeasurementStore().save_npz(str(tmp_path / 'empty.npz'))
+        assert len(MeasurementStore.load_npz(str(tmp_path / 'empty.npz'))) == 0
@@ -0,0 +1,155 @@
+"""
+Online Statistics Tests
+Quantile sketch accuracy and merging, Welford statistics against numpy
+"""
+
+import numpy as np
+import pytest
+
+from utilities.online_stats import OnlineStatistics, QuantileSketch
+from utilities.signal_generator import WaveformAnalyzer
+
+
+QUANTILES = [0.0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1.0]
+
+
+def samples(seed=7, size=20000):
+    """Mixed-sign samples over several decades, with some exact zeros"""
+    rng = np.random.default_rng(seed)
+    values = np.concatenate([rng.lognormal(2.0, 1.5, size), -rng.lognormal(0.0, 1.0, size // 4),
+                             np.zeros(size // 10)])
+    rng.shuffle(values)
+    return values
+
+
+def assert_within_accuracy(sketch, values, accuracy):
+    """Every quantile is within relative accuracy of the lower-rank sample value"""
+    for q in QUANTILES:
+        expected = np.quantile(values, q, method='lower')
+        assert sketch.quantile(q) == pytest.approx(expected, rel=accuracy, abs=1e-12), q
+
+
+class TestQuantileSketch:
+    """Relative accuracy, merging and bucket collapsing"""
+    
+    @pytest.mark.parametrize('accuracy', [0.01, 0.05])
+    def test_quantiles_within_relative_accuracy(self, accuracy):
+        """add_many() and add() give the same sketch, accurate to relative_accuracy"""
+        values = samples()
+        sketch = QuantileSketch(accuracy)
+        sketch.add_many(values)
+        assert_within_accuracy(sketch, values, accuracy)
+        
+        one_by_one = QuantileSketch(accuracy)
+        for value in values[:2000]:
+            one_by_one.add(float(value))
+        batch = QuantileSketch(accuracy)
+        batch.add_many(values[:2000])
+        assert [one_by_one.quantile(q) for q in QUANTILES] == [batch.quantile(q) for q in QUANTILES]
+    
+    def test_lower_rank_convention(self):
+        """Quantiles take the sample at rank floor(q * (count - 1)), no interpolation"""
+        sketch = QuantileSketch()
+        sketch.add_many([-5.0, -1.0, 0.0, 1.0, 5.0])
+        assert sketch.quantile(0.95) == pytest.approx(1.0, rel=0.01)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(0.0) == pytest.approx(-5.0, rel=0.01)
+        assert QuantileSketch().quantile(0.5) is None
+        with pytest.raises(ValueError):
+            sketch.quantile(1.5)
+    
+    def test_merge_equals_combined_data(self):
+        """Merging per-worker sketches gives the sketch of all their samples"""
+        values = samples()
+        combined = QuantileSketch()
+        combined.add_many(values)
+        merged = QuantileSketch()
+        for part in np.array_split(values, 4):
+            sketch = QuantileSketch()
+            sketch.add_many(part)
+            merged.merge(sketch)
+        assert merged.count == combined.count
+        assert [merged.quantile(q) for q in QUANTILES] == [combined.quantile(q) for q in QUANTILES]
+        with pytest.raises(ValueError):
+            merged.merge(QuantileSketch(0.05))
+    
+    def test_collapse_keeps_upper_quantiles(self):
+        """Past max_buckets the smallest magnitudes fold together; high quantiles stay accurate"""
+        values = np.geomspace(1e-6, 1e6, 5000)
+        sketch = QuantileSketch(max_buckets=100)
+        sketch.add_many(values)
+        assert len(sketch._positive) <= 100
+        assert sketch.count == len(values)
+        # 100 buckets of 1% cover the top ~7x of the values: those stay accurate
+        for q in (0.95, 0.99, 1.0):
+            assert sketch.quantile(q) == pytest.approx(np.quantile(values, q, method='lower'), rel=0.01)
+        # Below that everything shares one bucket and is over-estimated, never under
+        for q in (0.01, 0.5, 0.9):
+            assert sketch.quantile(q) >= np.quantile(values, q, method='lower')
+        
+        one_by_one = QuantileSketch(max_buckets=100)
+        for value in values:
+            one_by_one.add(float(value))
+        assert len(one_by_one._positive) <= 100
+        assert one_by_one.quantile(0.99) == pytest.approx(sketch.quantile(0.99))
+
+
+class TestOnlineStatistics:
+    """Welford mean and variance, merging and the statistics summary"""
+    
+    def test_matches_numpy(self):
+        """Mean, std_dev, min and max agree with numpy, per sample and per array"""
+        values = samples()
+        per_sample = OnlineStatistics()
+        for value in values:
+            per_sample.update(float(value))
+        per_array = OnlineStatistics()
+        for chunk in np.array_split(values, 7):
+            per_array.update_many(chunk)
+        for stats in (per_sample, per_array):
+            assert stats.count == len(values)
+            assert stats.mean == pytest.approx(values.mean(), rel=1e-12)
+            assert stats.std_dev == pytest.approx(values.std(), rel=1e-9)
+            assert (stats.min, stats.max) == (values.min(), values.max())
+    
+    def test_large_offset_is_stable(self):
+        """A small spread on a large offset keeps its variance"""
+        values = 1e9 + np.random.default_rng(1).normal(0.0, 0.01, 10000)
+        stats = OnlineStatistics()
+        for chunk in np.array_split(values, 10):
+            stats.update_many(chunk)
+        assert stats.std_dev == pytest.approx(values.std(), rel=1e-6)
+    
+    def test_merge_equals_combined_data(self):
+        """Merging accumulators gives the statistics of all samples together"""
+        values = samples()
+        combined = OnlineStatistics()
+        combined.update_many(values)
+        merged = OnlineStatistics()
+        for part in np.array_split(values, 3):
+            stats = OnlineStatistics()
+            stats.update_many(part)
+            merged.merge(stats)
+        merged.merge(OnlineStatistics())
+        summary, expected = merged.summary(), combined.summary()
+        assert summary.keys() == expected.keys()
+        for key in summary:
+            assert summary[key] == pytest.approx(expected[key], rel=1e-12), key
+    
+    def test_quantiles_clamped_to_range(self):
+        """Quantiles never leave the exact min and max"""
+        stats = OnlineStatistics()
+        stats.update_many([10.04, 10.04, 10.04])
+        assert stats.quantile(0.0) == stats.quantile(1.0) == 10.04
+        assert OnlineStatistics().quantile(0.5) is None
+    
+    def test_calculate_statistics(self):
+        """WaveformAnalyzer.calculate_statistics returns the summary; {} for no samples"""
+        values = samples()
+        result = WaveformAnalyzer.calculate_statistics(values)
+        assert result['count'] == len(values)
+        assert result['range'] == pytest.approx(values.max() - values.min())
+        for key, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            assert result[key] == pytest.approx(np.quantile(values, q, method='lower'), rel=0.01)
+        assert WaveformAnalyzer.calculate_statistics([]) == {}
+        assert WaveformAnalyzer.calculate_statistics(np.array([])) == {}
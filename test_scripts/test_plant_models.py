@@ -0,0 +1,219 @@
+"""
+Plant Model Tests
+Exact-discretisation thermal and pneumatic models against step-by-step integration
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from utilities.plant_models import PneumaticPlant, ThermalPlant
+
+
+def euler_temperature(plant, duration, dt=1e-3):
+    """Integrate C * dT/dt = P * duty(T) - (T - T_amb) / R with small forward Euler steps"""
+    temp = plant.temperature
+    power = plant.available_power()
+    t_on, t_off = plant._thresholds()
+    for _ in range(int(round(duration / dt))):
+        if temp <= t_on:
+            duty = 1.0
+        elif temp >= t_off:
+            duty = 0.0
+        else:
+            duty = (t_off - temp) / (t_off - t_on)
+        flow = power * duty - (temp - plant.ambient_temp) / plant.thermal_resistance
+        temp += dt * flow / plant.thermal_mass
+    return temp
+
+
+def stepwise_temperature(plant, n_steps):
+    """Exact one-step update with the thermostat region chosen at every step"""
+    temp = plant.temperature
+    power = plant.available_power()
+    t_on, t_off = plant._thresholds()
+    loss = 1.0 / (plant.thermal_resistance * plant.thermal_mass)
+    trajectory = []
+    for _ in range(n_steps):
+        if power <= 0 or temp >= t_off:
+            gain, bias = 0.0, 0.0
+        elif temp <= t_on:
+            gain, bias = 0.0, power
+        else:
+            gain = power / ((t_off - t_on) * plant.thermal_mass)
+            bias = gain * t_off * plant.thermal_mass
+        beta = loss + gain
+        t_eq = (loss * plant.ambient_temp + bias / plant.thermal_mass) / beta
+        temp = t_eq + (temp - t_eq) * math.exp(-beta * plant.step_time)
+        trajectory.append(temp)
+    return np.array(trajectory)
+
+
+def heating_plant(intensity=2, step_time=0.01):
+    """Enabled thermal plant at ambient temperature"""
+    plant = ThermalPlant(step_time=step_time)
+    plant.set_command(True, intensity)
+    return plant
+
+
+def massage_plant(pattern=PneumaticPlant.PATTERN_CONTINUOUS, intensity=2, **kwargs):
+    """Enabled pneumatic plant with deflated bladders"""
+    plant = PneumaticPlant(**kwargs)
+    plant.set_command(True, intensity, pattern)
+    return plant
+
+
+class TestThermalPlant:
+    """Closed-form heater steps, thermostat regions and the over-temperature cutoff"""
+    
+    def test_closed_form_matches_euler_integration(self):
+        """A long advance() agrees with fine Euler integration through every region"""
+        for duration in (30.0, 200.0, 600.0):
+            reference = euler_temperature(heating_plant(), duration)
+            plant = heating_plant()
+            plant.advance(int(round(duration / plant.step_time)))
+            assert plant.temperature == pytest.approx(reference, abs=0.01), duration
+    
+    def test_segments_match_per_step_update(self):
+        """simulate() switches region exactly where a per-step update does"""
+        plant = heating_plant(intensity=3)
+        expected = stepwise_temperature(plant, 60000)
+        trajectory = plant.simulate(60000)
+        np.testing.assert_allclose(trajectory, expected, rtol=1e-9)
+        assert plant.temperature == trajectory[-1]
+        
+        plant = heating_plant(intensity=3)
+        assert plant.advance(60000) == pytest.approx(expected[-1], rel=1e-12)
+    
+    def test_thermostat_crossing_time(self):
+        """Full power until setpoint - 1°C, reached at the analytic first-order time"""
+        plant = heating_plant(intensity=2)
+        trajectory = plant.simulate(20000)
+        t_on, _ = plant._thresholds()
+        # Full power: T_eq = 20 + 50 W * 1 K/W = 70°C with a 85 s time constant
+        expected = 85.0 * math.log((70.0 - 20.0) / (70.0 - t_on))
+        crossing = int(np.argmax(trajectory >= t_on)) + 1
+        assert crossing * plant.step_time == pytest.approx(expected, abs=plant.step_time)
+        assert plant.duty_cycle() < 1.0
+    
+    def test_thermostat_holds_setpoint_band(self):
+        """In steady state the temperature stays within the hysteresis band"""
+        for intensity, setpoint in ThermalPlant.SETPOINTS.items():
+            plant = heating_plant(intensity)
+            plant.advance(200000)
+            assert setpoint - 1.0 < plant.temperature < setpoint + 2.0, intensity
+            assert 0.0 < plant.duty_cycle() < 1.0
+            assert not plant.shutdown
+    
+    def test_supply_voltage_scales_power(self):
+        """Heater power goes with the square of the supply voltage"""
+        plant = heating_plant(intensity=3)
+        plant.supply_voltage = ThermalPlant.NOMINAL_VOLTAGE / 2
+        assert plant.heater_power() == pytest.approx(70.0 / 4)
+    
+    def test_over_temperature_cutoff(self):
+        """Above the cutoff the heater latches off until a disable command"""
+        plant = heating_plant(intensity=3)
+        plant.set_temperature(70.0)
+        assert plant.shutdown and plant.heater_power() == 0.0
+        plant.advance(10000)
+        assert plant.temperature < 70.0 and plant.shutdown
+        plant.set_command(False, 3)
+        assert not plant.shutdown
+    
+    def test_disabled_plant_cools_to_ambient(self):
+        """Without power the seat relaxes exponentially to ambient"""
+        plant = ThermalPlant(step_time=0.01)
+        plant.set_temperature(45.0)
+        plant.advance(int(85.0 / 0.01))
+        assert plant.temperature == pytest.approx(20.0 + 25.0 * math.exp(-1.0), rel=1e-9)
+
+
+class TestPneumaticPlant:
+    """Pump fill, relief valve, pattern sequencing and supervision deadlines"""
+    
+    def test_fill_is_first_order(self):
+        """Continuous pattern fills towards the setpoint with the fill time constant"""
+        plant = massage_plant(intensity=2)
+        trajectory = plant.simulate(1000)
+        t = np.arange(1, 1001) * plant.step_time
+        np.testing.assert_allclose(trajectory, 100.0 * (1 - np.exp(-t / 0.15)), rtol=1e-9)
+        assert plant.pressure == trajectory[-1]
+        assert plant.target_reached
+    
+    def test_simulate_matches_advance(self):
+        """simulate() and advance() end at the same state for every pattern"""
+        for pattern in (PneumaticPlant.PATTERN_WAVE, PneumaticPlant.PATTERN_PULSE,
+                        PneumaticPlant.PATTERN_CONTINUOUS):
+            simulated, advanced = massage_plant(pattern), massage_plant(pattern)
+            trajectory = simulated.simulate(7321)
+            advanced.advance(7321)
+            assert trajectory[-1] == pytest.approx(advanced.pressure, rel=1e-12), pattern
+            assert simulated.zone_state() == advanced.zone_state()
+    
+    def test_relief_valve_clamps_pressure(self):
+        """A stuck regulator drives towards 200 kPa but the relief valve holds 150 kPa"""
+        plant = massage_plant(intensity=3)
+        plant.regulator_failed = True
+        trajectory = plant.simulate(2000)
+        assert trajectory.max() == plant.relief_pressure
+        assert plant.pressure == plant.relief_pressure and plant.relief_active
+        plant.regulator_failed = False
+        plant.advance(5000)
+        assert plant.pressure == pytest.approx(120.0) and not plant.relief_active
+    
+    def test_pulse_pattern(self):
+        """Pump and all zones on for 0.5 s, then off and holding for 0.5 s"""
+        plant = massage_plant(PneumaticPlant.PATTERN_PULSE)
+        states = []
+        for _ in range(4):
+            states.append((plant.pump_on(), plant.zone_state()['left_active']))
+            plant.advance(500)
+        assert states == [(True, True), (False, False)] * 2
+        trajectory = massage_plant(PneumaticPlant.PATTERN_PULSE).simulate(1000)
+        # Off phase leaks slowly with the hold time constant
+        assert trajectory[999] == pytest.approx(trajectory[499] * math.exp(-0.5 / 5.0), rel=1e-9)
+    
+    def test_wave_pattern(self):
+        """Zones open in turn every second; each switch loses 5% of the pressure"""
+        plant = massage_plant(PneumaticPlant.PATTERN_WAVE)
+        order = []
+        for _ in range(5):
+            order.append([zone for zone, active in plant.zone_state().items() if active])
+            before = plant.pressure
+            plant.advance(1000)
+        assert order == [['left_active'], ['center_active'], ['right_active'], ['center_active'],
+                         ['left_active']]
+        # The last second started at the previous value; its end pressure includes the switch loss
+        expected = 100.0 + (before - 100.0) * math.exp(-1.0 / 0.15)
+        assert plant.pressure == pytest.approx(expected * 0.95, rel=1e-9)
+    
+    def test_fault_timeout(self):
+        """A failed pump that never reaches 80% of target faults after 10 s and bleeds down"""
+        plant = massage_plant()
+        plant.pump_failed = True
+        plant.advance(9999)
+        assert not plant.fault and plant.running
+        plant.advance(1)
+        assert plant.fault and not plant.running and not plant.pump_on()
+        assert plant.zone_state() == {'left_active': False, 'center_active': False, 'right_active': False}
+        
+        plant.pump_failed = False
+        plant.set_command(False, 2, PneumaticPlant.PATTERN_CONTINUOUS)
+        plant.set_command(True, 2, PneumaticPlant.PATTERN_CONTINUOUS)
+        assert not plant.fault and plant.run_time == 0.0
+        plant.advance(20000)
+        assert not plant.fault and plant.target_reached
+    
+    def test_auto_shutdown(self):
+        """Massage switches itself off after 1800 s of running, then bleeds to 0 kPa"""
+        plant = massage_plant(PneumaticPlant.PATTERN_WAVE)
+        plant.advance(1800 * 1000 - 1)
+        assert plant.running
+        plant.advance(1)
+        assert plant.shutdown and not plant.running
+        assert plant.run_time == pytest.approx(1800.0)
+        plant.advance(20000)
+        assert plant.pressure == pytest.approx(0.0, abs=0.01)
+        assert plant.run_time == pytest.approx(1800.0)
@@ -0,0 +1,93 @@
+"""
+Results Database Tests
+Trend queries over a seeded SQLite results history
+"""
+
+import numpy as np
+import pytest
+
+from utilities.data_logger import DataLogger
+from utilities.results_db import ResultsDatabase
+
+
+# Status of each test in sessions S0..S5, oldest first
+HISTORY = {
+    'TC-HEAT-001': ['PASS'] * 6,
+    'TC-HEAT-002': ['FAIL'] * 6,
+    'TC-MASS-001': ['PASS', 'FAIL', 'PASS', 'FAIL', 'PASS', 'FAIL'],
+    'TC-MASS-002': ['PASS', 'PASS', 'PASS', 'FAIL', 'PASS', 'PASS'],
+}
+
+
+@pytest.fixture
+def seeded_db(tmp_path):
+    """Database holding HISTORY, durations 1..6s per test in session order"""
+    db = ResultsDatabase(tmp_path / 'results.db', batch_size=4)
+    for session in range(6):
+        for test_id, statuses in HISTORY.items():
+            db.add_result(f'S{session}', test_id, statuses[session], 'message',
+                          f'2026-01-0{session + 1}T00:00:00', float(session + 1), 'TestClass')
+    yield db
+    db.close()
+
+
+class TestResultsQueries:
+    """History, percentile, flake rate and count queries"""
+    
+    def test_history_newest_first(self, seeded_db):
+        """history() returns a test's runs newest first, limited to last_runs"""
+        history = seeded_db.history('TC-MASS-001', last_runs=3)
+        assert [run['session_id'] for run in history] == ['S5', 'S4', 'S3']
+        assert [run['status'] for run in history] == ['FAIL', 'PASS', 'FAIL']
+        assert history[0]['duration'] == 6.0
+        assert seeded_db.history('TC-UNKNOWN') == []
+    
+    def test_duration_percentile(self, seeded_db):
+        """duration_percentile() matches numpy over the last runs"""
+        assert seeded_db.duration_percentile('TC-HEAT-001', 95) == pytest.approx(
+            np.percentile([1, 2, 3, 4, 5, 6], 95))
+        assert seeded_db.duration_percentile('TC-HEAT-001', 50, last_runs=2) == pytest.approx(5.5)
+        assert seeded_db.duration_percentile('TC-UNKNOWN') is None
+    
+    def test_flake_rates(self, seeded_db):
+        """Steady tests score 0, an alternating test scores 1"""
+        rates = seeded_db.flake_rates()
+        assert set(rates) == set(HISTORY)
+        assert rates['TC-HEAT-001'] == {'runs': 6, 'failures': 0, 'fail_rate': 0.0, 'flake_rate': 0.0}
+        assert rates['TC-HEAT-002']['fail_rate'] == 1.0
+        assert rates['TC-HEAT-002']['flake_rate'] == 0.0
+        assert rates['TC-MASS-001']['flake_rate'] == 1.0
+        assert rates['TC-MASS-002']['failures'] == 1
+        assert rates['TC-MASS-002']['flake_rate'] == pytest.approx(2 / 5)
+        # Only the last runs count: S3..S5 of TC-MASS-002 are FAIL, PASS, PASS
+        assert seeded_db.flake_rates(last_runs=3)['TC-MASS-002']['flake_rate'] == pytest.approx(1 / 2)
+    
+    def test_status_counts_and_sessions(self, seeded_db):
+        """Counts per status overall and per session; sessions newest first"""
+        assert seeded_db.status_counts() == {'PASS': 14, 'FAIL': 10}
+        assert seeded_db.status_counts('S3') == {'PASS': 1, 'FAIL': 3}
+        assert seeded_db.sessions(limit=2) == ['S5', 'S4']
+
+
+class TestResultsPersistence:
+    """Batched inserts and the DataLogger hook"""
+    
+    def test_results_survive_reopen(self, tmp_path):
+        """Queued results are committed on close and read back by a new connection"""
+        with ResultsDatabase(tmp_path / 'results.db', batch_size=100) as db:
+            db.add_result('S0', 'TC-HEAT-001', 'PASS', 'ok', '2026-01-01T00:00:00')
+        with ResultsDatabase(tmp_path / 'results.db') as db:
+            assert db.status_counts() == {'PASS': 1}
+    
+    def test_data_logger_records_results(self, tmp_path):
+        """DataLogger persists each result with its session, class and duration"""
+        with ResultsDatabase(tmp_path / 'results.db') as db:
+            with DataLogger(str(tmp_path / 'results.csv'), results_db=db, session_id='S9') as data_logger:
+                data_logger.set_context('TestHeatingBasics', ['heating'])
+                data_logger.log_test('TC-HEAT-001', 'PASS', 'ok')
+                data_logger.log_error('TC-HEAT-002', 'too cold')
+            history = db.history('TC-HEAT-002')
+            assert [(run['session_id'], run['status'], run['message']) for run in history] == \
+                [('S9', 'FAIL', 'too cold')]
+            assert history[0]['duration'] >= 0.0
+            assert db.status_counts('S9') == {'PASS': 1, 'FAIL': 1}
@@ -0,0 +1,149 @@
+"""
+Shard Merge Tests
+Discovery of per-worker shards and their deterministic merge after a parallel run
+"""
+
+import gzip
+import json
+
+from utilities.can_replay import PACING_FAST, TraceReplayBus
+from utilities.can_trace import DIRECTION_MARK, DIRECTION_RX, CANTraceRecorder, read_trace
+from utilities.clock import create_clock
+from utilities.shard_merge import (
+    WORKER_ENV, find_shards, merge_csv_shards, merge_directory, merge_log_shards,
+    merge_trace_shards, rotated_backups, shard_path
+)
+
+
+def log_record(second, worker, text):
+    """One execution log line at a given second"""
+    return f'2026-01-01 10:00:{second:02d},000 - {worker} - INFO - {text}\n'
+
+
+def write_gzip(path, text):
+    """Write a gzip-compressed rotated backup"""
+    with gzip.open(path, 'wt') as f:
+        f.write(text)
+
+
+def record_worker_trace(trace_file, tests):
+    """Worker trace of (start time, test name, payload) segments of five status frames"""
+    with CANTraceRecorder(trace_file) as recorder:
+        for start, test_name, payload in tests:
+            recorder.mark(start, test_name)
+            for i in range(5):
+                recorder.record({'arbitration_id': 0x200, 'data': bytes([payload, i]),
+                                 'timestamp': start + 0.5 + i * 0.1}, DIRECTION_RX)
+
+
+class TestShardDiscovery:
+    """Worker shard naming and lookup"""
+    
+    def test_shard_path(self, monkeypatch):
+        """Workers insert their name before the suffix; serial runs keep the path"""
+        monkeypatch.delenv(WORKER_ENV, raising=False)
+        assert str(shard_path('reports/heating_tests.log')) == 'reports/heating_tests.log'
+        monkeypatch.setenv(WORKER_ENV, 'gw3')
+        assert str(shard_path('reports/heating_tests.log')) == 'reports/heating_tests.gw3.log'
+        assert str(shard_path('reports/x.jsonl', worker='gw0')) == 'reports/x.gw0.jsonl'
+    
+    def test_find_shards_in_worker_order(self, tmp_path):
+        """Shards sort by worker number; other files and backups are not shards"""
+        for name in ('x.gw10.log', 'x.gw2.log', 'x.gw0.log', 'x.log', 'x.gw0.log.1.gz',
+                     'y.gw0.log', 'x.gw1.jsonl'):
+            (tmp_path / name).write_text('')
+        shards = find_shards(tmp_path / 'x.log')
+        assert [worker for worker, _ in shards] == ['gw0', 'gw2', 'gw10']
+        assert find_shards(tmp_path / 'missing' / 'x.log') == []
+    
+    def test_rotated_backups_oldest_first(self, tmp_path):
+        """The highest backup number is the oldest"""
+        for name in ('x.gw0.log.1.gz', 'x.gw0.log.10.gz', 'x.gw0.log.2.gz', 'x.gw1.log.1.gz'):
+            (tmp_path / name).write_text('')
+        assert [path.name for path in rotated_backups(tmp_path / 'x.gw0.log')] == \
+            ['x.gw0.log.10.gz', 'x.gw0.log.2.gz', 'x.gw0.log.1.gz']
+
+
+class TestMerge:
+    """Merged files are ordered by timestamp, then worker, then record order"""
+    
+    def test_csv_shards(self, tmp_path):
+        """CSV rows of all workers are appended to the base file in time order"""
+        base = tmp_path / 'heating_tests.log'
+        base.write_text('2026-01-01T09:00:00,TC-000,PASS,serial\n')
+        (tmp_path / 'heating_tests.gw1.log').write_text(
+            '2026-01-01T10:00:01,TC-002,PASS,a\n2026-01-01T10:00:03,TC-004,FAIL,b\n')
+        (tmp_path / 'heating_tests.gw0.log').write_text(
+            '2026-01-01T10:00:01,TC-001,PASS,c\n2026-01-01T10:00:02,TC-003,PASS,d\n')
+        assert merge_csv_shards(base) == 4
+        assert [line.split(',')[1] for line in base.read_text().splitlines()] == \
+            ['TC-000', 'TC-001', 'TC-002', 'TC-003', 'TC-004']
+        assert find_shards(base) == []
+    
+    def test_log_shards_with_rotated_backups(self, tmp_path):
+        """Rotated backups are decompressed and merged before the current shard"""
+        base = tmp_path / 'test_execution.log'
+        write_gzip(tmp_path / 'test_execution.gw0.log.2.gz', log_record(1, 'gw0', 'first'))
+        write_gzip(tmp_path / 'test_execution.gw0.log.1.gz',
+                   log_record(3, 'gw0', 'failed') + 'Traceback (most recent call last):\n  boom\n')
+        (tmp_path / 'test_execution.gw0.log').write_text(log_record(5, 'gw0', 'last'))
+        (tmp_path / 'test_execution.gw1.log').write_text(
+            log_record(2, 'gw1', 'second') + log_record(3, 'gw1', 'tie'))
+        
+        assert merge_log_shards(base) == 5
+        lines = base.read_text().splitlines()
+        assert [line.rsplit(' - ', 1)[1] for line in lines if line.startswith('2026')] == \
+            ['first', 'second', 'failed', 'tie', 'last']
+        # The traceback stays with its record
+        assert lines[3:5] == ['Traceback (most recent call last):', '  boom']
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['test_execution.log']
+    
+    def test_merge_directory(self, tmp_path):
+        """Every shard kind in a report directory is found and merged"""
+        (tmp_path / 'test_execution.gw0.log').write_text(log_record(2, 'gw0', 'current'))
+        write_gzip(tmp_path / 'test_execution.gw0.log.1.gz', log_record(1, 'gw0', 'rotated'))
+        (tmp_path / 'massage_tests.gw0.log').write_text('2026-01-01T10:00:01,TC-001,PASS,a\n')
+        for worker, test_id, status in (('gw0', 'TC-001', 'PASS'), ('gw1', 'TC-002', 'FAIL')):
+            (tmp_path / f'massage_tests.{worker}.jsonl').write_text(json.dumps({
+                'type': 'result', 'timestamp': f'2026-01-01T10:00:0{worker[-1]}',
+                'test_id': test_id, 'status': status, 'message': '', 'details': {}
+            }) + '\n')
+        
+        summary = merge_directory(tmp_path)
+        assert (summary['total_tests'], summary['passed'], summary['failed']) == (2, 1, 1)
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            'combined_report.html', 'combined_report.json', 'massage_tests.log',
+            'test_execution.log'
+        ]
+        assert 'rotated' in (tmp_path / 'test_execution.log').read_text().splitlines()[0]
+        report = json.loads((tmp_path / 'combined_report.json').read_text())
+        assert [result['test_id'] for result in report['test_results']] == ['TC-001', 'TC-002']
+    
+    def test_trace_shards_merged_by_segment(self, tmp_path):
+        """Worker traces merge into one replayable trace, each test's segment kept whole"""
+        base = tmp_path / 'can_trace.bin'
+        # Overlapping time ranges, as with workers on their own virtual clocks
+        record_worker_trace(tmp_path / 'can_trace.gw0.bin', ((1000.0, 'test_a.py::test_one', 1),
+                                                             (1001.0, 'test_a.py::test_two', 2)))
+        record_worker_trace(tmp_path / 'can_trace.gw1.bin', ((1000.0, 'test_b.py::test_one', 3),
+                                                             (1000.2, 'test_b.py::test_two', 4)))
+        
+        assert merge_trace_shards(base) == 24
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['can_trace.bin']
+        records = read_trace(base)
+        marks = records['direction'] == DIRECTION_MARK
+        assert marks.nonzero()[0].tolist() == [0, 6, 12, 18]
+        # Segments ordered by marker time, then worker; frames stay after their own marker
+        assert records['data'][~marks][:, 0].tolist() == [1] * 5 + [3] * 5 + [4] * 5 + [2] * 5
+        
+        clock = create_clock('virtual')
+        bus = TraceReplayBus(base, clock, PACING_FAST)
+        for test_name, payload in (('test_b.py::test_two', 4), ('test_a.py::test_two', 2)):
+            bus.next_segment(test_name)
+            frames = [bus.recv(timeout=1.0) for _ in range(5)]
+            assert [frame['data'] for frame in frames] == [bytes([payload, i]) for i in range(5)]
+            assert bus.recv(timeout=1.0) is None
+        
+        # Nothing to merge leaves an existing trace alone
+        assert merge_trace_shards(base) == 0
+        assert len(read_trace(base)) == 24
@@ -0,0 +1,289 @@
+"""
+Signal Generator Tests
+Vectorized and streamed signals against the per-sample reference formulas,
+and step response analysis
+"""
+
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from utilities.signal_generator import SignalGenerator, WaveformAnalyzer
+
+
+def reference_ramp(start_value, end_value, duration, step_time=0.01):
+    num_steps = int(duration / step_time)
+    return [start_value + (end_value - start_value) * (i / num_steps) for i in range(num_steps)]
+
+
+def reference_sine(amplitude, frequency, duration, step_time=0.01):
+    return [amplitude * math.sin(2 * math.pi * frequency * i * step_time)
+            for i in range(int(duration / step_time))]
+
+
+def reference_square(low_value, high_value, frequency, duration, step_time=0.01):
+    """Per-sample square wave; a sample that lies on an edge takes the new level"""
+    period = 1.0 / frequency if frequency > 0 else 1.0
+    # Rounding stands in for exact arithmetic, where the float modulo rounds either way
+    return [high_value if round(((i * step_time) % period) / period, 9) % 1.0 < 0.5 else low_value
+            for i in range(int(duration / step_time))]
+
+
+def reference_overshoot(start, end, num_steps, overshoot_fraction, overshoot_percent,
+                        rise_rate, settle_rate):
+    overshoot_point = int(num_steps * overshoot_fraction)
+    peak = end + (end - start) * (overshoot_percent / 100.0)
+    values = []
+    for i in range(num_steps):
+        if i < overshoot_point:
+            t = i / overshoot_point
+            values.append(start + (peak - start) * (1 - math.exp(-rise_rate * t)))
+        else:
+            t = (i - overshoot_point) / (num_steps - overshoot_point)
+            values.append(peak - (peak - end) * (1 - math.exp(-settle_rate * t)))
+    return values
+
+
+class TestArraySignals:
+    """*_array methods reproduce the per-sample formulas"""
+    
+    def test_ramp(self):
+        """Linear ramp from start towards end"""
+        np.testing.assert_allclose(SignalGenerator.generate_ramp_array(10.0, 50.0, 30.0),
+                                   reference_ramp(10.0, 50.0, 30.0), rtol=1e-12)
+    
+    @pytest.mark.parametrize('frequency', [0.5, 7.3, 49.0])
+    def test_sine(self, frequency):
+        """Sine samples match sin(2*pi*f*t)"""
+        np.testing.assert_allclose(SignalGenerator.generate_sine_wave_array(3.0, frequency, 60.0),
+                                   reference_sine(3.0, frequency, 60.0), atol=1e-9)
+    
+    @pytest.mark.parametrize('frequency', [0.25, 1.0, 1.3, 10.0, 33.0])
+    def test_square(self, frequency):
+        """Square levels match, including samples that fall on an edge"""
+        np.testing.assert_array_equal(
+            SignalGenerator.generate_square_wave_array(0.0, 5.0, frequency, 20.0),
+            reference_square(0.0, 5.0, frequency, 20.0)
+        )
+    
+    def test_step_response(self):
+        """Initial value up to the step, step value after"""
+        values = SignalGenerator.generate_step_response_array(1.0, 4.0, 0.5, 2.0)
+        assert len(values) == 200
+        assert (values[:50] == 1.0).all() and (values[50:] == 4.0).all()
+    
+    def test_temperature_ramp(self):
+        """Exponential rise to the overshoot at 70%, then settling"""
+        np.testing.assert_allclose(
+            SignalGenerator.generate_temperature_ramp_array(20.0, 45.0, 60.0, 5.0),
+            reference_overshoot(20.0, 45.0, 6000, 0.7, 5.0, 3, 2), rtol=1e-12
+        )
+    
+    def test_pressure_buildup(self):
+        """Overshoot at 80%, never below the start pressure"""
+        expected = np.maximum(reference_overshoot(5.0, 120.0, 500, 0.8, 10.0, 4, 3), 5.0)
+        np.testing.assert_allclose(SignalGenerator.generate_pressure_buildup_array(5.0, 120.0, 5.0),
+                                   expected, rtol=1e-12)
+    
+    def test_random_signals_follow_their_distribution(self):
+        """Noise, CAN timing and jitter stay within their parameters"""
+        rng = np.random.default_rng(3)
+        noise = SignalGenerator.generate_noise_array(2.0, 0.5, 1000.0, rng=rng)
+        assert len(noise) == 100000
+        assert noise.mean() == pytest.approx(2.0, abs=0.01)
+        assert noise.std() == pytest.approx(0.5, rel=0.02)
+        intervals = SignalGenerator.generate_realistic_can_timing_array(0.1, 5.0, 10000, rng=rng)
+        assert intervals.min() >= 0.095 and intervals.max() <= 0.105
+        jittered = SignalGenerator.generate_jitter_array(np.zeros(1000), 0.0, rng=rng)
+        np.testing.assert_array_equal(jittered, np.zeros(1000))
+    
+    def test_dtype(self):
+        """Arrays can be generated in single precision"""
+        values = SignalGenerator.generate_sine_wave_array(1.0, 1.0, 10.0, dtype=np.float32)
+        assert values.dtype == np.float32
+        np.testing.assert_allclose(values, reference_sine(1.0, 1.0, 10.0), atol=1e-6)
+    
+    def test_empty_signals(self):
+        """A zero duration gives an empty array"""
+        assert len(SignalGenerator.generate_ramp_array(0.0, 1.0, 0.0)) == 0
+        assert len(SignalGenerator.generate_sine_wave_array(1.0, 1.0, 0.0)) == 0
+        assert len(SignalGenerator.generate_square_wave_array(0.0, 1.0, 1.0, 0.0)) == 0
+
+
+class TestListSignals:
+    """generate_* lists hold the same samples as the arrays"""
+    
+    def test_lists_match_arrays(self):
+        """List wrappers return plain floats equal to the array samples"""
+        cases = [
+            ('generate_ramp', (0.0, 10.0, 5.0)),
+            ('generate_sine_wave', (2.0, 3.0, 5.0)),
+            ('generate_square_wave', (1.0, 2.0, 4.0, 5.0)),
+            ('generate_step_response', (0.0, 1.0, 1.0, 5.0)),
+            ('generate_temperature_ramp', (20.0, 40.0, 5.0)),
+            ('generate_pressure_buildup', (0.0, 100.0, 5.0)),
+        ]
+        for name, args in cases:
+            values = getattr(SignalGenerator, name)(*args)
+            assert isinstance(values, list) and isinstance(values[0], float), name
+            assert values == getattr(SignalGenerator, name + '_array')(*args).tolist(), name
+
+
+def draw_all(generator):
+    """Noise, jitter and CAN timing drawn through the list APIs from a generator's streams"""
+    return (SignalGenerator.generate_noise(0.0, 1.0, 0.5, rng=generator.rng('noise')),
+            SignalGenerator.generate_jitter([0.0] * 50, 1.0, rng=generator.rng('jitter')),
+            SignalGenerator.generate_realistic_can_timing(0.1, 5.0, 50, rng=generator.rng('can_timing')))
+
+
+class TestRandomStreams:
+    """Seeded streams belong to a SignalGenerator instance"""
+    
+    def test_same_seed_and_key_repeat(self):
+        """Reseeding with the same seed and node ID repeats every stream"""
+        key = 'test_heating_system.py::TestHeat::test_noise'
+        first, second = SignalGenerator(1234, key), SignalGenerator(1234, key)
+        assert first.seed == second.seed == 1234
+        assert draw_all(first) == draw_all(second)
+    
+    def test_keys_give_independent_streams(self):
+        """Different node IDs, and the streams of one generator, draw different values"""
+        noise_a, jitter_a, _ = draw_all(SignalGenerator(1234, 'test_a.py::test'))
+        noise_b, _, _ = draw_all(SignalGenerator(1234, 'test_b.py::test'))
+        assert noise_a != noise_b
+        assert noise_a != jitter_a
+        assert abs(np.corrcoef(noise_a, noise_b)[0, 1]) < 0.5
+    
+    def test_instances_do_not_share_state(self):
+        """Drawing from one generator does not advance another seeded alike"""
+        busy, idle = SignalGenerator(99, 'node'), SignalGenerator(99, 'node')
+        first = draw_all(busy)
+        draw_all(busy)
+        # Unseeded draws use their own Generator and leave the streams alone too
+        SignalGenerator.generate_noise(0.0, 1.0, 0.5)
+        assert draw_all(idle) == first
+    
+    def test_fixture_keyed_by_node_id(self, request, signal_generator):
+        """The signal_generator fixture derives this test's streams from the session seed"""
+        expected = SignalGenerator(request.config._random_seed, request.node.nodeid)
+        assert draw_all(signal_generator) == draw_all(expected)
+
+
+class TestStreamedSignals:
+    """Chunks of stream_* concatenate to the full array"""
+    
+    @pytest.mark.parametrize('chunk_size', [1, 7, 100, 333, 10000])
+    def test_chunks_concatenate_to_array(self, chunk_size):
+        """Ramp, sine and square streams equal their arrays for any chunk size"""
+        cases = [
+            ('ramp', (0.0, 10.0, 12.34)),
+            ('sine_wave', (2.0, 3.7, 12.34)),
+            ('square_wave', (1.0, 2.0, 4.0, 12.34)),
+            ('square_wave', (1.0, 2.0, 33.0, 12.34)),
+        ]
+        for name, args in cases:
+            chunks = list(getattr(SignalGenerator, 'stream_' + name)(*args, chunk_size=chunk_size))
+            assert all(len(chunk) == chunk_size for chunk in chunks[:-1]), name
+            assert 0 < len(chunks[-1]) <= chunk_size, name
+            np.testing.assert_allclose(np.concatenate(chunks),
+                                       getattr(SignalGenerator, 'generate_' + name + '_array')(*args),
+                                       rtol=1e-12, atol=1e-12, err_msg=name)
+    
+    def test_endless_streams(self):
+        """Without a duration, sine and square streams keep going"""
+        chunks = list(itertools.islice(SignalGenerator.stream_sine_wave(1.0, 0.7, chunk_size=64), 50))
+        np.testing.assert_allclose(np.concatenate(chunks),
+                                   SignalGenerator.generate_sine_wave_array(1.0, 0.7, 32.0),
+                                   atol=1e-9)
+        chunks = list(itertools.islice(SignalGenerator.stream_square_wave(0.0, 1.0, 3.0, chunk_size=64), 50))
+        np.testing.assert_array_equal(np.concatenate(chunks),
+                                      SignalGenerator.generate_square_wave_array(0.0, 1.0, 3.0, 32.0))
+    
+    def test_stream_dtype_and_empty(self):
+        """Chunks use the requested dtype; a zero duration yields nothing"""
+        chunks = SignalGenerator.stream_ramp(0.0, 1.0, 1.0, chunk_size=30, dtype=np.float32)
+        assert {chunk.dtype for chunk in chunks} == {np.dtype(np.float32)}
+        assert list(SignalGenerator.stream_sine_wave(1.0, 1.0, 0.0)) == []
+
+
+def second_order_step(initial, final, duration=5.0, sample_rate=100.0):
+    """Underdamped step response from initial to final: ~16% overshoot, settles within 5s"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    zeta, omega = 0.5, 2 * np.pi
+    omega_d = omega * np.sqrt(1 - zeta ** 2)
+    envelope = np.exp(-zeta * omega * t) / np.sqrt(1 - zeta ** 2)
+    response = 1 - envelope * np.sin(omega_d * t + np.arccos(zeta))
+    return initial + (final - initial) * response
+
+
+class TestStepResponseAnalysis:
+    """analyze_step_response and detect_settling_time"""
+    
+    def test_underdamped_rising_step(self):
+        """Overshoot, peak, rise and settling match the loop-based definitions"""
+        values = second_order_step(20.0, 45.0)
+        result = WaveformAnalyzer.analyze_step_response(values, final_value=45.0)
+        assert result['initial_value'] == 20.0
+        assert result['overshoot_percent'] == pytest.approx(16.3, abs=0.2)
+        assert result['peak_value'] == pytest.approx(values.max())
+        assert result['peak_time'] == pytest.approx(int(np.argmax(values)) / 100.0)
+        assert result['undershoot_percent'] == 0.0
+        
+        response = (values - 20.0) / 25.0
+        rise_start = next(i for i, r in enumerate(response) if r >= 0.1)
+        rise_end = next(i for i, r in enumerate(response) if r >= 0.9)
+        assert result['rise_time'] == pytest.approx((rise_end - rise_start) / 100.0)
+        band = 0.05 * 25.0
+        last_outside = max(i for i, v in enumerate(values) if abs(v - 45.0) > band)
+        assert result['settling_time'] == pytest.approx((last_outside + 1) / 100.0)
+    
+    def test_falling_step_mirrors_rising_step(self):
+        """A falling step gives the same metrics as its mirror image"""
+        rising = WaveformAnalyzer.analyze_step_response(second_order_step(0.0, 10.0), final_value=10.0)
+        falling = WaveformAnalyzer.analyze_step_response(second_order_step(10.0, 0.0), final_value=0.0)
+        for key in ('settling_time', 'rise_time', 'peak_time', 'overshoot_percent', 'undershoot_percent'):
+            assert falling[key] == pytest.approx(rising[key]), key
+        assert falling['settling_time'] is not None
+        assert falling['peak_value'] == pytest.approx(10.0 - rising['peak_value'])
+    
+    def test_undershoot(self):
+        """Initial movement against the step direction is reported as undershoot"""
+        values = np.concatenate([np.zeros(10), [-1.0, -2.0, -1.0], np.full(50, 10.0)])
+        result = WaveformAnalyzer.analyze_step_response(values)
+        assert result['undershoot_percent'] == pytest.approx(20.0)
+        assert result['overshoot_percent'] == 0.0
+    
+    def test_timestamps(self):
+        """Times come from timestamps, relative to the first sample"""
+        values = np.concatenate([np.zeros(5), np.full(5, 1.0)])
+        timestamps = 1000.0 + np.arange(10) * 0.25
+        result = WaveformAnalyzer.analyze_step_response(values, timestamps=timestamps)
+        assert result['settling_time'] == pytest.approx(1.25)
+        assert result['rise_time'] == 0.0
+        with pytest.raises(ValueError):
+            WaveformAnalyzer.analyze_step_response(values, timestamps=timestamps[:-1])
+    
+    def test_unsettled_and_edge_cases(self):
+        """Unsettled signals give None; last-sample steps, flat and empty inputs don't fail"""
+        values = np.concatenate([np.zeros(99), [1.0]])
+        result = WaveformAnalyzer.analyze_step_response(values, final_value=0.5)
+        assert result['settling_time'] is None
+        assert result['rise_time'] == 0.0 and result['peak_time'] == 0.99
+        result = WaveformAnalyzer.analyze_step_response(values)
+        assert result['settling_time'] == pytest.approx(0.99)
+        
+        flat = WaveformAnalyzer.analyze_step_response(np.full(10, 3.0))
+        assert flat['settling_time'] == 0.0 and flat['rise_time'] is None
+        assert WaveformAnalyzer.analyze_step_response([]) == {}
+        assert WaveformAnalyzer.detect_settling_time([], 1.0) is None
+    
+    def test_detect_settling_time_band(self):
+        """With initial_value the band matches analyze_step_response; without it, the final value"""
+        values = second_order_step(100.0, 110.0)
+        analyzed = WaveformAnalyzer.analyze_step_response(values, final_value=110.0)
+        assert WaveformAnalyzer.detect_settling_time(values, 110.0, initial_value=100.0) == \
+            analyzed['settling_time']
+        # ±5% of 110 is wider than ±5% of the 10 step, so the signal counts as settled sooner
+        assert WaveformAnalyzer.detect_settling_time(values, 110.0) < analyzed['settling_time']
@@ -0,0 +1,105 @@
+"""
+Async HIL Interface Module
+asyncio front end for concurrent monitoring of Seat Comfort Module CAN traffic
+"""
+
+import asyncio
+import functools
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+from . import can_codec
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHILInterface:
+    """asyncio counterpart of HILInterface sharing its bus, receiver and SCM
+
+    With a wall clock, blocking waits run in the default executor, so several
+    streams can be awaited concurrently on one event loop. With a virtual
+    clock, waiting is what advances simulated time, so calls run inline and
+    yield to the loop after each frame. Frame iterators keep a per-stream
+    cursor into the receive buffers. They therefore see every frame with
+    its own timestamp, whichever task happened to advance time.
+    """
+
+    MSG_HEAT_STATUS = can_codec.MSG_SEAT_HEAT_STATUS
+    MSG_MASSAGE_STATUS = can_codec.MSG_SEAT_MASSAGE_STATUS
+
+    def __init__(self, hil):
+        """Wrap an existing HIL interface"""
+        self.hil = hil
+        self.clock = hil.clock
+        self.default_timeout = hil.config.CAN_TIMEOUT
+
+    async def send_control_command(self, **command) -> Dict:
+        """Send SEAT_CTRL_CMD (0x100) to SCM"""
+        return await self._call(functools.partial(self.hil.send_control_command, **command))
+
+    async def read_heat_status(self) -> Dict:
+        """Read SEAT_HEAT_STATUS (0x200) from SCM"""
+        return await self._call(self.hil.read_heat_status)
+
+    async def read_massage_status(self) -> Dict:
+        """Read SEAT_MASSAGE_STATUS (0x300) from SCM"""
+        return await self._call(self.hil.read_massage_status)
+
+    async def wait_for_message(self, msg_id: int, timeout: Optional[float] = None) -> Dict:
+        """Wait for the next CAN message with the given ID, raising asyncio.TimeoutError"""
+        timeout = self.default_timeout if timeout is None else timeout
+        message = await self._call(self.hil.wait_for_message, msg_id, timeout)
+        if message is None:
+            raise asyncio.TimeoutError(f"No message 0x{msg_id:03X} received within {timeout}s")
+        return message
+
+    async def sleep(self, seconds: float):
+        """Sleep on the HIL clock without blocking other tasks"""
+        if self.clock.virtual:
+            self.clock.sleep(seconds)
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(seconds)
+
+    async def frames(self, msg_id: int, timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Yield every frame with the given ID received from now on
+
+        Raises asyncio.TimeoutError if no frame arrives within timeout of the
+        previous one.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        cursor = await self._call(self.hil.message_sequence, msg_id)
+        while True:
+            message, cursor = await self._call(self.hil.wait_for_message_after, msg_id, cursor, timeout)
+            if message is None:
+                raise asyncio.TimeoutError(f"No message 0x{msg_id:03X} received within {timeout}s")
+            yield message
+
+    async def heat_status_frames(self, timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Yield decoded SEAT_HEAT_STATUS frames with their timestamps"""
+        async for message in self.frames(self.MSG_HEAT_STATUS, timeout):
+            yield self._decoded(message)
+
+    async def massage_status_frames(self, timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Yield decoded SEAT_MASSAGE_STATUS frames with their timestamps"""
+        async for message in self.frames(self.MSG_MASSAGE_STATUS, timeout):
+            yield self._decoded(message)
+
+    async def _call(self, func, *args):
+        """Run a blocking HIL call without stalling the event loop"""
+        if self.clock.virtual:
+            result = func(*args)
+            await asyncio.sleep(0)
+            return result
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    @staticmethod
+    def _decoded(message: Dict) -> Dict:
+        """Raw-read style view of a received frame"""
+        return {
+            'data': can_codec.decode(message['arbitration_id'], message['data']),
+            'payload': message['data'],
+            'timestamp': message['timestamp'],
+            'arbitration_id': message['arbitration_id']
+        }
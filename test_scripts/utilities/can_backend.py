@@ -0,0 +1,136 @@
+"""
+CAN Backend Module
+python-can bus backends (virtual, SocketCAN/vcan) with per-session pooling
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+try:
+    import can
+except ImportError:  # python-can is only needed for real bus backends
+    can = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class PythonCANBackend:
+    """Adapter exposing a python-can bus through the frame dict API used by HILInterface"""
+
+    def __init__(self, bus):
+        """Wrap an open python-can bus"""
+        self.bus = bus
+
+    def send(self, message: Dict):
+        """Transmit a frame dict on the bus"""
+        self.bus.send(can.Message(
+            arbitration_id=message['arbitration_id'],
+            data=message['data'],
+            is_extended_id=message.get('is_extended_id', False),
+            timestamp=message.get('timestamp', 0.0)
+        ))
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Receive the next frame as a dict, or None on timeout"""
+        msg = self.bus.recv(timeout=timeout)
+        if msg is None:
+            return None
+        return {
+            'arbitration_id': msg.arbitration_id,
+            'data': bytes(msg.data),
+            'is_extended_id': msg.is_extended_id,
+            'timestamp': msg.timestamp
+        }
+
+    def flush(self):
+        """Discard frames already queued for this handle"""
+        while self.bus.recv(timeout=0.0) is not None:
+            pass
+
+
+class BusPool:
+    """Keeps python-can bus handles open for a whole test session
+
+    Handles are keyed by (interface, channel, bitrate, role) so the tester and
+    the simulated SCM each get their own endpoint on the same bus.
+    """
+
+    def __init__(self):
+        """Initialize empty pool"""
+        self._backends = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, interface: str, channel, bitrate: int, role: str = 'tester') -> PythonCANBackend:
+        """Return the pooled backend for a bus endpoint, opening it on first use"""
+        if can is None:
+            raise RuntimeError("python-can is required for CAN_INTERFACE='%s'" % interface)
+        key = (interface, channel, bitrate, role)
+        with self._lock:
+            backend = self._backends.get(key)
+            if backend is None:
+                # preserve_timestamps keeps the sender's transmit time on the virtual bus
+                bus = can.Bus(interface=interface, channel=channel, bitrate=bitrate,
+                              receive_own_messages=False, preserve_timestamps=True)
+                backend = PythonCANBackend(bus)
+                self._backends[key] = backend
+                logger.info("Opened CAN bus %s:%s (%s)", interface, channel, role)
+            else:
+                backend.flush()
+        return backend
+
+    def shutdown(self):
+        """Close every pooled bus handle"""
+        with self._lock:
+            for (interface, channel, _, role), backend in self._backends.items():
+                backend.bus.shutdown()
+                logger.info("Closed CAN bus %s:%s (%s)", interface, channel, role)
+            self._backends.clear()
+
+
+class SCMBusNode:
+    """Runs a simulated SCM as a node on a real bus endpoint
+
+    One thread forwards SEAT_CTRL_CMD frames from the bus into the SCM, the
+    other transmits the SCM's cyclic status frames onto the bus.
+    """
+
+    def __init__(self, scm, backend: PythonCANBackend, poll_timeout: float = 0.05):
+        """Attach SCM to a bus endpoint"""
+        self.scm = scm
+        self.backend = backend
+        self.poll_timeout = poll_timeout
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start RX and TX threads"""
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._rx_loop, name='scm-rx', daemon=True),
+            threading.Thread(target=self._tx_loop, name='scm-tx', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop RX and TX threads"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=self.poll_timeout * 5)
+        self._threads = []
+
+    def _rx_loop(self):
+        """Forward tester frames into the SCM"""
+        while not self._stop_event.is_set():
+            frame = self.backend.recv(timeout=self.poll_timeout)
+            if frame is not None:
+                self.scm.send(frame)
+
+    def _tx_loop(self):
+        """Transmit SCM status frames onto the bus"""
+        while not self._stop_event.is_set():
+            frame = self.scm.recv(timeout=self.poll_timeout)
+            if frame is not None:
+                self.backend.send(frame)
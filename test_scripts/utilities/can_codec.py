@@ -0,0 +1,216 @@
+"""
+CAN Codec Module
+Bit-exact encoding and decoding of Seat Comfort Module CAN frames
+"""
+
+import struct
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+MSG_SEAT_CTRL_CMD = 0x100
+MSG_SEAT_HEAT_STATUS = 0x200
+MSG_SEAT_MASSAGE_STATUS = 0x300
+DLC = 8
+
+# Full-scale physical value of an 8-bit raw signal (raw 255)
+TEMPERATURE_SCALE = 100.0  # °C
+PRESSURE_SCALE = 200.0  # kPa
+DUTY_SCALE = 100.0  # %
+
+# Precompiled payload layouts (little-endian bytes, DLC 8)
+_CTRL_LAYOUT = struct.Struct('<BB6x')  # heat_ctrl, massage_ctrl
+_STATUS_LAYOUT = struct.Struct('<BBB5x')  # value, duty, status bits
+
+# Status byte bits left as 'flags' once active/warning/fault (bits 0-2) are decoded
+_FLAGS_MASK = 0xF8
+
+CTRL_CMD_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('heat_enable', '?'),
+    ('heat_intensity', 'u1'),
+    ('massage_enable', '?'),
+    ('massage_intensity', 'u1'),
+    ('massage_pattern', 'u1')
+])
+
+HEAT_STATUS_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('temperature_c', 'f8'),
+    ('duty_cycle', 'f8'),
+    ('heating_active', '?'),
+    ('temp_warning', '?'),
+    ('heater_fault', '?'),
+    ('flags', 'u1')
+])
+
+MASSAGE_STATUS_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('pressure_kpa', 'f8'),
+    ('duty_cycle', 'f8'),
+    ('pump_active', '?'),
+    ('pressure_warning', '?'),
+    ('pump_fault', '?'),
+    ('flags', 'u1')
+])
+
+
+def _to_raw(value: float, scale: float) -> int:
+    """Quantize a physical value to an unsigned 8-bit raw signal"""
+    raw = int(round(value * 255.0 / scale))
+    return 0 if raw < 0 else 255 if raw > 255 else raw
+
+
+def _status_bits(active, warning, fault, flags: int) -> int:
+    """Pack status booleans into the status byte (bits 16-18 of the frame)"""
+    return (flags | (1 if active else 0) | (2 if warning else 0) | (4 if fault else 0)) & 0xFF
+
+
+def encode_control_command(heat_enable=False, heat_intensity=0, massage_enable=False,
+                           massage_intensity=0, massage_pattern=0) -> bytes:
+    """Encode SEAT_CTRL_CMD (0x100) payload"""
+    byte0 = (heat_enable & 0x01) | ((heat_intensity & 0x03) << 1)
+    byte1 = (massage_enable & 0x01) | ((massage_intensity & 0x07) << 1) | ((massage_pattern & 0x07) << 4)
+    return _CTRL_LAYOUT.pack(byte0, byte1)
+
+
+def decode_control_command(data) -> Dict:
+    """Decode SEAT_CTRL_CMD (0x100) payload"""
+    byte0, byte1 = _CTRL_LAYOUT.unpack_from(bytes(data))
+    return {
+        'heat_enable': bool(byte0 & 0x01),
+        'heat_intensity': (byte0 >> 1) & 0x03,
+        'massage_enable': bool(byte1 & 0x01),
+        'massage_intensity': (byte1 >> 1) & 0x07,
+        'massage_pattern': (byte1 >> 4) & 0x07
+    }
+
+
+def encode_heat_status(temperature_c: float, duty_cycle: float, heating_active=False,
+                       temp_warning=False, heater_fault=False, flags: int = 0) -> bytes:
+    """Encode SEAT_HEAT_STATUS (0x200) payload"""
+    return _STATUS_LAYOUT.pack(
+        _to_raw(temperature_c, TEMPERATURE_SCALE),
+        _to_raw(duty_cycle, DUTY_SCALE),
+        _status_bits(heating_active, temp_warning, heater_fault, flags)
+    )
+
+
+def decode_heat_status(data) -> Dict:
+    """Decode SEAT_HEAT_STATUS (0x200) payload"""
+    temp_raw, duty_raw, status = _STATUS_LAYOUT.unpack_from(bytes(data))
+    return {
+        'temperature_c': temp_raw * TEMPERATURE_SCALE / 255.0,
+        'duty_cycle': duty_raw * DUTY_SCALE / 255.0,
+        'heating_active': bool(status & 0x01),
+        'temp_warning': bool(status & 0x02),
+        'heater_fault': bool(status & 0x04),
+        'flags': status & _FLAGS_MASK
+    }
+
+
+def encode_massage_status(pressure_kpa: float, duty_cycle: float, pump_active=False,
+                          pressure_warning=False, pump_fault=False, flags: int = 0) -> bytes:
+    """Encode SEAT_MASSAGE_STATUS (0x300) payload"""
+    return _STATUS_LAYOUT.pack(
+        _to_raw(pressure_kpa, PRESSURE_SCALE),
+        _to_raw(duty_cycle, DUTY_SCALE),
+        _status_bits(pump_active, pressure_warning, pump_fault, flags)
+    )
+
+
+def decode_massage_status(data) -> Dict:
+    """Decode SEAT_MASSAGE_STATUS (0x300) payload"""
+    pressure_raw, duty_raw, status = _STATUS_LAYOUT.unpack_from(bytes(data))
+    return {
+        'pressure_kpa': pressure_raw * PRESSURE_SCALE / 255.0,
+        'duty_cycle': duty_raw * DUTY_SCALE / 255.0,
+        'pump_active': bool(status & 0x01),
+        'pressure_warning': bool(status & 0x02),
+        'pump_fault': bool(status & 0x04),
+        'flags': status & _FLAGS_MASK
+    }
+
+
+_ENCODERS = {
+    MSG_SEAT_CTRL_CMD: encode_control_command,
+    MSG_SEAT_HEAT_STATUS: encode_heat_status,
+    MSG_SEAT_MASSAGE_STATUS: encode_massage_status
+}
+
+_DECODERS = {
+    MSG_SEAT_CTRL_CMD: decode_control_command,
+    MSG_SEAT_HEAT_STATUS: decode_heat_status,
+    MSG_SEAT_MASSAGE_STATUS: decode_massage_status
+}
+
+
+def encode(msg_id: int, signals: Dict) -> bytes:
+    """Encode a signal dictionary for the given arbitration ID"""
+    if msg_id not in _ENCODERS:
+        raise KeyError(f"No codec for message 0x{msg_id:03X}")
+    return _ENCODERS[msg_id](**signals)
+
+
+def decode(msg_id: int, data) -> Dict:
+    """Decode a payload for the given arbitration ID"""
+    if msg_id not in _DECODERS:
+        raise KeyError(f"No codec for message 0x{msg_id:03X}")
+    return _DECODERS[msg_id](data)
+
+
+def decode_batch(msg_id: int, payloads, timestamps=None) -> np.ndarray:
+    """Decode many payloads of one message into a NumPy structured array
+
+    payloads is an (N, 8) uint8 array or N concatenated 8-byte payloads.
+    """
+    if isinstance(payloads, (bytes, bytearray, memoryview)):
+        payloads = np.frombuffer(payloads, dtype=np.uint8)
+    raw = np.asarray(payloads, dtype=np.uint8).reshape(-1, DLC)
+
+    if msg_id == MSG_SEAT_CTRL_CMD:
+        result = np.zeros(len(raw), dtype=CTRL_CMD_DTYPE)
+        result['heat_enable'] = raw[:, 0] & 0x01
+        result['heat_intensity'] = (raw[:, 0] >> 1) & 0x03
+        result['massage_enable'] = raw[:, 1] & 0x01
+        result['massage_intensity'] = (raw[:, 1] >> 1) & 0x07
+        result['massage_pattern'] = (raw[:, 1] >> 4) & 0x07
+    elif msg_id in (MSG_SEAT_HEAT_STATUS, MSG_SEAT_MASSAGE_STATUS):
+        if msg_id == MSG_SEAT_HEAT_STATUS:
+            result = np.zeros(len(raw), dtype=HEAT_STATUS_DTYPE)
+            result['temperature_c'] = raw[:, 0] * (TEMPERATURE_SCALE / 255.0)
+            names = ('heating_active', 'temp_warning', 'heater_fault')
+        else:
+            result = np.zeros(len(raw), dtype=MASSAGE_STATUS_DTYPE)
+            result['pressure_kpa'] = raw[:, 0] * (PRESSURE_SCALE / 255.0)
+            names = ('pump_active', 'pressure_warning', 'pump_fault')
+        result['duty_cycle'] = raw[:, 1] * (DUTY_SCALE / 255.0)
+        for bit, name in enumerate(names):
+            result[name] = (raw[:, 2] >> bit) & 0x01
+        result['flags'] = raw[:, 2] & _FLAGS_MASK
+    else:
+        raise KeyError(f"No codec for message 0x{msg_id:03X}")
+
+    if timestamps is not None:
+        result['timestamp'] = timestamps
+    return result
+
+
+def decode_capture(frames: Iterable[Dict]) -> Dict[int, np.ndarray]:
+    """Decode a capture of frame dicts into one structured array per known ID"""
+    grouped = {}
+    for frame in frames:
+        if frame['arbitration_id'] in _DECODERS:
+            entry = grouped.setdefault(frame['arbitration_id'], ([], []))
+            entry[0].append(bytes(frame['data']).ljust(DLC, b'\x00')[:DLC])
+            entry[1].append(frame['timestamp'])
+
+    return {
+        msg_id: decode_batch(
+            msg_id,
+            b''.join(payloads),
+            np.asarray(timestamps, dtype=np.float64)
+        )
+        for msg_id, (payloads, timestamps) in grouped.items()
+    }
@@ -0,0 +1,158 @@
+"""
+CAN Receiver Module
+Background reception of CAN frames into per-ID ring buffers
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class CANReceiver:
+    """Receives frames from a bus into bounded ring buffers keyed by arbitration ID
+
+    With a wall clock a daemon thread blocks on bus.recv() and waiters sleep on
+    a condition variable until their frame arrives. With a virtual clock there
+    is no thread: waiting is what advances simulated time, so frames are pumped
+    from the bus on the caller's thread instead.
+    """
+
+    def __init__(self, bus, clock, msg_ids: Iterable[int], capacity: int = 256,
+                 poll_timeout: float = 0.1):
+        """Initialize receiver with one ring buffer per arbitration ID"""
+        self.bus = bus
+        self.clock = clock
+        self.capacity = capacity
+        self.poll_timeout = poll_timeout
+        self._buffers = {msg_id: deque(maxlen=capacity) for msg_id in msg_ids}
+        self._counts = {msg_id: 0 for msg_id in self._buffers}
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._discard_before = None
+
+    def start(self):
+        """Start the background receive thread (wall clock only)"""
+        if self.clock.virtual or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='can-rx', daemon=True)
+        self._thread.start()
+        logger.debug("CAN receive thread started")
+
+    def stop(self):
+        """Stop the background receive thread"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=self.poll_timeout * 5)
+        self._thread = None
+        logger.debug("CAN receive thread stopped")
+
+    def clear(self, before: Optional[float] = None):
+        """Discard every buffered frame, and late arrivals stamped before the given time"""
+        if self.clock.virtual:
+            self._pump()
+        with self._condition:
+            self._discard_before = before
+            for buffer in self._buffers.values():
+                buffer.clear()
+
+    def latest(self, msg_id: int) -> Optional[Dict]:
+        """Return the most recently received frame for an ID without waiting"""
+        if self.clock.virtual:
+            self._pump()
+        with self._condition:
+            buffer = self._buffers[msg_id]
+            return buffer[-1] if buffer else None
+
+    def get_messages(self, msg_id: int) -> List[Dict]:
+        """Return a snapshot of buffered frames for an ID, oldest first"""
+        if self.clock.virtual:
+            self._pump()
+        with self._condition:
+            return list(self._buffers[msg_id])
+
+    def wait_for_message(self, msg_id: int, timeout: float = 1.0) -> Optional[Dict]:
+        """Block until the next frame with the given ID arrives, or timeout"""
+        return self.wait_for_sequence(msg_id, self.sequence(msg_id), timeout)[0]
+
+    def sequence(self, msg_id: int) -> int:
+        """Number of frames received so far for an ID (a cursor for wait_for_sequence)"""
+        if self.clock.virtual:
+            self._pump()
+        with self._condition:
+            return self._counts[msg_id]
+
+    def wait_for_sequence(self, msg_id: int, cursor: int,
+                          timeout: float = 1.0) -> Tuple[Optional[Dict], int]:
+        """Return the first frame received after cursor and the cursor past it
+
+        Lets a consumer walk a stream frame by frame without missing frames
+        that arrived while it was busy. Returns (None, cursor) on timeout.
+        """
+        if self.clock.virtual:
+            if not self._wait_virtual(msg_id, cursor, timeout):
+                return None, cursor
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._has_frame_after(msg_id, cursor), timeout):
+                return None, cursor
+            return self._frame_after(msg_id, cursor)
+
+    def _wait_virtual(self, msg_id: int, cursor: int, timeout: float) -> bool:
+        """Advance simulated time frame by frame until a frame after cursor arrives"""
+        self._pump()
+        deadline = self.clock.monotonic() + timeout
+        while not self._has_frame_after(msg_id, cursor):
+            frame = self.bus.recv(timeout=max(deadline - self.clock.monotonic(), 0.0))
+            if frame is None:
+                return False
+            self._store(frame)
+        return True
+
+    def _has_frame_after(self, msg_id: int, cursor: int) -> bool:
+        """Whether a frame newer than cursor is still buffered"""
+        return self._counts[msg_id] > cursor and len(self._buffers[msg_id]) > 0
+
+    def _frame_after(self, msg_id: int, cursor: int) -> Tuple[Dict, int]:
+        """Return the first buffered frame after the given sequence count and its successor cursor"""
+        buffer = self._buffers[msg_id]
+        oldest = self._counts[msg_id] - len(buffer)
+        index = max(cursor - oldest, 0)
+        return buffer[index], oldest + index + 1
+
+    def _pump(self):
+        """Deliver every frame the bus already has pending (virtual clock)"""
+        frame = self.bus.recv(timeout=0.0)
+        while frame is not None:
+            self._store(frame)
+            frame = self.bus.recv(timeout=0.0)
+
+    def _store(self, frame: Dict):
+        """Append a frame to its ring buffer and wake waiters"""
+        msg_id = frame['arbitration_id']
+        if msg_id not in self._buffers:
+            return
+        with self._condition:
+            # Read under the lock so a concurrent clear() cannot let a stale frame in
+            if self._discard_before is not None and frame['timestamp'] < self._discard_before:
+                return
+            self._buffers[msg_id].append(frame)
+            self._counts[msg_id] += 1
+            self._condition.notify_all()
+
+    def _run(self):
+        """Receive loop executed by the background thread"""
+        while not self._stop_event.is_set():
+            try:
+                frame = self.bus.recv(timeout=self.poll_timeout)
+            except Exception as e:
+                logger.error("CAN receive error: %s", e)
+                self._stop_event.wait(self.poll_timeout)
+                continue
+            if frame is not None:
+                self._store(frame)
@@ -0,0 +1,156 @@
+"""
+CAN Replay Module
+Deterministic replay of a recorded CAN trace in place of the bus
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from .can_trace import DIRECTION_MARK, DIRECTION_RX, EXTENDED_ID_FLAG, read_trace, segment_key
+
+
+logger = logging.getLogger(__name__)
+
+PACING_ORIGINAL = 'original'
+PACING_FAST = 'fast'
+
+# Status and diagnostic response frames the SCM transmits
+REPLAY_MSG_IDS = (0x200, 0x300, 0x7E8)
+
+
+class TraceReplayBus:
+    """Bus stand-in that plays back the SCM frames of a binary CAN trace
+
+    Received (RX) frames with the replayed IDs are delivered in their
+    recorded order. The test boundary markers written at each HIL reset
+    split the trace into segments, each keyed to the test that started it.
+    next_segment(test_name) (called by the HIL reset) looks up that test's
+    segment and realigns it to the current clock time, so a replayed run
+    sees the frames recorded for each test whatever subset or order of
+    tests it runs. When a segment runs out the bus falls silent until the
+    next reset.
+
+    Each frame becomes due at its recorded offset from the start of its
+    segment, measured on the clock, and recv() waits on the clock until
+    then. With original pacing a wall clock therefore takes as long as the
+    recording. Fast pacing requires a virtual clock, which jumps straight
+    to each due frame. Either way frames are only delivered once due, and
+    their timestamps keep the recorded spacing.
+
+    A replay is open loop: frames sent by the tester cannot change what
+    the recorded ECU did. They are passed to tx_sink (e.g. the simulated
+    SCM, which keeps supplying the non-CAN readings) when one is given.
+    """
+
+    def __init__(self, trace_file, clock, pacing: str = PACING_ORIGINAL,
+                 msg_ids: Iterable[int] = REPLAY_MSG_IDS, tx_sink=None):
+        """Load the frames and segment markers to replay from a trace file"""
+        if pacing not in (PACING_ORIGINAL, PACING_FAST):
+            raise ValueError(f"Unknown replay pacing: {pacing}")
+        if pacing == PACING_FAST and not clock.virtual:
+            raise ValueError("Fast replay pacing needs a virtual clock")
+        self.trace_file = trace_file
+        self.clock = clock
+        self.pacing = pacing
+        self.tx_sink = tx_sink
+
+        records = read_trace(trace_file)
+        offsets = (records['timestamp_ns'] - records['timestamp_ns'][:1]) / 1e9
+        ids = records['arbitration_id'] & ~np.uint32(EXTENDED_ID_FLAG)
+        selected = (records['direction'] == DIRECTION_RX) & np.isin(ids, list(msg_ids))
+        marks = records['direction'] == DIRECTION_MARK
+        # A marker's segment runs from the first selected frame recorded after it to the next marker
+        frames_before = np.cumsum(selected) - selected
+        starts = frames_before[marks].tolist()
+        self._segments = list(zip(starts, offsets[marks].tolist(),
+                                  starts[1:] + [int(np.count_nonzero(selected))]))
+        self._segment_index = {}
+        for index, key in enumerate(records['data'][marks]):
+            self._segment_index.setdefault(key.tobytes(), []).append(index)
+
+        records = records[selected]
+        self._offsets = offsets[selected].tolist()
+        self._ids = ids[selected].tolist()
+        self._extended = ((records['arbitration_id'] & np.uint32(EXTENDED_ID_FLAG)) != 0).tolist()
+        self._dlcs = records['dlc'].tolist()
+        self._data = records['data']
+        logger.info("Loaded %d frames in %d segments for replay from %s",
+                    len(self._offsets), len(self._segments), trace_file)
+        self.rewind()
+
+    def __len__(self) -> int:
+        """Number of frames in the replay"""
+        return len(self._offsets)
+
+    def rewind(self):
+        """Restart the replay from its first frame at the current clock time"""
+        self._segment = 0
+        self._replayed = Counter()
+        end = self._segments[0][0] if self._segments else len(self._offsets)
+        self._align(0, self._offsets[0] if self._offsets else 0.0, end)
+
+    def next_segment(self, test_name: Optional[str] = None) -> bool:
+        """Move to the segment recorded for a test (or the next one in the trace), aligned to now
+
+        A test recorded several times replays its segments in turn, then
+        repeats the last. Raises KeyError if the trace holds no segment for
+        test_name. Without a name, returns False once the trace is exhausted.
+        """
+        if test_name is not None:
+            key = segment_key(test_name)
+            indices = self._segment_index.get(key)
+            if not indices:
+                raise KeyError(f"No segment recorded for {test_name} in {self.trace_file}")
+            index = indices[min(self._replayed[key], len(indices) - 1)]
+            self._replayed[key] += 1
+        elif self._segment < len(self._segments):
+            index = self._segment
+        else:
+            self._align(len(self._offsets), 0.0, len(self._offsets))
+            return False
+        self._segment = index + 1
+        self._align(*self._segments[index])
+        return True
+
+    def send(self, message: Dict):
+        """Accept a frame from the tester; the recording does not react to it"""
+        if self.tx_sink is not None:
+            self.tx_sink.send(message)
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Return the next recorded frame, waiting on the clock until it is due"""
+        if self._index >= self._end:
+            # End of the segment: the bus stays silent until the next reset
+            if timeout:
+                self.clock.sleep(timeout)
+            return None
+        offset = self._offsets[self._index] - self._base
+        now = self.clock.monotonic()
+        due = self._start + offset
+        if timeout is not None and due > now + timeout:
+            self.clock.sleep(timeout)
+            return None
+        self.clock.sleep(due - now)
+        return self._frame(offset)
+
+    def _align(self, index: int, base: float, end: int):
+        """Replay frames [index, end) with trace offset base mapped to the current clock time"""
+        self._index = index
+        self._end = end
+        self._base = base
+        self._start = self.clock.monotonic()
+        self._epoch = self.clock.time()
+
+    def _frame(self, offset: float) -> Dict:
+        """Build the frame dict of the current record and move past it"""
+        index = self._index
+        self._index += 1
+        return {
+            'arbitration_id': self._ids[index],
+            'data': self._data[index, :self._dlcs[index]].tobytes(),
+            'is_extended_id': self._extended[index],
+            'timestamp': self._epoch + offset
+        }
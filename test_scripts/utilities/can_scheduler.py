@@ -0,0 +1,196 @@
+"""
+CAN Scheduler Module
+Drift-free cyclic transmission of CAN frames on absolute deadlines
+"""
+
+import logging
+import math
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTransmitter:
+    """Transmits the latest frame every period on an absolute monotonic grid
+
+    Deadlines are start + k * period, so lateness never accumulates. A missed
+    deadline is skipped rather than sent in a burst. With a wall clock a
+    daemon thread sleeps until each deadline. A virtual clock has no thread:
+    pump() transmits every deadline that simulated time has already passed,
+    stamping each frame with its deadline; those frames are on time by
+    construction, so only the wall-clock thread collects lateness samples
+    for jitter(). Frames are copied under the lock
+    but sent outside it, so a blocking bus never stalls set_message(),
+    pause() or resume().
+    """
+
+    def __init__(self, bus, clock, period: float, jitter_samples: int = 1000):
+        """Initialize transmitter for one cyclic message"""
+        self.bus = bus
+        self.clock = clock
+        self.period = period
+        self.paused = False
+        self.sent_count = 0
+        self.missed_count = 0
+        self._message = None
+        self._start_time = None
+        self._cycle = 0
+        self._lateness = deque(maxlen=jitter_samples)
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def set_message(self, message: Dict):
+        """Replace the frame sent on the following deadlines"""
+        with self._lock:
+            self._message = dict(message)
+
+    def start(self):
+        """Start cyclic transmission with the first deadline one period from now"""
+        with self._lock:
+            if self._start_time is not None:
+                return
+            self._start_time = self.clock.monotonic()
+            self._cycle = 1
+        if not self.clock.virtual:
+            if self._thread is not None:
+                # A previous thread stuck in a blocking send exits once the send
+                # returns (its stop event is set); don't wait on it forever
+                self._thread.join(timeout=self.period * 5)
+                if self._thread.is_alive():
+                    logger.warning("Previous cyclic transmit thread still blocked in send")
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop_event,),
+                                            name='can-tx', daemon=True)
+            self._thread.start()
+        logger.debug("Cyclic transmission started (period %.0fms)", self.period * 1000)
+
+    def stop(self):
+        """Stop cyclic transmission, forget the message and clear statistics"""
+        with self._lock:
+            self._start_time = None
+            self._message = None
+            self.paused = False
+            self.sent_count = 0
+            self.missed_count = 0
+            self._lateness.clear()
+            self._stop_event.set()
+            self._wake.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=self.period * 5)
+            if self._thread.is_alive():
+                logger.warning("Cyclic transmit thread still blocked in send after stop")
+            else:
+                self._thread = None
+
+    def pause(self):
+        """Suspend transmission (message loss injection); the deadline grid keeps running"""
+        if self.clock.virtual:
+            self.pump()
+        with self._lock:
+            self.paused = True
+        logger.debug("Cyclic transmission paused")
+
+    def resume(self):
+        """Resume transmission at the next deadline on the original grid"""
+        with self._lock:
+            if self._start_time is not None:
+                self._cycle = self._next_cycle(self.clock.monotonic())
+            self.paused = False
+            self._wake.notify_all()
+        logger.debug("Cyclic transmission resumed")
+
+    def pump(self):
+        """Transmit every deadline already passed (virtual clock)"""
+        with self._lock:
+            if self._start_time is None:
+                return
+            now = self.clock.monotonic()
+            messages = []
+            while self._deadline() <= now:
+                if not self.paused and self._message is not None:
+                    messages.append(self._stamped(self._deadline()))
+                self._cycle += 1
+        for message in messages:
+            self.bus.send(message)
+            with self._lock:
+                self._record(None)
+
+    def jitter(self) -> Dict:
+        """Scheduling lateness achieved so far, in seconds
+        
+        With a virtual clock there are no lateness samples ('samples' is 0),
+        only the sent and missed counts.
+        """
+        with self._lock:
+            samples = list(self._lateness)
+            sent, missed = self.sent_count, self.missed_count
+        if not samples:
+            return {'samples': 0, 'sent': sent, 'missed': missed,
+                    'mean': 0.0, 'std': 0.0, 'max': 0.0}
+        mean = sum(samples) / len(samples)
+        variance = sum((s - mean) ** 2 for s in samples) / len(samples)
+        return {
+            'samples': len(samples),
+            'sent': sent,
+            'missed': missed,
+            'mean': mean,
+            'std': math.sqrt(variance),
+            'max': max(samples)
+        }
+
+    def _deadline(self) -> float:
+        """Monotonic time of the current cycle's deadline"""
+        return self._start_time + self._cycle * self.period
+
+    def _next_cycle(self, now: float) -> int:
+        """Index of the first deadline strictly after now"""
+        return int((now - self._start_time) / self.period) + 1
+
+    def _stamped(self, deadline: float) -> Dict:
+        """Copy of the current message stamped with its deadline (caller holds the lock)"""
+        message = dict(self._message)
+        message['timestamp'] = self.clock.time() - (self.clock.monotonic() - deadline)
+        return message
+
+    def _record(self, lateness: Optional[float]):
+        """Count one transmitted frame and its lateness, if measured (caller holds the lock)"""
+        self.sent_count += 1
+        if lateness is not None:
+            self._lateness.append(lateness)
+
+    def _run(self, stop_event: threading.Event):
+        """Transmit loop executed by the background thread until stop_event is set"""
+        while True:
+            with self._lock:
+                if stop_event.is_set():
+                    return
+                if self.paused or self._message is None:
+                    self._wake.wait(self.period)
+                    continue
+                delay = self._deadline() - self.clock.monotonic()
+                if delay > 0:
+                    # Woken early by resume()/stop(); re-evaluate the deadline
+                    self._wake.wait(delay)
+                    continue
+                lateness = -delay
+                if lateness >= self.period:
+                    # Overran whole cycles: skip them instead of bursting
+                    skipped = self._next_cycle(self.clock.monotonic()) - self._cycle - 1
+                    self.missed_count += skipped
+                    self._cycle += skipped
+                    lateness = self.clock.monotonic() - self._deadline()
+                message = self._stamped(self._deadline())
+                self._cycle += 1
+            try:
+                self.bus.send(message)
+            except Exception as e:
+                logger.error("Cyclic transmit error: %s", e)
+                continue
+            with self._lock:
+                if not stop_event.is_set():
+                    self._record(lateness)
@@ -0,0 +1,183 @@
+"""
+CAN Trace Module
+Compact fixed-record binary trace of every CAN frame sent and received by the tester
+"""
+
+import hashlib
+import logging
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DIRECTION_TX = 0
+DIRECTION_RX = 1
+DIRECTION_MARK = 2  # not a frame: marks a test boundary (HIL reset) for replay, data = segment_key()
+
+# Extended (29-bit) identifiers are flagged in the top bit of the ID field, as in SocketCAN
+EXTENDED_ID_FLAG = 0x80000000
+
+TRACE_MAGIC = b'SCMTRACE'
+TRACE_VERSION = 1
+
+# File header: magic, version, record size, reserved
+_HEADER = struct.Struct('<8sHH4x')
+# Record: timestamp (ns), ID, DLC, direction, padding, data (zero padded to 8 bytes)
+_RECORD = struct.Struct('<qIBB2x8s')
+
+TRACE_DTYPE = np.dtype({
+    'names': ['timestamp_ns', 'arbitration_id', 'dlc', 'direction', 'data'],
+    'formats': ['<i8', '<u4', 'u1', 'u1', ('u1', (8,))],
+    'offsets': [0, 8, 12, 13, 16],
+    'itemsize': _RECORD.size
+})
+
+
+class CANTraceRecorder:
+    """Appends frames to a binary trace file of fixed 24-byte records
+
+    Records are packed into a preallocated buffer and written out only when
+    it fills up (or on flush/close), so recording a frame costs one
+    struct.pack_into and no allocation. Safe to call from the receive and
+    transmit threads at the same time.
+    """
+
+    def __init__(self, trace_file, buffer_frames: int = 4096):
+        """Create (or truncate) the trace file and write its header"""
+        self.trace_file = Path(trace_file)
+        self.frames_written = 0
+        self._buffer = bytearray(_RECORD.size * buffer_frames)
+        self._view = memoryview(self._buffer)
+        self._capacity = buffer_frames
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._file = open(self.trace_file, 'wb')
+        self._file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, _RECORD.size))
+        logger.info("CAN trace recording to %s", self.trace_file)
+
+    def record(self, frame: Dict, direction: int):
+        """Append one frame dict (arbitration_id, data, timestamp) to the trace"""
+        data = frame['data']
+        arbitration_id = frame['arbitration_id']
+        if frame.get('is_extended_id'):
+            arbitration_id |= EXTENDED_ID_FLAG
+        with self._lock:
+            if self._file is None:
+                return
+            _RECORD.pack_into(self._buffer, self._pending * _RECORD.size,
+                              round(frame['timestamp'] * 1e9), arbitration_id,
+                              len(data), direction, bytes(data))
+            self._pending += 1
+            if self._pending == self._capacity:
+                self._write_pending()
+
+    def mark(self, timestamp: float, test_name: Optional[str] = None):
+        """Append a test boundary marker at the given time, keyed to the test that starts there"""
+        data = segment_key(test_name) if test_name else b''
+        self.record({'arbitration_id': 0, 'data': data, 'timestamp': timestamp}, DIRECTION_MARK)
+
+    def flush(self):
+        """Write buffered records to the trace file"""
+        with self._lock:
+            if self._file is not None:
+                self._write_pending()
+                self._file.flush()
+
+    def close(self):
+        """Flush and close the trace file"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._write_pending()
+            self._file.close()
+            self._file = None
+        logger.info("CAN trace closed: %d frames in %s", self.frames_written, self.trace_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write_pending(self):
+        """Write out the filled part of the buffer (caller holds the lock)"""
+        if self._pending:
+            self._file.write(self._view[:self._pending * _RECORD.size])
+            self.frames_written += self._pending
+            self._pending = 0
+
+
+class TracedBus:
+    """Bus wrapper that records every frame passing through send() and recv()"""
+
+    def __init__(self, bus, recorder: CANTraceRecorder):
+        """Wrap a bus (simulated SCM or python-can backend)"""
+        self.bus = bus
+        self.recorder = recorder
+
+    def send(self, message: Dict):
+        """Record and transmit a frame"""
+        self.recorder.record(message, DIRECTION_TX)
+        self.bus.send(message)
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Receive a frame and record it"""
+        frame = self.bus.recv(timeout=timeout)
+        if frame is not None:
+            self.recorder.record(frame, DIRECTION_RX)
+        return frame
+
+    def __getattr__(self, name):
+        return getattr(self.bus, name)
+
+
+def segment_key(test_name: str) -> bytes:
+    """8-byte key of a test stored in its boundary marker
+
+    A hash of the pytest node ID with the directory part of its file
+    stripped, so the key does not depend on where pytest was run from.
+    """
+    path, separator, rest = test_name.partition('::')
+    name = path.replace('\\', '/').rsplit('/', 1)[-1] + separator + rest
+    return hashlib.blake2b(name.encode(), digest_size=8).digest()
+
+
+def read_trace(trace_file) -> np.ndarray:
+    """Load a trace file as a structured array of TRACE_DTYPE records"""
+    with open(trace_file, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{trace_file} is not a CAN trace file")
+        magic, version, record_size = _HEADER.unpack(header)
+        if magic != TRACE_MAGIC or record_size != _RECORD.size:
+            raise ValueError(f"{trace_file} is not a CAN trace file")
+        if version != TRACE_VERSION:
+            raise ValueError(f"{trace_file}: unsupported trace version {version}")
+        return np.fromfile(f, dtype=TRACE_DTYPE)
+
+
+def write_trace(trace_file, records: np.ndarray):
+    """Write TRACE_DTYPE records (e.g. from read_trace) to a new trace file"""
+    with open(trace_file, 'wb') as f:
+        f.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, _RECORD.size))
+        np.ascontiguousarray(records, dtype=TRACE_DTYPE).tofile(f)
+
+
+def iter_trace(trace_file, direction: Optional[int] = None) -> Iterator[Dict]:
+    """Yield the frames of a trace file as frame dicts, optionally of one direction"""
+    records = read_trace(trace_file)
+    if direction is not None:
+        records = records[records['direction'] == direction]
+    for timestamp_ns, arbitration_id, dlc, record_direction, data in records.tolist():
+        yield {
+            'arbitration_id': arbitration_id & ~EXTENDED_ID_FLAG,
+            'data': bytes(data[:dlc]),
+            'is_extended_id': bool(arbitration_id & EXTENDED_ID_FLAG),
+            'timestamp': timestamp_ns / 1e9,
+            'direction': record_direction
+        }
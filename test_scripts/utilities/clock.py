@@ -0,0 +1,70 @@
+"""
+Clock Module
+Pluggable time sources for HIL test execution (wall-clock or simulated)
+"""
+
+import time
+
+
+class WallClock:
+    """Real-time clock backed by the host system time"""
+
+    virtual = False
+
+    def __init__(self):
+        """Initialize wall clock"""
+        self._offset = 0.0
+
+    def time(self) -> float:
+        """Return current epoch time in seconds"""
+        return time.time() + self._offset
+
+    def monotonic(self) -> float:
+        """Return monotonic time in seconds"""
+        return time.monotonic() + self._offset
+
+    def sleep(self, seconds: float):
+        """Block the calling thread for the given duration"""
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def advance(self, seconds: float):
+        """Skew the clock forward without waiting (for timeout/duration tests)"""
+        self._offset += seconds
+
+
+class VirtualClock:
+    """Simulated clock where sleeping advances time instantly"""
+
+    virtual = True
+
+    def __init__(self, start_time: float = None):
+        """Initialize virtual clock at the given epoch (defaults to now)"""
+        self._epoch = time.time() if start_time is None else start_time
+        self._now = 0.0
+
+    def time(self) -> float:
+        """Return simulated epoch time in seconds"""
+        return self._epoch + self._now
+
+    def monotonic(self) -> float:
+        """Return simulated seconds elapsed since the clock was created"""
+        return self._now
+
+    def sleep(self, seconds: float):
+        """Advance simulated time instead of blocking"""
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        """Advance simulated time"""
+        if seconds > 0:
+            self._now += seconds
+
+
+def create_clock(mode: str = 'virtual'):
+    """Create a clock for the given execution mode ('virtual' or 'wall')"""
+    if mode == 'virtual':
+        return VirtualClock()
+    if mode == 'wall':
+        return WallClock()
+    raise ValueError(f"Unknown clock mode: {mode}")
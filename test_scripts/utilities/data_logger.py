@@ -6,8 +6,17 @@ Handles test data logging and report generation
 import csv
 import json
 import logging
+import os
+import time
+import weakref
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from .html_report import render_html_report
+from .measurement_store import MeasurementStore
+from .results_db import ResultsDatabase
 
 
 logger = logging.getLogger(__name__)
@@ -16,19 +25,78 @@ logger = logging.getLogger(__name__)
 class DataLogger:
     """Logger for test execution data and results"""
     
-    def __init__(self, log_file: str):
-        """Initialize data logger"""
+    # Markers that get their own result breakdown
+    BREAKDOWN_MARKERS = ('heating', 'massage', 'safety', 'stress')
+    
+    def __init__(self, log_file: str, flush_count: int = 1, flush_interval: float = 1.0,
+                 fsync: bool = False, jsonl_file: Optional[str] = None,
+                 results_db: Optional[ResultsDatabase] = None, session_id: Optional[str] = None):
+        """Initialize data logger
+        
+        CSV rows are written through one persistent file handle. By default
+        every row is written as it is logged; with a larger flush_count rows
+        are buffered until flush_count are pending or flush_interval seconds
+        have passed since the last flush, so a crash loses at most one batch.
+        Rows still pending when the logger is discarded without close() (or
+        the interpreter exits) are written by a finalizer. With fsync each
+        flush is also forced to disk.
+        
+        With jsonl_file every result and measurement is also streamed there as
+        one JSON Lines record while the run is in progress; close() appends
+        the summary record.
+        
+        With results_db every result is also persisted there under
+        session_id, with its duration since the last set_context() call.
+        """
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
         self.test_results = []
-        self.measurements = []
+        self.measurements = MeasurementStore()
+        self.flush_count = flush_count
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._csv_file = None
+        self._csv_writer = None
+        self._pending_rows = []
+        self._last_flush = time.monotonic()
+        self._finalizer = weakref.finalize(self, _write_csv_rows, self.log_file, self._pending_rows)
+        self.jsonl_file = Path(jsonl_file) if jsonl_file else None
+        self._jsonl_stream = None
+        self._status_counts = Counter()
+        self._class_counts = {}
+        self._marker_counts = {}
+        self._test_class = None
+        self._markers = ()
+        self._test_started = None
+        self.results_db = results_db
+        self.session_id = session_id
+        if self.jsonl_file is not None:
+            self.jsonl_file.parent.mkdir(parents=True, exist_ok=True)
+            self._jsonl_stream = open(self.jsonl_file, 'w')
         
-        logger.info(f"Data logger initialized with file: {log_file}")
+        logger.info("Data logger initialized with file: %s", log_file)
+    
+    def reset(self):
+        """Clear the per-test context so the logger can be reused by the next test
+        
+        Results, measurements and their counters cover the logger's whole
+        lifetime, so exports at the end of a session contain every test.
+        """
+        self._test_class = None
+        self._markers = ()
+        self._test_started = None
+    
+    def set_context(self, test_class: Optional[str] = None, markers: Iterable[str] = ()):
+        """Attribute the following results to a test class and its markers"""
+        self._test_class = test_class
+        self._markers = tuple(m for m in markers if m in self.BREAKDOWN_MARKERS)
+        self._test_started = time.monotonic()
     
     def log_test(self, test_id: str, status: str, message: str, details: dict = None):
         """Log test execution result"""
+        timestamp = datetime.now().isoformat()
         result = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'test_id': test_id,
             'status': status,
             'message': message,
@@ -36,130 +104,267 @@ class DataLogger:
         }
         
         self.test_results.append(result)
-        logger.info(f"{test_id}: {status} - {message}")
+        logger.info("%s: %s - %s", test_id, status, message)
+        
+        self._count_result(status)
+        if self._jsonl_stream is not None:
+            self._write_jsonl(dict(result, type='result'))
+        if self.results_db is not None:
+            duration = None if self._test_started is None else time.monotonic() - self._test_started
+            self.results_db.add_result(self.session_id, test_id, status, message, timestamp,
+                                       duration, self._test_class)
         
         # Write to CSV
-        self._append_to_csv(test_id, status, message)
+        self._append_to_csv(timestamp, test_id, status, message)
     
     def log_measurement(self, test_id: str, measurement_name: str, value: float, unit: str):
         """Log a measurement during test execution"""
-        measurement = {
-            'timestamp': datetime.now().isoformat(),
-            'test_id': test_id,
-            'measurement': measurement_name,
-            'value': value,
-            'unit': unit
-        }
-        
-        self.measurements.append(measurement)
-        logger.debug(f"{test_id}: {measurement_name} = {value} {unit}")
+        timestamp = time.time()
+        self.measurements.append(test_id, measurement_name, value, unit, timestamp)
+        if self._jsonl_stream is not None:
+            self._write_jsonl({
+                'type': 'measurement',
+                'timestamp': timestamp,
+                'test_id': test_id,
+                'measurement': measurement_name,
+                'value': value,
+                'unit': unit
+            })
+            self._flush_if_due()
+        logger.debug("%s: %s = %s %s", test_id, measurement_name, value, unit)
     
     def log_error(self, test_id: str, error_message: str, traceback: str = ""):
         """Log test error"""
         self.log_test(test_id, "FAIL", error_message, {'traceback': traceback})
-        logger.error(f"{test_id}: {error_message}")
+        logger.error("%s: %s", test_id, error_message)
     
-    def _append_to_csv(self, test_id: str, status: str, message: str):
-        """Append test result to CSV file"""
-        try:
-            with open(self.log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    datetime.now().isoformat(),
-                    test_id,
-                    status,
-                    message
-                ])
-        except Exception as e:
-            logger.error(f"Error writing to CSV: {e}")
+    def flush(self):
+        """Write buffered CSV rows and the JSON Lines stream to their files"""
+        self._last_flush = time.monotonic()
+        if self._pending_rows:
+            try:
+                if self._csv_file is None:
+                    self._csv_file = open(self.log_file, 'a', newline='')
+                    self._csv_writer = csv.writer(self._csv_file)
+                self._csv_writer.writerows(self._pending_rows)
+                self._csv_file.flush()
+                if self.fsync:
+                    os.fsync(self._csv_file.fileno())
+            except Exception as e:
+                logger.error("Error writing to CSV: %s", e)
+            self._pending_rows.clear()
+        if self._jsonl_stream is not None:
+            self._jsonl_stream.flush()
+            if self.fsync:
+                os.fsync(self._jsonl_stream.fileno())
+        if self.results_db is not None:
+            self.results_db.flush()
+    
+    def close(self):
+        """Flush pending rows, finish the JSON Lines stream and close the files"""
+        if self._jsonl_stream is not None:
+            self._write_jsonl(dict(self.generate_summary_report(), type='summary',
+                                   generated=datetime.now().isoformat()))
+        self.flush()
+        self._finalizer.detach()
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv_writer = None
+        if self._jsonl_stream is not None:
+            self._jsonl_stream.close()
+            self._jsonl_stream = None
+    
+    def __enter__(self):
+        """Use the logger as a context manager that closes on exit"""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the logger"""
+        self.close()
+    
+    def _append_to_csv(self, timestamp: str, test_id: str, status: str, message: str):
+        """Buffer a test result row, flushing when the batch policy says so"""
+        self._pending_rows.append([timestamp, test_id, status, message])
+        self._flush_if_due()
+    
+    def _flush_if_due(self):
+        """Flush once a full batch is pending or the flush interval has elapsed"""
+        if (len(self._pending_rows) >= self.flush_count
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+    
+    def _write_jsonl(self, record: Dict):
+        """Append one record to the JSON Lines stream"""
+        self._jsonl_stream.write(json.dumps(record, default=str))
+        self._jsonl_stream.write('\n')
+    
+    def _count_result(self, status: str):
+        """Update the overall, per-class and per-marker result counters"""
+        self._status_counts[status] += 1
+        if self._test_class is not None:
+            self._class_counts.setdefault(self._test_class, Counter())[status] += 1
+        for marker in self._markers:
+            self._marker_counts.setdefault(marker, Counter())[status] += 1
     
     def generate_summary_report(self) -> Dict:
-        """Generate summary report from test results"""
-        summary = {
-            'total_tests': len(self.test_results),
-            'passed': sum(1 for r in self.test_results if r['status'] == 'PASS'),
-            'failed': sum(1 for r in self.test_results if r['status'] == 'FAIL'),
-            'skipped': sum(1 for r in self.test_results if r['status'] == 'SKIP'),
-            'errors': sum(1 for r in self.test_results if r['status'] == 'ERROR'),
-            'pass_rate': 0.0
+        """Generate summary report from the result counters (O(1), safe to poll live)"""
+        return summarize_status_counts(self._status_counts)
+    
+    def generate_breakdown_report(self) -> Dict:
+        """Generate summaries per test class and per marker"""
+        return {
+            'by_class': {name: summarize_status_counts(counts)
+                         for name, counts in self._class_counts.items()},
+            'by_marker': {name: summarize_status_counts(counts)
+                          for name, counts in self._marker_counts.items()}
         }
-        
-        if summary['total_tests'] > 0:
-            summary['pass_rate'] = (summary['passed'] / summary['total_tests']) * 100
-        
-        return summary
     
     def export_json_report(self, output_file: str):
         """Export test results as JSON"""
         report = {
             'generated': datetime.now().isoformat(),
             'summary': self.generate_summary_report(),
+            'breakdown': self.generate_breakdown_report(),
             'test_results': self.test_results,
-            'measurements': self.measurements
+            'measurements': list(self.measurements.records())
         }
         
         with open(output_file, 'w') as f:
             json.dump(report, f, indent=2)
         
-        logger.info(f"JSON report exported to {output_file}")
+        logger.info("JSON report exported to %s", output_file)
     
-    def export_html_report(self, output_file: str):
-        """Export test results as HTML"""
-        summary = self.generate_summary_report()
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Seat Comfort Module - Test Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                h1 {{ color: #333; }}
-                .summary {{ background-color: #f0f0f0; padding: 10px; margin: 10px 0; }}
-                .pass {{ color: green; }}
-                .fail {{ color: red; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #4CAF50; color: white; }}
-            </style>
-        </head>
-        <body>
-            <h1>Seat Comfort Module - Test Execution Report</h1>
-            <div class="summary">
-                <p><strong>Total Tests:</strong> {summary['total_tests']}</p>
-                <p><strong class="pass">Passed:</strong> {summary['passed']}</p>
-                <p><strong class="fail">Failed:</strong> {summary['failed']}</p>
-                <p><strong>Pass Rate:</strong> {summary['pass_rate']:.1f}%</p>
-            </div>
-            
-            <h2>Test Results</h2>
-            <table>
-                <tr>
-                    <th>Test ID</th>
-                    <th>Status</th>
-                    <th>Message</th>
-                    <th>Timestamp</th>
-                </tr>
-        """
+    def export_jsonl_report(self, output_file: str):
+        """Export test results and measurements as JSON Lines, one record at a time"""
+        with open(output_file, 'w') as f:
+            for result in self.test_results:
+                f.write(json.dumps(dict(result, type='result'), default=str) + '\n')
+            for channel in self.measurements.channels():
+                for timestamp, value in zip(channel.timestamps.tolist(), channel.values.tolist()):
+                    f.write(json.dumps({
+                        'type': 'measurement',
+                        'timestamp': timestamp,
+                        'test_id': channel.test_id,
+                        'measurement': channel.name,
+                        'value': value,
+                        'unit': channel.unit
+                    }) + '\n')
+            f.write(json.dumps(dict(self.generate_summary_report(), type='summary',
+                                    generated=datetime.now().isoformat())) + '\n')
         
-        for result in self.test_results:
-            status_class = 'pass' if result['status'] == 'PASS' else 'fail'
-            html_content += f"""
-                <tr>
-                    <td>{result['test_id']}</td>
-                    <td class="{status_class}">{result['status']}</td>
-                    <td>{result['message']}</td>
-                    <td>{result['timestamp']}</td>
-                </tr>
-            """
+        logger.info("JSON Lines report exported to %s", output_file)
+    
+    def export_measurements(self, output_file: str):
+        """Export measurement channels as a compressed NumPy .npz archive
         
-        html_content += """
-            </table>
-        </body>
-        </html>
+        Load it back with load_measurements() to get per-channel arrays.
         """
+        self.measurements.save_npz(output_file)
+        logger.info("Measurements exported to %s", output_file)
+    
+    def export_html_report(self, output_file: str, page_size: int = 500, max_points: int = 1000):
+        """Export test results and measurement charts as HTML
         
-        with open(output_file, 'w') as f:
-            f.write(html_content)
+        Results past the first page_size go to numbered page files next to
+        output_file (see html_report.page_path).
+        """
+        paths = render_html_report(output_file, self.generate_summary_report(), self.test_results,
+                                   self.measurements, page_size, max_points)
         
-        logger.info(f"HTML report exported to {output_file}")
+        logger.info("HTML report exported to %s (%d pages)", output_file, len(paths))
+
+
+def load_measurements(input_file: str) -> MeasurementStore:
+    """Load measurement channels exported by DataLogger.export_measurements"""
+    return MeasurementStore.load_npz(input_file)
+
+
+def summarize_status_counts(status_counts: Dict[str, int]) -> Dict:
+    """Build the summary report from the number of results per status"""
+    summary = {
+        'total_tests': sum(status_counts.values()),
+        'passed': status_counts.get('PASS', 0),
+        'failed': status_counts.get('FAIL', 0),
+        'skipped': status_counts.get('SKIP', 0),
+        'errors': status_counts.get('ERROR', 0),
+        'pass_rate': 0.0
+    }
+    
+    if summary['total_tests'] > 0:
+        summary['pass_rate'] = (summary['passed'] / summary['total_tests']) * 100
+    
+    return summary
+
+
+def iter_jsonl_records(input_file: str, record_type: Optional[str] = None) -> Iterator[Dict]:
+    """Stream records from a JSON Lines report, optionally only one type
+    
+    A half-written last line (the run crashed mid-record) is skipped; a
+    malformed line anywhere else raises json.JSONDecodeError.
+    """
+    with open(input_file) as f:
+        error = None
+        for line in f:
+            if not line.strip():
+                continue
+            if error is not None:
+                raise error
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                error = e
+                continue
+            if record_type is None or record.get('type') == record_type:
+                yield record
+        if error is not None:
+            logger.warning("Skipped truncated last record of %s", input_file)
+
+
+def read_jsonl_summary(input_file: str) -> Dict:
+    """Return the summary of a JSON Lines report
+    
+    Reads only the trailing summary record; if the run never wrote one (it
+    crashed, possibly mid-record), the summary is rebuilt by streaming the
+    result records.
+    """
+    last_line = _read_last_line(input_file)
+    if last_line:
+        try:
+            record = json.loads(last_line)
+        except json.JSONDecodeError:
+            record = {}
+        if record.get('type') == 'summary':
+            return record
+    return summarize_status_counts(Counter(
+        record['status'] for record in iter_jsonl_records(input_file, 'result')
+    ))
+
+
+def _write_csv_rows(log_file: Path, rows: list):
+    """Append CSV rows left pending by a DataLogger that was never closed"""
+    if not rows:
+        return
+    try:
+        with open(log_file, 'a', newline='') as f:
+            csv.writer(f).writerows(rows)
+        rows.clear()
+    except Exception as e:
+        logger.error("Error writing to CSV: %s", e)
+
+
+def _read_last_line(input_file: str, block_size: int = 4096) -> str:
+    """Read the last non-empty line of a file by scanning backwards from its end"""
+    with open(input_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            lines = tail.rstrip(b'\n').split(b'\n')
+            if len(lines) > 1 or position == 0:
+                return lines[-1].decode()
+    return ''
@@ -0,0 +1,52 @@
+"""
+Event Log Module
+Bounded diagnostic event buffer mirroring the SCM's fixed-capacity log
+"""
+
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class EventLog:
+    """Thread-safe ring buffer of diagnostic events with overwrite-oldest semantics
+
+    append() and pop() are O(1). Once capacity is reached the oldest entry is
+    dropped, as the ECU does with its last-N event memory.
+    """
+
+    def __init__(self, capacity: int = 100):
+        """Initialize empty log holding at most capacity events"""
+        self.capacity = capacity
+        self.overwritten = 0
+        self._events = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def append(self, event: Dict):
+        """Store an event, overwriting the oldest one when full"""
+        with self._lock:
+            if len(self._events) == self.capacity:
+                self.overwritten += 1
+            self._events.append(event)
+
+    def pop(self) -> Optional[Dict]:
+        """Remove and return the oldest event, or None if the log is empty"""
+        with self._lock:
+            return self._events.popleft() if self._events else None
+
+    def drain(self) -> List[Dict]:
+        """Remove and return every stored event, oldest first"""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def clear(self):
+        """Discard all events"""
+        with self._lock:
+            self._events.clear()
+            self.overwritten = 0
+
+    def __len__(self) -> int:
+        """Number of stored events"""
+        return len(self._events)
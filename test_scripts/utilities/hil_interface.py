@@ -3,10 +3,17 @@ HIL Interface Module
 Provides abstraction for Hardware-in-the-Loop communication with Seat Comfort Module
 """
 
-import time
 import logging
-from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+from . import can_codec
+from .can_backend import BusPool, SCMBusNode
+from .can_receiver import CANReceiver
+from .can_replay import TraceReplayBus
+from .can_scheduler import PeriodicTransmitter
+from .can_trace import CANTraceRecorder, TracedBus
+from .clock import WallClock
+from .scm_simulator import SimulatedSCM
 
 
 logger = logging.getLogger(__name__)
@@ -22,31 +29,87 @@ class HILInterface:
     MSG_DIAGNOSTIC = 0x7DF
     MSG_DIAGNOSTIC_RESPONSE = 0x7E8
     
-    def __init__(self, config):
-        """Initialize HIL interface"""
+    def __init__(self, config, clock=None, bus_pool: Optional[BusPool] = None):
+        """Initialize HIL interface
+        
+        With a wall clock and CAN_INTERFACE set to a python-can interface
+        ('virtual', 'socketcan') the tester talks to the SCM over that bus.
+        A virtual clock cannot drive a real-time bus, so it (like
+        CAN_INTERFACE='simulated') talks to the simulated SCM in-process.
+        CAN_INTERFACE='replay' plays back the SCM frames recorded in
+        CAN_REPLAY_FILE instead, with either clock.
+        """
         self.config = config
-        self.can_interface = None
+        self.clock = clock or WallClock()
+        self.scm = SimulatedSCM(config, self.clock)
+        self.scm_node = None
+        self._bus_pool = bus_pool
+        self._owns_bus_pool = False
+        if config.CAN_INTERFACE == 'replay':
+            # Non-CAN readings (voltage, current, event log) still come from the simulated SCM
+            self.can_interface = TraceReplayBus(
+                config.CAN_REPLAY_FILE, self.clock, config.CAN_REPLAY_PACING, tx_sink=self.scm
+            )
+        elif self.clock.virtual or config.CAN_INTERFACE == 'simulated':
+            self.can_interface = self.scm  # Simulated SCM stands in for the CAN bus
+        else:
+            if bus_pool is None:
+                self._bus_pool = BusPool()
+                self._owns_bus_pool = True
+            self.can_interface = self._acquire_bus('tester')
+            self.scm_node = SCMBusNode(self.scm, self._acquire_bus('scm'))
+            self.scm_node.start()
         self.last_ctrl_command = None
         self.last_heat_status = None
         self.last_massage_status = None
-        self.event_log = []
+        self.event_log = self.scm.event_log
         self.simulated_time = 0.0
+        self.trace_recorder = None
+        self.bus = self.can_interface  # can_interface, wrapped while a trace is attached
+        self.receiver = CANReceiver(
+            self.can_interface, self.clock,
+            (self.MSG_HEAT_STATUS, self.MSG_MASSAGE_STATUS, self.MSG_DIAGNOSTIC_RESPONSE),
+            capacity=config.RX_BUFFER_SIZE
+        )
+        self.receiver.start()
+        self.ctrl_scheduler = PeriodicTransmitter(self.can_interface, self.clock, config.CAN_CYCLE_TIME)
         
         logger.info("HIL Interface initialized")
     
+    def reset(self, test_name: Optional[str] = None):
+        """Restore SCM and interface state between tests without reconnecting
+        
+        test_name (the pytest node ID of the test about to run) keys the
+        trace marker written at the reset, and selects the segment a replay
+        plays back; replay raises KeyError if none was recorded for it.
+        """
+        self.ctrl_scheduler.stop()
+        # Frames already in flight on a real bus were stamped before the reset
+        now = self.clock.time()
+        self.receiver.clear(before=now)
+        if self.trace_recorder is not None:
+            self.trace_recorder.mark(now, test_name)
+        if isinstance(self.can_interface, TraceReplayBus):
+            self.can_interface.next_segment(test_name)
+        self.scm.reset()
+        self.last_ctrl_command = None
+        self.last_heat_status = None
+        self.last_massage_status = None
+        self.simulated_time = 0.0
+        logger.debug("HIL interface reset")
+    
     def send_control_command(self, heat_enable=False, heat_intensity=0, 
                            massage_enable=False, massage_intensity=0, 
                            massage_pattern=0):
-        """Send SEAT_CTRL_CMD (0x100) to SCM"""
-        byte0 = (heat_enable & 0x01) | ((heat_intensity & 0x03) << 1)
-        byte1 = (massage_enable & 0x01) | ((massage_intensity & 0x07) << 1) | \
-                ((massage_pattern & 0x07) << 4)
-        
+        """Send SEAT_CTRL_CMD (0x100) to SCM now and repeat it every CAN_CYCLE_TIME"""
+        self._pump_cyclic()
         message = {
             'arbitration_id': self.MSG_CTRL_CMD,
-            'data': [byte0, byte1, 0, 0, 0, 0, 0, 0],
+            'data': can_codec.encode_control_command(
+                heat_enable, heat_intensity, massage_enable, massage_intensity, massage_pattern
+            ),
             'is_extended_id': False,
-            'timestamp': time.time()
+            'timestamp': self.clock.time()
         }
         
         self.last_ctrl_command = {
@@ -56,56 +119,75 @@ class HILInterface:
             'massage_intensity': massage_intensity,
             'massage_pattern': massage_pattern
         }
+        self.bus.send(message)
+        self.ctrl_scheduler.set_message(message)
+        self.ctrl_scheduler.start()
         
-        logger.debug(f"Sent SEAT_CTRL_CMD: {message}")
+        logger.debug("Sent SEAT_CTRL_CMD: %s", message)
         return message
     
+    def attach_trace(self, recorder: CANTraceRecorder):
+        """Record every frame the tester sends or receives from now on"""
+        self.detach_trace()
+        self.trace_recorder = recorder
+        self._set_bus(TracedBus(self.can_interface, recorder))
+    
+    def detach_trace(self) -> Optional[CANTraceRecorder]:
+        """Stop recording and return the detached recorder (the caller closes it)"""
+        recorder, self.trace_recorder = self.trace_recorder, None
+        if recorder is not None:
+            recorder.flush()
+            self._set_bus(self.can_interface)
+        return recorder
+    
+    def pause_control_command(self):
+        """Stop cyclic SEAT_CTRL_CMD transmission to inject a message loss window"""
+        self.ctrl_scheduler.pause()
+    
+    def resume_control_command(self):
+        """Resume cyclic SEAT_CTRL_CMD transmission on its original deadline grid"""
+        self.ctrl_scheduler.resume()
+    
+    def control_command_jitter(self) -> Dict:
+        """Scheduling jitter achieved by the cyclic SEAT_CTRL_CMD transmitter"""
+        self._pump_cyclic()
+        return self.ctrl_scheduler.jitter()
+    
     def read_heat_status(self) -> Dict:
         """Read SEAT_HEAT_STATUS (0x200) from SCM"""
-        # Simulate reading from CAN
-        status = {
-            'temperature_c': 25.0 + (time.time() % 40),  # Simulated ramp
-            'duty_cycle': 50 if self.last_ctrl_command and self.last_ctrl_command['heat_enable'] else 0,
-            'heating_active': self.last_ctrl_command and self.last_ctrl_command['heat_enable'],
-            'temp_warning': False,
-            'heater_fault': False,
-            'flags': 0
-        }
+        status = can_codec.decode_heat_status(self._latest_message(self.MSG_HEAT_STATUS)['data'])
         
         self.last_heat_status = status
-        logger.debug(f"Read SEAT_HEAT_STATUS: {status}")
+        logger.debug("Read SEAT_HEAT_STATUS: %s", status)
         return status
     
     def read_heat_status_raw(self) -> Dict:
         """Read raw SEAT_HEAT_STATUS message with timestamp"""
-        status = self.read_heat_status()
+        message = self._next_message(self.MSG_HEAT_STATUS)
+        self.last_heat_status = can_codec.decode_heat_status(message['data'])
         return {
-            'data': status,
-            'timestamp': time.time(),
+            'data': self.last_heat_status,
+            'payload': message['data'],
+            'timestamp': message['timestamp'],
             'arbitration_id': self.MSG_HEAT_STATUS
         }
     
     def read_massage_status(self) -> Dict:
         """Read SEAT_MASSAGE_STATUS (0x300) from SCM"""
-        status = {
-            'pressure_kpa': 120.0 if (self.last_ctrl_command and self.last_ctrl_command['massage_enable']) else 0,
-            'duty_cycle': (self.last_ctrl_command['massage_intensity'] * 20 if self.last_ctrl_command else 0),
-            'pump_active': self.last_ctrl_command and self.last_ctrl_command['massage_enable'],
-            'pressure_warning': False,
-            'pump_fault': False,
-            'flags': 0
-        }
+        status = can_codec.decode_massage_status(self._latest_message(self.MSG_MASSAGE_STATUS)['data'])
         
         self.last_massage_status = status
-        logger.debug(f"Read SEAT_MASSAGE_STATUS: {status}")
+        logger.debug("Read SEAT_MASSAGE_STATUS: %s", status)
         return status
     
     def read_massage_status_raw(self) -> Dict:
         """Read raw SEAT_MASSAGE_STATUS message with timestamp"""
-        status = self.read_massage_status()
+        message = self._next_message(self.MSG_MASSAGE_STATUS)
+        self.last_massage_status = can_codec.decode_massage_status(message['data'])
         return {
-            'data': status,
-            'timestamp': time.time(),
+            'data': self.last_massage_status,
+            'payload': message['data'],
+            'timestamp': message['timestamp'],
             'arbitration_id': self.MSG_MASSAGE_STATUS
         }
     
@@ -124,70 +206,116 @@ class HILInterface:
     
     def read_voltage(self) -> float:
         """Read supply voltage"""
-        return 13.2  # Nominal 13.2V (typically from vehicle)
+        return self.scm.supply_voltage()
     
     def read_current(self) -> float:
         """Read current consumption in Amperes"""
-        if self.last_ctrl_command and self.last_ctrl_command['heat_enable']:
-            intensity = self.last_ctrl_command['heat_intensity']
-            voltage = self.read_voltage()
-            # Calculate approximate current based on intensity
-            power_map = {0: 0, 1: 30, 2: 50, 3: 70}  # Watts
-            return power_map.get(intensity, 0) / voltage if voltage > 0 else 0
-        return 0.05  # Quiescent current
+        return self.scm.supply_current()
     
     def read_event_log(self) -> Optional[Dict]:
         """Read next event from diagnostic log"""
-        if self.event_log:
-            return self.event_log.pop(0)
-        return None
+        self._pump_cyclic()
+        self.scm.sync()
+        return self.event_log.pop()
+    
+    def drain_event_log(self) -> List[Dict]:
+        """Read and remove every event in the diagnostic log, oldest first"""
+        self._pump_cyclic()
+        self.scm.sync()
+        return self.event_log.drain()
     
     def read_massage_zone_state(self) -> Dict:
         """Read state of massage zones (left, center, right)"""
-        return {
-            'left_active': False,
-            'center_active': True,
-            'right_active': False,
-            'timestamp': time.time()
-        }
+        zone_state = self.scm.zone_state()
+        zone_state['timestamp'] = self.clock.time()
+        return zone_state
     
     def set_reference_temperature(self, temp_c: float):
         """Set reference/simulated seat temperature (for HIL simulation)"""
-        logger.debug(f"Setting reference temperature to {temp_c}°C")
+        self.scm.set_reference_temperature(temp_c)
+        logger.debug("Setting reference temperature to %s°C", temp_c)
+    
+    def set_ambient_temperature(self, temp_c: float):
+        """Set cabin ambient temperature the seat exchanges heat with (for HIL simulation)"""
+        self.scm.set_ambient_temperature(temp_c)
+        logger.debug("Setting ambient temperature to %s°C", temp_c)
     
     def set_supply_voltage(self, voltage: float):
         """Set supply voltage for testing (for HIL simulation)"""
-        logger.debug(f"Setting supply voltage to {voltage}V")
+        self.scm.set_supply_voltage(voltage)
+        logger.debug("Setting supply voltage to %sV", voltage)
     
     def simulate_pump_overpressure(self):
         """Simulate pump overpressure condition"""
         logger.debug("Simulating pump overpressure condition")
-        if self.last_massage_status:
-            self.last_massage_status['pressure_kpa'] = 160.0
+        self.scm.inject_overpressure()
     
     def simulate_pump_fault(self):
         """Simulate pump fault (pressure not rising)"""
         logger.debug("Simulating pump fault")
-        if self.last_massage_status:
-            self.last_massage_status['pump_fault'] = True
+        self.scm.inject_pump_fault()
     
     def simulate_time_advance(self, seconds: float):
         """Simulate advancing time (for timeout/duration tests)"""
+        self.clock.advance(seconds)
         self.simulated_time += seconds
-        logger.debug(f"Advanced simulated time by {seconds}s (total: {self.simulated_time}s)")
+        logger.debug("Advanced simulated time by %ss (total: %ss)", seconds, self.simulated_time)
     
     def wait_for_message(self, msg_id: int, timeout: float = 1.0) -> Optional[Dict]:
-        """Wait for a specific CAN message"""
-        start = time.time()
-        while time.time() - start < timeout:
-            # Poll for message
-            if msg_id == self.MSG_HEAT_STATUS:
-                return self.read_heat_status_raw()
-            elif msg_id == self.MSG_MASSAGE_STATUS:
-                return self.read_massage_status_raw()
-            time.sleep(0.01)
-        return None
+        """Wait for the next CAN message with the given ID"""
+        self._pump_cyclic()
+        return self.receiver.wait_for_message(msg_id, timeout)
+    
+    def message_sequence(self, msg_id: int) -> int:
+        """Cursor marking how many messages with the given ID have been received"""
+        self._pump_cyclic()
+        return self.receiver.sequence(msg_id)
+    
+    def wait_for_message_after(self, msg_id: int, cursor: int,
+                               timeout: float = 1.0) -> Tuple[Optional[Dict], int]:
+        """Wait for the first message received after cursor; returns (message, next cursor)"""
+        self._pump_cyclic()
+        return self.receiver.wait_for_sequence(msg_id, cursor, timeout)
+    
+    def _latest_message(self, msg_id: int) -> Dict:
+        """Return the most recent received message, waiting for the first one"""
+        self._pump_cyclic()
+        message = self.receiver.latest(msg_id)
+        if message is None:
+            message = self._next_message(msg_id)
+        return message
+    
+    def _next_message(self, msg_id: int) -> Dict:
+        """Wait for the next message or raise if the SCM stays silent"""
+        message = self.wait_for_message(msg_id, self.config.CAN_TIMEOUT)
+        if message is None:
+            raise TimeoutError(f"No message 0x{msg_id:03X} received within {self.config.CAN_TIMEOUT}s")
+        return message
+    
+    def _pump_cyclic(self):
+        """Deliver cyclic transmissions that simulated time has passed (virtual clock)"""
+        if self.clock.virtual:
+            self.ctrl_scheduler.pump()
+    
+    def _set_bus(self, bus):
+        """Point the tester, the receiver and the cyclic transmitter at a (possibly traced) bus"""
+        self.bus = bus
+        self.receiver.bus = bus
+        self.ctrl_scheduler.bus = bus
+    
+    def _acquire_bus(self, role: str):
+        """Open (or reuse) one endpoint of the configured CAN bus"""
+        return self._bus_pool.acquire(
+            self.config.CAN_INTERFACE, self.config.CAN_CHANNEL, self.config.CAN_BITRATE, role
+        )
     
     def close(self):
         """Close HIL interface"""
+        self.ctrl_scheduler.stop()
+        self.receiver.stop()
+        self.detach_trace()
+        if self.scm_node is not None:
+            self.scm_node.stop()
+        if self._owns_bus_pool:
+            self._bus_pool.shutdown()
         logger.info("Closing HIL interface")
@@ -0,0 +1,192 @@
+"""
+HTML Report Module
+Streaming HTML test report with one file per result page and decimated measurement charts
+"""
+
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterable, List, TextIO, Tuple
+
+import numpy as np
+
+from .measurement_store import MeasurementChannel, MeasurementStore
+
+
+# Chart groups: (title, keywords matched against channel name, units)
+CHART_GROUPS = (
+    ('Temperature', ('temp',), ('°C', 'C')),
+    ('Pressure', ('pressure',), ('kPa',)),
+    ('Duty Cycle', ('duty',), ('%',))
+)
+
+CHART_WIDTH = 800
+CHART_HEIGHT = 200
+
+_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Seat Comfort Module - Test Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        h1 { color: #333; }
+        .summary { background-color: #f0f0f0; padding: 10px; margin: 10px 0; }
+        .pass { color: green; }
+        .fail { color: red; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #4CAF50; color: white; }
+        .pager { margin: 10px 0; }
+        svg.chart { border: 1px solid #ddd; background: #fff; }
+        svg.chart polyline { fill: none; stroke: #1f77b4; stroke-width: 1; }
+        svg.chart text { font-size: 11px; fill: #555; }
+    </style>
+</head>
+<body>
+    <h1>Seat Comfort Module - Test Execution Report</h1>
+"""
+
+
+def decimate_minmax(timestamps: np.ndarray, values: np.ndarray,
+                    max_points: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a series to at most max_points while keeping every peak
+
+    Samples are split into max_points // 2 buckets and each bucket is
+    replaced by its minimum and maximum at the bucket's middle time, so
+    spikes survive decimation.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= max_points:
+        return timestamps, values
+    buckets = max(max_points // 2, 1)
+    edges = np.linspace(0, len(values), buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    mins = np.minimum.reduceat(values, starts)
+    maxs = np.maximum.reduceat(values, starts)
+    middles = timestamps[(starts + edges[1:] - 1) // 2]
+    return np.repeat(middles, 2), np.column_stack((mins, maxs)).ravel()
+
+
+def page_path(output_file: str, page: int) -> str:
+    """File of a report page: output_file itself for page 1, name_pageN.html after that"""
+    if page == 1:
+        return str(output_file)
+    path = Path(output_file)
+    return str(path.with_name(f'{path.stem}_page{page}{path.suffix}'))
+
+
+def render_html_report(output_file: str, summary: Dict, results: Iterable[Dict],
+                       measurements: MeasurementStore, page_size: int = 500,
+                       max_points: int = 1000) -> List[str]:
+    """Write an HTML report, one file per page of results
+
+    The first page (output_file) holds the summary, the first page_size
+    results and the measurement charts; every further page_size results go
+    to their own file (see page_path) linked from the previous page. Rows
+    are written as they are produced, and charts are inline SVG decimated
+    to max_points per channel, so neither memory nor the size of any one
+    file grows with run length. Returns the written files in page order.
+    """
+    results = iter(results)
+    row = next(results, None)
+    paths = []
+    page = 1
+    while True:
+        path = page_path(output_file, page)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(_HEAD)
+            if page == 1:
+                _write_summary(f, summary)
+            f.write(f'\n    <h2>Test Results - Page {page}</h2>\n')
+            f.write('    <table>\n')
+            f.write('        <thead><tr><th>Test ID</th><th>Status</th><th>Message</th>'
+                    '<th>Timestamp</th></tr></thead>\n')
+            f.write('        <tbody>\n')
+            row_count = 0
+            while row is not None and row_count < page_size:
+                _write_row(f, row)
+                row_count += 1
+                # Reading one row ahead tells whether a next page exists
+                row = next(results, None)
+            f.write('        </tbody>\n')
+            f.write('    </table>\n')
+            _write_pager(f, output_file, page, has_next=row is not None)
+            if page == 1:
+                _write_charts(f, measurements, max_points)
+            f.write('</body>\n</html>\n')
+        paths.append(path)
+        if row is None:
+            return paths
+        page += 1
+
+
+def _write_summary(f: TextIO, summary: Dict):
+    """Write the pass/fail summary block"""
+    f.write('    <div class="summary">\n')
+    f.write(f'        <p><strong>Total Tests:</strong> {summary["total_tests"]}</p>\n')
+    f.write(f'        <p><strong class="pass">Passed:</strong> {summary["passed"]}</p>\n')
+    f.write(f'        <p><strong class="fail">Failed:</strong> {summary["failed"]}</p>\n')
+    f.write(f'        <p><strong>Pass Rate:</strong> {summary["pass_rate"]:.1f}%</p>\n')
+    f.write('    </div>\n')
+
+
+def _write_row(f: TextIO, result: Dict):
+    """Write one result table row"""
+    status_class = 'pass' if result['status'] == 'PASS' else 'fail'
+    f.write(
+        f'            <tr><td>{escape(str(result["test_id"]))}</td>'
+        f'<td class="{status_class}">{escape(str(result["status"]))}</td>'
+        f'<td>{escape(str(result["message"]))}</td>'
+        f'<td>{escape(str(result["timestamp"]))}</td></tr>\n'
+    )
+
+
+def _write_pager(f: TextIO, output_file: str, page: int, has_next: bool):
+    """Write links to the neighbouring pages, if there are any"""
+    links = []
+    if page > 1:
+        links.append(f'<a href="{escape(Path(page_path(output_file, page - 1)).name)}">'
+                     '&laquo; Prev</a>')
+    if has_next:
+        links.append(f'<a href="{escape(Path(page_path(output_file, page + 1)).name)}">'
+                     'Next &raquo;</a>')
+    if links:
+        f.write(f'    <div class="pager">{" ".join(links)}</div>\n')
+
+
+def _write_charts(f: TextIO, measurements: MeasurementStore, max_points: int):
+    """Write one decimated SVG chart per temperature, pressure and duty channel"""
+    for title, keywords, units in CHART_GROUPS:
+        channels = [c for c in measurements.channels()
+                    if c.size > 0 and _matches(c, keywords, units)]
+        if not channels:
+            continue
+        f.write(f'\n    <h2>{escape(title)}</h2>\n')
+        for channel in channels:
+            _write_chart(f, channel, max_points)
+
+
+def _matches(channel: MeasurementChannel, keywords: Tuple[str, ...], units: Tuple[str, ...]) -> bool:
+    """Whether a channel belongs to a chart group"""
+    name = channel.name.lower()
+    return channel.unit in units or any(keyword in name for keyword in keywords)
+
+
+def _write_chart(f: TextIO, channel: MeasurementChannel, max_points: int):
+    """Write a single channel as an inline SVG polyline"""
+    timestamps, values = decimate_minmax(channel.timestamps, channel.values, max_points)
+    t_min, t_span = timestamps[0], max(timestamps[-1] - timestamps[0], 1e-9)
+    v_min, v_max = float(values.min()), float(values.max())
+    v_span = max(v_max - v_min, 1e-9)
+    margin = 20
+    xs = margin + (timestamps - t_min) / t_span * (CHART_WIDTH - 2 * margin)
+    ys = CHART_HEIGHT - margin - (values - v_min) / v_span * (CHART_HEIGHT - 2 * margin)
+    points = ' '.join(f'{x:.1f},{y:.1f}' for x, y in zip(xs.tolist(), ys.tolist()))
+    label = escape(f'{channel.test_id}: {channel.name} [{channel.unit}] '
+                   f'({channel.size} samples, {v_min:.2f} .. {v_max:.2f})')
+    f.write(f'    <p>{label}</p>\n')
+    f.write(f'    <svg class="chart" width="{CHART_WIDTH}" height="{CHART_HEIGHT}">'
+            f'<polyline points="{points}"/>'
+            f'<text x="2" y="12">{v_max:.2f}</text>'
+            f'<text x="2" y="{CHART_HEIGHT - 4}">{v_min:.2f}</text></svg>\n')
@@ -0,0 +1,80 @@
+"""
+Logging Pipeline Module
+Queued, non-blocking log handling with size-based rotation and gzip compression
+"""
+
+import gzip
+import logging
+import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def _gzip_namer(name: str) -> str:
+    """Name rotated backups test_execution.log.1.gz, ..."""
+    return name + '.gz'
+
+
+def _gzip_rotator(source: str, dest: str):
+    """Compress the file being rotated out into its backup"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread
+
+    The stdlib prepare() formats the message and traceback on the logging
+    thread so the record can be pickled. This queue never leaves the
+    process, so the record is enqueued as is and the listener's handlers
+    format it. Arguments are therefore rendered when the listener gets to
+    the record; pass values, not objects that change right after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record unformatted"""
+        return record
+
+
+def start_logging(log_file, level: int = logging.DEBUG, max_bytes: int = 5 * 1024 * 1024,
+                  backup_count: int = 5) -> QueueListener:
+    """Route all logging through a queue so the calling thread never formats or writes
+
+    The root logger gets a DeferredQueueHandler; a QueueListener thread formats the
+    records and writes them to the console and to log_file. The file rotates
+    at max_bytes and keeps backup_count gzip-compressed backups. Stop the
+    returned listener to flush pending records.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(DeferredQueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: QueueListener):
+    """Detach the queue from the root logger and flush every pending record"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
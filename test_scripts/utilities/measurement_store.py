@@ -0,0 +1,194 @@
+"""
+Measurement Store Module
+Columnar, array-backed storage of measurement channels with .npz export
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+
+class MeasurementChannel:
+    """One measured quantity of one test: float64 timestamps and values with a single unit
+
+    Samples go into preallocated arrays that double in size when full, so
+    appending is amortized O(1) with no per-sample objects.
+    """
+
+    def __init__(self, test_id: str, name: str, unit: str, capacity: int = 1024):
+        """Initialize empty channel"""
+        self.test_id = test_id
+        self.name = name
+        self.unit = sys.intern(unit)
+        self.size = 0
+        self._timestamps = np.empty(capacity, dtype=np.float64)
+        self._values = np.empty(capacity, dtype=np.float64)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Epoch timestamps of the stored samples"""
+        return self._timestamps[:self.size]
+
+    @property
+    def values(self) -> np.ndarray:
+        """Stored sample values"""
+        return self._values[:self.size]
+
+    def append(self, timestamp: float, value: float):
+        """Add one sample"""
+        if self.size == len(self._values):
+            self._grow(max(2 * self.size, 1))
+        self._timestamps[self.size] = timestamp
+        self._values[self.size] = value
+        self.size += 1
+
+    def extend(self, timestamps, values):
+        """Add many samples at once"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if timestamps.shape != values.shape:
+            raise ValueError("timestamps and values must have the same shape")
+        end = self.size + len(values)
+        if end > len(self._values):
+            self._grow(max(2 * len(self._values), end))
+        self._timestamps[self.size:end] = timestamps
+        self._values[self.size:end] = values
+        self.size = end
+
+    def _grow(self, capacity: int):
+        """Reallocate the sample arrays with a larger capacity"""
+        timestamps = np.empty(capacity, dtype=np.float64)
+        values = np.empty(capacity, dtype=np.float64)
+        timestamps[:self.size] = self._timestamps[:self.size]
+        values[:self.size] = self._values[:self.size]
+        self._timestamps, self._values = timestamps, values
+
+
+class MeasurementStore:
+    """Measurement channels keyed by (test_id, measurement name)
+
+    Also behaves like the list of measurement dicts it replaces: len(),
+    iteration and indexing see the samples in the order they were logged.
+    That order is sorted once and cached until more samples arrive.
+    """
+
+    def __init__(self):
+        """Initialize empty store"""
+        self._channels = {}
+        self._order_cache = None
+
+    def append(self, test_id: str, name: str, value: float, unit: str, timestamp: float):
+        """Add a sample to its channel, creating the channel on first use"""
+        channel = self._channels.get((test_id, name))
+        if channel is None:
+            channel = self._channels[(test_id, name)] = MeasurementChannel(test_id, name, unit)
+        elif unit != channel.unit:
+            raise ValueError(
+                f"{test_id}: {name} is recorded in {channel.unit}, got a sample in {unit}"
+            )
+        channel.append(timestamp, value)
+        self._order_cache = None
+
+    def channel(self, test_id: str, name: str) -> MeasurementChannel:
+        """Return a channel; raises KeyError if nothing was recorded for it"""
+        return self._channels[(test_id, name)]
+
+    def channels(self) -> List[MeasurementChannel]:
+        """All channels in creation order"""
+        return list(self._channels.values())
+
+    def clear(self):
+        """Discard every channel"""
+        self._channels.clear()
+        self._order_cache = None
+
+    def __len__(self) -> int:
+        """Total number of samples across channels"""
+        return sum(channel.size for channel in self._channels.values())
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate over the samples as measurement dicts in logged order"""
+        return self.records()
+
+    def __getitem__(self, index):
+        """Measurement dict (or list of them for a slice) at a position in logged order"""
+        channels, channel_index, sample_index = self._order()
+        if isinstance(index, slice):
+            return [_record(channels[c], i)
+                    for c, i in zip(channel_index[index].tolist(), sample_index[index].tolist())]
+        return _record(channels[channel_index[index]], int(sample_index[index]))
+
+    def records(self) -> Iterator[Dict]:
+        """Yield samples as measurement dicts in logged (timestamp) order"""
+        channels, channel_index, sample_index = self._order()
+        timestamps = [channel.timestamps.tolist() for channel in channels]
+        values = [channel.values.tolist() for channel in channels]
+        for c, i in zip(channel_index.tolist(), sample_index.tolist()):
+            channel = channels[c]
+            yield {
+                'timestamp': datetime.fromtimestamp(timestamps[c][i]).isoformat(),
+                'test_id': channel.test_id,
+                'measurement': channel.name,
+                'value': values[c][i],
+                'unit': channel.unit
+            }
+
+    def _order(self):
+        """Channels plus the (channel, sample) index of every sample, sorted by timestamp
+
+        The result is cached. Channels only grow, so a cache built for the
+        same total sample count is still valid, including after samples were
+        added through a channel's own append()/extend().
+        """
+        channels = self.channels()
+        sizes = [channel.size for channel in channels]
+        total = sum(sizes)
+        if self._order_cache is not None and self._order_cache[0] == total:
+            return self._order_cache[1:]
+        if not channels:
+            return channels, np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        timestamps = np.concatenate([channel.timestamps for channel in channels])
+        channel_index = np.repeat(np.arange(len(channels)), sizes)
+        sample_index = np.concatenate([np.arange(size) for size in sizes])
+        order = np.argsort(timestamps, kind='stable')
+        self._order_cache = (total, channels, channel_index[order], sample_index[order])
+        return self._order_cache[1:]
+
+    def save_npz(self, output_file: str):
+        """Write all channels to a compressed .npz archive"""
+        channels = self.channels()
+        arrays = {
+            'test_ids': np.array([c.test_id for c in channels], dtype=str),
+            'names': np.array([c.name for c in channels], dtype=str),
+            'units': np.array([c.unit for c in channels], dtype=str)
+        }
+        for index, channel in enumerate(channels):
+            arrays[f'timestamps_{index}'] = channel.timestamps
+            arrays[f'values_{index}'] = channel.values
+        np.savez_compressed(output_file, **arrays)
+
+    @classmethod
+    def load_npz(cls, input_file: str) -> 'MeasurementStore':
+        """Rebuild a store from an archive written by save_npz"""
+        store = cls()
+        with np.load(input_file, allow_pickle=False) as archive:
+            keys = zip(archive['test_ids'].tolist(), archive['names'].tolist(),
+                       archive['units'].tolist())
+            for index, (test_id, name, unit) in enumerate(keys):
+                channel = MeasurementChannel(test_id, name, unit, capacity=0)
+                channel.extend(archive[f'timestamps_{index}'], archive[f'values_{index}'])
+                store._channels[(test_id, name)] = channel
+        return store
+
+
+def _record(channel: MeasurementChannel, index: int) -> Dict:
+    """Measurement dict of one sample of a channel"""
+    return {
+        'timestamp': datetime.fromtimestamp(float(channel.timestamps[index])).isoformat(),
+        'test_id': channel.test_id,
+        'measurement': channel.name,
+        'value': float(channel.values[index]),
+        'unit': channel.unit
+    }
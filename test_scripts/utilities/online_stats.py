@@ -0,0 +1,220 @@
+"""
+Online Statistics Module
+Single-pass, constant-memory signal statistics that can be merged across workers
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+
+# Magnitudes below this are counted as zero by the quantile sketch
+_MIN_MAGNITUDE = 1e-9
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a relative accuracy guarantee
+    
+    Values are counted in logarithmically sized buckets (positive and
+    negative magnitudes separately, plus a zero bucket), so any quantile is
+    returned within relative_accuracy of the true sample value. Memory
+    depends on the dynamic range of the values, not on how many there are;
+    past max_buckets per sign the smallest magnitudes are collapsed
+    together. Two sketches with the same accuracy merge by adding counts.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """Initialize empty sketch"""
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.count = 0
+        self.zero_count = 0
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = {}
+        self._negative = {}
+    
+    def add(self, value: float):
+        """Count one value"""
+        self.count += 1
+        if abs(value) < _MIN_MAGNITUDE:
+            self.zero_count += 1
+            return
+        store = self._positive if value > 0 else self._negative
+        key = math.ceil(math.log(abs(value)) / self._log_gamma)
+        store[key] = store.get(key, 0) + 1
+        if len(store) > self.max_buckets:
+            self._collapse(store)
+    
+    def add_many(self, values):
+        """Count an array of values at once"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.count += len(values)
+        magnitudes = np.abs(values)
+        nonzero = magnitudes >= _MIN_MAGNITUDE
+        self.zero_count += len(values) - int(np.count_nonzero(nonzero))
+        keys = np.ceil(np.log(magnitudes[nonzero]) / self._log_gamma).astype(np.int64)
+        positive = values[nonzero] > 0
+        for store, store_keys in ((self._positive, keys[positive]), (self._negative, keys[~positive])):
+            unique, counts = np.unique(store_keys, return_counts=True)
+            for key, count in zip(unique.tolist(), counts.tolist()):
+                store[key] = store.get(key, 0) + count
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+    
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Add the counts of another sketch with the same accuracy to this one"""
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for store, other_store in ((self._positive, other._positive), (self._negative, other._negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+        return self
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0.0-1.0) of the counted values, or None if empty
+        
+        The q-quantile is the sorted value at rank floor(q * (count - 1)),
+        without interpolation (numpy.quantile's 'lower' method, not its
+        default 'linear'): p95 of [-5, -1, 0, 1, 5] is 1, not 3.4. The
+        value returned is within relative_accuracy of that sample.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        # Largest negative magnitudes come first, then zero, then positives upwards
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self._positive))
+    
+    def _bucket_value(self, key: int) -> float:
+        """Magnitude that represents a bucket within the relative accuracy"""
+        return 2 * self._gamma ** key / (self._gamma + 1)
+    
+    def _collapse(self, store: Dict[int, int]):
+        """Fold the smallest-magnitude buckets of a store into one to respect max_buckets"""
+        keys = sorted(store)
+        excess = keys[:len(keys) - self.max_buckets + 1]
+        target = keys[len(excess) - 1]
+        total = sum(store.pop(key) for key in excess)
+        store[target] = total
+
+
+class OnlineStatistics:
+    """Running count, mean, variance, min, max and quantiles of a signal
+    
+    Mean and variance use Welford's update per sample (and Chan's pairwise
+    combination for arrays and merges), so nothing is kept per sample and
+    the result is numerically stable for long captures. Quantiles come from
+    a QuantileSketch. Accumulators from parallel workers combine with
+    merge() into the statistics of all their samples together.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01):
+        """Initialize empty accumulator"""
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._m2 = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+    
+    def update(self, value: float):
+        """Add one sample, e.g. from a live status read"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value)
+    
+    def update_many(self, values):
+        """Add an array of samples at once"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        mean = float(values.mean())
+        self._combine(len(values), mean, float(np.square(values - mean).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.add_many(values)
+    
+    def merge(self, other: 'OnlineStatistics') -> 'OnlineStatistics':
+        """Add the samples summarized by another accumulator to this one"""
+        if other.count:
+            self._combine(other.count, other.mean, other._m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.sketch.merge(other.sketch)
+        return self
+    
+    @property
+    def variance(self) -> float:
+        """Population variance of the samples"""
+        return self._m2 / self.count if self.count else 0.0
+    
+    @property
+    def std_dev(self) -> float:
+        """Population standard deviation of the samples"""
+        return math.sqrt(self.variance)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0.0-1.0) of the samples, or None if empty
+        
+        Lower-rank quantile as in QuantileSketch.quantile, clamped to the
+        exact min and max.
+        """
+        value = self.sketch.quantile(q)
+        if value is None:
+            return None
+        return min(max(value, self.min), self.max)
+    
+    def summary(self) -> Dict:
+        """Statistics dict as returned by WaveformAnalyzer.calculate_statistics
+        
+        p50/p95/p99 are lower-rank quantiles (see QuantileSketch.quantile).
+        Empty if no samples were added.
+        """
+        if not self.count:
+            return {}
+        return {
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'std_dev': self.std_dev,
+            'range': self.max - self.min,
+            'count': self.count,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99)
+        }
+    
+    def _combine(self, count: int, mean: float, m2: float):
+        """Fold in the count, mean and squared deviations of another set of samples"""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
@@ -0,0 +1,316 @@
+"""
+Plant Models Module
+Physics-based simulation of the Seat Comfort Module actuators for HIL testing
+"""
+
+import math
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+
+class ThermalPlant:
+    """Lumped-parameter seat heater model with the SCM thermostat in the loop
+
+    C * dT/dt = P_heater * duty(T) - (T - T_ambient) / R, where the thermostat
+    duty is 1 below (setpoint - 1°C), 0 above (setpoint + 2°C) and linear in
+    between. Each region is linear, so steps use the exact discretisation
+    T[k+1] = T_eq + (T[k] - T_eq) * a and only switch at boundary crossings.
+    """
+
+    NOMINAL_VOLTAGE = 13.2
+    HEATER_POWER = {0: 0.0, 1: 30.0, 2: 50.0, 3: 70.0}  # Watts at nominal voltage
+    SETPOINTS = {1: 40.0, 2: 50.0, 3: 60.0}  # °C per intensity level
+    HYSTERESIS_LOW = 1.0  # Full power below setpoint - 1°C
+    HYSTERESIS_HIGH = 2.0  # Heater off above setpoint + 2°C
+
+    def __init__(self, step_time: float = 0.001, ambient_temp: float = 20.0,
+                 thermal_mass: float = 85.0, thermal_resistance: float = 1.0,
+                 cutoff_temp: float = 68.0):
+        """Initialize thermal plant at ambient temperature"""
+        self.step_time = step_time
+        self.ambient_temp = ambient_temp
+        self.thermal_mass = thermal_mass
+        self.thermal_resistance = thermal_resistance
+        self.cutoff_temp = cutoff_temp
+        self.supply_voltage = self.NOMINAL_VOLTAGE
+        self.temperature = ambient_temp
+        self.enabled = False
+        self.intensity = 0
+        self.shutdown = False
+
+    def set_command(self, enabled: bool, intensity: int):
+        """Apply heating command from SEAT_CTRL_CMD"""
+        self.enabled = bool(enabled)
+        self.intensity = intensity if intensity in self.HEATER_POWER else 0
+        if not self.enabled:
+            # Disable command takes the ECU out of FAULT_SAFE
+            self.shutdown = False
+        self._check_cutoff()
+
+    def set_temperature(self, temp_c: float):
+        """Force seat temperature (HIL reference injection)"""
+        self.temperature = float(temp_c)
+        self._check_cutoff()
+
+    @property
+    def over_temperature(self) -> bool:
+        """True while the sensor reads above the safety limit"""
+        return self.temperature > self.cutoff_temp
+
+    def available_power(self) -> float:
+        """Heater power at 100% duty for the current command and supply voltage"""
+        if not self.enabled or self.shutdown:
+            return 0.0
+        nominal = self.HEATER_POWER[self.intensity]
+        return nominal * (self.supply_voltage / self.NOMINAL_VOLTAGE) ** 2
+
+    def duty_cycle(self) -> float:
+        """Thermostat duty cycle (0.0-1.0) at the current temperature"""
+        power = self.available_power()
+        if power <= 0:
+            return 0.0
+        t_on, t_off = self._thresholds()
+        if self.temperature <= t_on:
+            return 1.0
+        if self.temperature >= t_off:
+            return 0.0
+        return (t_off - self.temperature) / (t_off - t_on)
+
+    def heater_power(self) -> float:
+        """Electrical power currently delivered to the heating element"""
+        return self.available_power() * self.duty_cycle()
+
+    def advance(self, n_steps: int) -> float:
+        """Advance the model by n fixed steps and return the final temperature"""
+        for t_start, t_eq, a, length in self._segments(n_steps):
+            self.temperature = t_eq + (t_start - t_eq) * a ** length
+        self._check_cutoff()
+        return self.temperature
+
+    def simulate(self, n_steps: int) -> np.ndarray:
+        """Advance the model by n fixed steps and return the temperature at every step"""
+        trajectory = np.empty(max(n_steps, 0), dtype=np.float64)
+        index = 0
+        for t_start, t_eq, a, length in self._segments(n_steps):
+            decay = a ** np.arange(1, length + 1, dtype=np.float64)
+            trajectory[index:index + length] = t_eq + (t_start - t_eq) * decay
+            index += length
+            self.temperature = float(trajectory[index - 1])
+        self._check_cutoff()
+        return trajectory
+
+    def _thresholds(self) -> Tuple[float, float]:
+        """Return thermostat (full power, zero power) temperature thresholds"""
+        setpoint = self.SETPOINTS.get(self.intensity, self.ambient_temp)
+        return setpoint - self.HYSTERESIS_LOW, setpoint + self.HYSTERESIS_HIGH
+
+    def _check_cutoff(self):
+        """Latch over-temperature shutdown (FAULT_SAFE) above the safety limit"""
+        if self.enabled and self.over_temperature:
+            self.shutdown = True
+
+    def _segments(self, n_steps: int) -> Iterator[Tuple[float, float, float, int]]:
+        """Split n steps into linear regions, yielding (T0, T_eq, a, length)"""
+        remaining = int(n_steps)
+        temp = self.temperature
+        loss = 1.0 / (self.thermal_resistance * self.thermal_mass)
+        power = self.available_power()
+        t_on, t_off = self._thresholds()
+
+        while remaining > 0:
+            if power <= 0:
+                gain, bias, low, high = 0.0, 0.0, -math.inf, math.inf
+            elif temp <= t_on:
+                gain, bias, low, high = 0.0, power, -math.inf, t_on
+            elif temp >= t_off:
+                gain, bias, low, high = 0.0, 0.0, t_off, math.inf
+            else:
+                gain = power / ((t_off - t_on) * self.thermal_mass)
+                bias, low, high = gain * t_off * self.thermal_mass, t_on, t_off
+
+            # dT/dt = alpha - beta * T within the region
+            beta = loss + gain
+            alpha = loss * self.ambient_temp + bias / self.thermal_mass
+            t_eq = alpha / beta
+            a = math.exp(-beta * self.step_time)
+
+            length = remaining
+            boundary = high if t_eq > high else low if t_eq < low else None
+            if boundary is not None and temp != t_eq:
+                ratio = (boundary - t_eq) / (temp - t_eq)
+                if 0 < ratio <= 1:
+                    crossing = int(math.floor(math.log(ratio) / math.log(a))) + 1
+                    length = min(max(crossing, 1), remaining)
+
+            yield temp, t_eq, a, length
+            temp = t_eq + (temp - t_eq) * a ** length
+            remaining -= length
+
+
+class PneumaticPlant:
+    """Pump/bladder pressure model with the SCM regulator and pattern sequencer in the loop
+
+    Bladder pressure follows a first-order response towards the regulated
+    setpoint while the pump delivers, and leaks or bleeds towards 0 kPa
+    otherwise. Pattern phases, zone switches and supervision deadlines
+    split the run into segments that are each advanced in closed form;
+    the safety relief valve clamps pressure at its opening pressure.
+    """
+
+    PATTERN_WAVE = 0
+    PATTERN_PULSE = 1
+    PATTERN_CONTINUOUS = 2
+    PRESSURE_TARGETS = {1: 80.0, 2: 100.0, 3: 120.0, 4: 140.0, 5: 150.0}  # kPa per intensity
+    WAVE_SEQUENCE = ('left', 'center', 'right', 'center')
+
+    def __init__(self, step_time: float = 0.001, fill_time_constant: float = 0.15,
+                 hold_time_constant: float = 5.0, bleed_time_constant: float = 2.0,
+                 relief_pressure: float = 150.0, stuck_pressure: float = 200.0,
+                 zone_switch_loss: float = 0.05, zone_period: float = 1.0,
+                 pulse_period: float = 1.0, fault_timeout: float = 10.0,
+                 fault_threshold: float = 0.8, auto_shutdown_time: float = 1800.0):
+        """Initialize pneumatic plant with deflated bladders"""
+        self.step_time = step_time
+        self.fill_time_constant = fill_time_constant
+        self.hold_time_constant = hold_time_constant
+        self.bleed_time_constant = bleed_time_constant
+        self.relief_pressure = relief_pressure
+        self.stuck_pressure = stuck_pressure
+        self.zone_switch_loss = zone_switch_loss
+        self.fault_threshold = fault_threshold
+        self._zone_steps = max(int(round(zone_period / step_time)), 1)
+        self._pulse_steps = max(int(round(pulse_period / 2 / step_time)), 1)
+        self._fault_steps = int(round(fault_timeout / step_time))
+        self._shutdown_steps = int(round(auto_shutdown_time / step_time))
+
+        self.pressure = 0.0
+        self.enabled = False
+        self.intensity = 0
+        self.pattern = self.PATTERN_WAVE
+        self.pump_failed = False
+        self.regulator_failed = False
+        self.fault = False
+        self.shutdown = False
+        self.target_reached = False
+        self.relief_active = False
+        self._phase_steps = 0
+        self._run_steps = 0
+
+    @property
+    def running(self) -> bool:
+        """True while the SCM drives the pump (enabled, no fault, no auto-shutdown)"""
+        return self.enabled and not self.fault and not self.shutdown
+
+    @property
+    def run_time(self) -> float:
+        """Seconds since massage was last enabled"""
+        return self._run_steps * self.step_time
+
+    def set_command(self, enabled: bool, intensity: int, pattern: int):
+        """Apply massage command from SEAT_CTRL_CMD"""
+        if enabled and not self.enabled:
+            # Rising edge re-arms the SCM after fault or auto-shutdown
+            self.fault = False
+            self.shutdown = False
+            self.target_reached = False
+            self._run_steps = 0
+            self._phase_steps = 0
+        if pattern != self.pattern:
+            self._phase_steps = 0
+        self.enabled = bool(enabled)
+        self.intensity = intensity
+        self.pattern = pattern
+
+    def setpoint(self) -> float:
+        """Regulated pressure target for the current intensity"""
+        return self.PRESSURE_TARGETS.get(self.intensity, 0.0)
+
+    def pump_on(self) -> bool:
+        """True while the pattern sequencer has the pump energised"""
+        if not self.running:
+            return False
+        if self.pattern == self.PATTERN_PULSE:
+            return (self._phase_steps // self._pulse_steps) % 2 == 0
+        return True
+
+    def zone_state(self) -> Dict[str, bool]:
+        """Return which massage zones currently have their valve open"""
+        if not self.running:
+            zones = ()
+        elif self.pattern == self.PATTERN_WAVE:
+            index = (self._phase_steps // self._zone_steps) % len(self.WAVE_SEQUENCE)
+            zones = (self.WAVE_SEQUENCE[index],)
+        elif self.pattern == self.PATTERN_PULSE and not self.pump_on():
+            zones = ()
+        else:
+            zones = ('left', 'center', 'right')
+        return {f'{zone}_active': zone in zones for zone in ('left', 'center', 'right')}
+
+    def advance(self, n_steps: int) -> float:
+        """Advance the model by n fixed steps and return the final pressure"""
+        for _ in self._segments(n_steps):
+            pass
+        return self.pressure
+
+    def simulate(self, n_steps: int) -> np.ndarray:
+        """Advance the model by n fixed steps and return the pressure at every step"""
+        trajectory = np.empty(max(n_steps, 0), dtype=np.float64)
+        index = 0
+        for p_start, p_eq, a, length in self._segments(n_steps):
+            decay = a ** np.arange(1, length + 1, dtype=np.float64)
+            segment = trajectory[index:index + length]
+            np.minimum(p_eq + (p_start - p_eq) * decay, self.relief_pressure, out=segment)
+            index += length
+        return trajectory
+
+    def _drive(self) -> Tuple[float, float]:
+        """Return (equilibrium pressure, time constant) for the current phase"""
+        if not self.running:
+            return 0.0, self.bleed_time_constant
+        if not self.pump_on() or self.pump_failed:
+            return 0.0, self.hold_time_constant
+        if self.regulator_failed:
+            return self.stuck_pressure, self.fill_time_constant
+        return self.setpoint(), self.fill_time_constant
+
+    def _steps_to_next_event(self) -> int:
+        """Steps until the next pattern phase change or supervision deadline"""
+        if not self.running:
+            return np.iinfo(np.int64).max
+        events = [self._shutdown_steps - self._run_steps]
+        if not self.target_reached:
+            events.append(self._fault_steps - self._run_steps)
+        if self.pattern == self.PATTERN_WAVE:
+            events.append(self._zone_steps - self._phase_steps % self._zone_steps)
+        elif self.pattern == self.PATTERN_PULSE:
+            events.append(self._pulse_steps - self._phase_steps % self._pulse_steps)
+        return max(min(events), 1)
+
+    def _segments(self, n_steps: int) -> Iterator[Tuple[float, float, float, int]]:
+        """Split n steps at phase changes, yielding (P0, P_eq, a, length)"""
+        remaining = int(n_steps)
+        while remaining > 0:
+            p_eq, time_constant = self._drive()
+            a = math.exp(-self.step_time / time_constant)
+            length = min(remaining, self._steps_to_next_event())
+            yield self.pressure, p_eq, a, length
+
+            pressure = p_eq + (self.pressure - p_eq) * a ** length
+            self.relief_active = pressure > self.relief_pressure
+            self.pressure = min(pressure, self.relief_pressure)
+            remaining -= length
+            self._phase_steps += length
+            if not self.running:
+                continue
+
+            self._run_steps += length
+            if self.pressure >= self.setpoint() * self.fault_threshold:
+                self.target_reached = True
+            if self.pattern == self.PATTERN_WAVE and self._phase_steps % self._zone_steps == 0:
+                # Opening the next zone valve shares air with an emptier bladder
+                self.pressure *= 1.0 - self.zone_switch_loss
+            if self._run_steps >= self._shutdown_steps:
+                self.shutdown = True
+            elif not self.target_reached and self._run_steps >= self._fault_steps:
+                self.fault = True
@@ -0,0 +1,164 @@
+"""
+Results Database Module
+Historical test results in SQLite with indexed trend queries
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT,
+    timestamp TEXT NOT NULL,
+    duration REAL,
+    test_class TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_test_id ON results (test_id);
+CREATE INDEX IF NOT EXISTS idx_results_session_id ON results (session_id);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results (status);
+"""
+
+
+class ResultsDatabase:
+    """Test results of every run kept in a local SQLite database
+
+    Results are indexed on test_id, session_id and status, so per-test
+    history queries touch only that test's rows. Inserts are batched and
+    committed every batch_size results or on flush(). The database runs in
+    WAL mode so parallel workers can write to the same file.
+    """
+
+    def __init__(self, db_file, batch_size: int = 100, timeout: float = 30.0):
+        """Open (or create) the database"""
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._pending = []
+        self._connection = sqlite3.connect(str(self.db_file), timeout=timeout)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(_SCHEMA)
+        logger.info("Results database opened: %s", self.db_file)
+
+    def add_result(self, session_id: str, test_id: str, status: str, message: str,
+                   timestamp: str, duration: Optional[float] = None,
+                   test_class: Optional[str] = None):
+        """Queue one result for insertion"""
+        self._pending.append((session_id, test_id, status, message, timestamp, duration, test_class))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert and commit queued results"""
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO results (session_id, test_id, status, message, timestamp, '
+                'duration, test_class) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                self._pending
+            )
+        self._pending.clear()
+
+    def close(self):
+        """Commit queued results and close the database"""
+        if self._connection is None:
+            return
+        self.flush()
+        self._connection.close()
+        self._connection = None
+
+    def __enter__(self):
+        """Use the database as a context manager that closes on exit"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the database"""
+        self.close()
+
+    def history(self, test_id: str, last_runs: int = 200) -> List[Dict]:
+        """Most recent results of a test, newest first"""
+        self.flush()
+        cursor = self._connection.execute(
+            'SELECT session_id, status, message, timestamp, duration FROM results '
+            'WHERE test_id = ? ORDER BY id DESC LIMIT ?',
+            (test_id, last_runs)
+        )
+        return [
+            {'session_id': session_id, 'status': status, 'message': message,
+             'timestamp': timestamp, 'duration': duration}
+            for session_id, status, message, timestamp, duration in cursor
+        ]
+
+    def duration_percentile(self, test_id: str, percentile: float = 95.0,
+                            last_runs: int = 200) -> Optional[float]:
+        """Percentile of a test's duration over its last runs, or None without timed runs"""
+        self.flush()
+        durations = [row[0] for row in self._connection.execute(
+            'SELECT duration FROM results WHERE test_id = ? AND duration IS NOT NULL '
+            'ORDER BY id DESC LIMIT ?',
+            (test_id, last_runs)
+        )]
+        if not durations:
+            return None
+        return float(np.percentile(durations, percentile))
+
+    def flake_rates(self, last_runs: int = 200) -> Dict[str, Dict]:
+        """Failure and flake rate of every test over its last runs
+
+        The flake rate is the share of consecutive runs whose status
+        differs, so a test that alternates between PASS and FAIL scores 1.0
+        and a test that fails consistently scores 0.0.
+        """
+        self.flush()
+        rates = {}
+        test_ids = [row[0] for row in self._connection.execute(
+            'SELECT DISTINCT test_id FROM results ORDER BY test_id'
+        )]
+        for test_id in test_ids:
+            statuses = [row[0] for row in self._connection.execute(
+                'SELECT status FROM results WHERE test_id = ? ORDER BY id DESC LIMIT ?',
+                (test_id, last_runs)
+            )]
+            runs = len(statuses)
+            failures = sum(status != 'PASS' for status in statuses)
+            flips = sum(a != b for a, b in zip(statuses, statuses[1:]))
+            rates[test_id] = {
+                'runs': runs,
+                'failures': failures,
+                'fail_rate': failures / runs,
+                'flake_rate': flips / (runs - 1) if runs > 1 else 0.0
+            }
+        return rates
+
+    def status_counts(self, session_id: Optional[str] = None) -> Dict[str, int]:
+        """Number of results per status, for one session or across all of them"""
+        self.flush()
+        if session_id is None:
+            cursor = self._connection.execute('SELECT status, COUNT(*) FROM results GROUP BY status')
+        else:
+            cursor = self._connection.execute(
+                'SELECT status, COUNT(*) FROM results WHERE session_id = ? GROUP BY status',
+                (session_id,)
+            )
+        return dict(cursor.fetchall())
+
+    def sessions(self, limit: int = 50) -> List[str]:
+        """Most recent session IDs, newest first"""
+        self.flush()
+        cursor = self._connection.execute(
+            'SELECT session_id FROM results GROUP BY session_id ORDER BY MAX(id) DESC LIMIT ?',
+            (limit,)
+        )
+        return [row[0] for row in cursor]
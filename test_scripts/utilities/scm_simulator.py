@@ -0,0 +1,235 @@
+"""
+SCM Simulator Module
+Simulated Seat Comfort Module ECU exposed as a CAN bus endpoint
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from . import can_codec
+from .event_log import EventLog
+from .plant_models import PneumaticPlant, ThermalPlant
+
+
+logger = logging.getLogger(__name__)
+
+# Tolerance for comparing floating point schedule times
+_EPSILON = 1e-9
+
+
+class SimulatedSCM:
+    """Simulated SCM that consumes SEAT_CTRL_CMD and transmits cyclic status frames
+
+    Exposes python-can style send()/recv() so it can stand in for the bus.
+    Status frames are emitted on a fixed CAN_CYCLE_TIME schedule derived from
+    the clock, and the plants are advanced to each frame's transmit time.
+    """
+
+    MSG_CTRL_CMD = 0x100
+    MSG_HEAT_STATUS = 0x200
+    MSG_MASSAGE_STATUS = 0x300
+
+    def __init__(self, config, clock, max_backlog: int = 16):
+        """Initialize simulated SCM with plants at rest"""
+        self.config = config
+        self.clock = clock
+        self.cycle_time = config.CAN_CYCLE_TIME
+        self.event_log = EventLog(config.MAX_FAULT_EVENTS)
+        self._max_backlog = max_backlog
+        self._outbox = deque(maxlen=2 * max_backlog)
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Power-cycle the SCM: plants at rest, empty event log, fresh transmit schedule"""
+        with self._lock:
+            self.thermal_plant = ThermalPlant(
+                step_time=self.config.PLANT_STEP_TIME,
+                ambient_temp=self.config.HEAT_AMBIENT_TEMP,
+                cutoff_temp=self.config.HEAT_SAFE_TEMP
+            )
+            self.pneumatic_plant = PneumaticPlant(
+                step_time=self.config.PLANT_STEP_TIME,
+                relief_pressure=self.config.MASSAGE_MAX_PRESSURE
+            )
+            self.event_log.clear()
+            self._outbox.clear()
+            self._start_time = self.clock.monotonic()
+            self._plant_time = self._start_time
+            self._cycle = 0
+            self._fault_flags = {}
+
+    def send(self, message: Dict):
+        """Receive a frame transmitted by the tester"""
+        if message['arbitration_id'] != self.MSG_CTRL_CMD:
+            return
+        command = can_codec.decode_control_command(message['data'])
+        with self._lock:
+            self._sync()
+            heating_was_enabled = self.thermal_plant.enabled
+            self.thermal_plant.set_command(command['heat_enable'], command['heat_intensity'])
+            if self.thermal_plant.enabled != heating_was_enabled:
+                self._log_event('HEAT_ON' if self.thermal_plant.enabled else 'HEAT_OFF', self._plant_time)
+            self.pneumatic_plant.set_command(
+                command['massage_enable'], command['massage_intensity'], command['massage_pattern']
+            )
+            self._update_fault_events(self._plant_time)
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Return the next status frame, waiting on the clock until it is due"""
+        deadline = None if timeout is None else self.clock.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._sync()
+                if self._outbox:
+                    return self._outbox.popleft()
+                now = self.clock.monotonic()
+                due = self._next_due()
+            if deadline is not None and due > deadline + _EPSILON:
+                self.clock.sleep(deadline - now)
+                return None
+            self.clock.sleep(due - now)
+
+    def sync(self):
+        """Bring plants and the transmit schedule up to the current clock time"""
+        with self._lock:
+            self._sync()
+
+    def set_reference_temperature(self, temp_c: float):
+        """Force the seat temperature seen by the SCM sensor"""
+        with self._lock:
+            self._sync()
+            self.thermal_plant.set_temperature(temp_c)
+            self._update_fault_events(self._plant_time)
+
+    def set_ambient_temperature(self, temp_c: float):
+        """Set cabin ambient temperature"""
+        with self._lock:
+            self._sync()
+            self.thermal_plant.ambient_temp = temp_c
+
+    def set_supply_voltage(self, voltage: float):
+        """Set SCM supply voltage"""
+        with self._lock:
+            self._sync()
+            self.thermal_plant.supply_voltage = voltage
+
+    def supply_voltage(self) -> float:
+        """Measured SCM supply voltage"""
+        return self.thermal_plant.supply_voltage
+
+    def supply_current(self) -> float:
+        """Measured SCM supply current in Amperes"""
+        with self._lock:
+            self._sync()
+            power = self.thermal_plant.heater_power()
+            voltage = self.thermal_plant.supply_voltage
+        if power > 0 and voltage > 0:
+            return power / voltage
+        return 0.05  # Quiescent current
+
+    def zone_state(self) -> Dict:
+        """Measured state of the massage zone valves"""
+        with self._lock:
+            self._sync()
+            return self.pneumatic_plant.zone_state()
+
+    def inject_overpressure(self):
+        """Fail the pressure regulator so the pump drives against the relief valve"""
+        with self._lock:
+            self._sync()
+            self.pneumatic_plant.regulator_failed = True
+
+    def inject_pump_fault(self):
+        """Fail the pump so pressure no longer rises"""
+        with self._lock:
+            self._sync()
+            self.pneumatic_plant.pump_failed = True
+
+    def heat_status(self) -> Dict:
+        """Current SEAT_HEAT_STATUS signal values"""
+        plant = self.thermal_plant
+        return {
+            'temperature_c': plant.temperature,
+            'duty_cycle': round(plant.duty_cycle() * 100),
+            'heating_active': plant.enabled and not plant.shutdown,
+            'temp_warning': plant.over_temperature,
+            'heater_fault': False,
+            'flags': 0
+        }
+
+    def massage_status(self) -> Dict:
+        """Current SEAT_MASSAGE_STATUS signal values"""
+        plant = self.pneumatic_plant
+        return {
+            'pressure_kpa': plant.pressure,
+            'duty_cycle': plant.intensity * 20 if plant.running else 0,
+            'pump_active': plant.running,
+            'pressure_warning': plant.relief_active,
+            'pump_fault': plant.fault,
+            'flags': 0
+        }
+
+    def _next_due(self) -> float:
+        """Monotonic time of the next cyclic transmission"""
+        return self._start_time + self._cycle * self.cycle_time
+
+    def _sync(self):
+        """Transmit every frame due up to now, then advance plants to now"""
+        now = self.clock.monotonic()
+        backlog = int((now - self._next_due()) / self.cycle_time)
+        if backlog > self._max_backlog:
+            # Nobody could buffer frames older than the backlog; skip them
+            self._cycle += backlog - self._max_backlog
+        while self._next_due() <= now + _EPSILON:
+            due = self._next_due()
+            self._advance_plants(due)
+            self._transmit(due)
+            self._cycle += 1
+        self._advance_plants(now)
+
+    def _advance_plants(self, until: float):
+        """Advance both plants to the given monotonic time in fixed steps"""
+        step_time = self.thermal_plant.step_time
+        n_steps = int((until - self._plant_time) / step_time + _EPSILON / step_time)
+        if n_steps > 0:
+            self.thermal_plant.advance(n_steps)
+            self.pneumatic_plant.advance(n_steps)
+            self._plant_time += n_steps * step_time
+            self._update_fault_events(self._plant_time)
+
+    def _transmit(self, due: float):
+        """Queue one cycle of status frames stamped with their transmit time"""
+        timestamp = self._epoch_time(due)
+        for msg_id, status in ((self.MSG_HEAT_STATUS, self.heat_status()),
+                               (self.MSG_MASSAGE_STATUS, self.massage_status())):
+            self._outbox.append({
+                'arbitration_id': msg_id,
+                'data': can_codec.encode(msg_id, status),
+                'is_extended_id': False,
+                'timestamp': timestamp
+            })
+
+    def _epoch_time(self, monotonic_time: float) -> float:
+        """Convert a monotonic clock reading into epoch time"""
+        return self.clock.time() - (self.clock.monotonic() - monotonic_time)
+
+    def _update_fault_events(self, monotonic_time: float):
+        """Log diagnostic events on the rising edge of SCM fault conditions"""
+        flags = {
+            'OVER_TEMPERATURE': self.thermal_plant.over_temperature,
+            'OVER_PRESSURE': self.pneumatic_plant.relief_active,
+            'PUMP_FAULT': self.pneumatic_plant.fault,
+            'MASSAGE_AUTO_SHUTDOWN': self.pneumatic_plant.shutdown
+        }
+        for event, active in flags.items():
+            if active and not self._fault_flags.get(event):
+                self._log_event(event, monotonic_time)
+        self._fault_flags = flags
+
+    def _log_event(self, event: str, monotonic_time: float):
+        """Append a timestamped entry to the diagnostic event log"""
+        self.event_log.append({'timestamp': self._epoch_time(monotonic_time), 'event': event})
+        logger.info("Diagnostic event logged: %s", event)
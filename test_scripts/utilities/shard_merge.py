@@ -0,0 +1,255 @@
+"""
+Shard Merge Module
+Per-worker shard files for parallel (pytest-xdist) runs and their deterministic merge
+"""
+
+import csv
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .can_trace import DIRECTION_MARK, TRACE_DTYPE, read_trace, write_trace
+from .data_logger import iter_jsonl_records, summarize_status_counts
+from .html_report import render_html_report
+from .measurement_store import MeasurementStore
+
+
+logger = logging.getLogger(__name__)
+
+WORKER_ENV = 'PYTEST_XDIST_WORKER'
+
+# Start of an execution log record ('%(asctime)s - ...')
+_LOG_RECORD_START = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} ')
+_WORKER_NUMBER = re.compile(r'(\d+)$')
+# Shard or rotated shard backup: x.gw0.log, x.gw0.log.1.gz
+_SHARD_NAME = re.compile(r'^(.+)\.gw\d+(\.[^.]+)(\.\d+\.gz)?$')
+
+
+def worker_id() -> Optional[str]:
+    """xdist worker name of this process ('gw0', ...), or None when not a worker"""
+    return os.environ.get(WORKER_ENV)
+
+
+def shard_path(path, worker: Optional[str] = None) -> Path:
+    """Path of a worker's shard of a file: reports/x.log -> reports/x.gw0.log
+
+    Without a worker (serial run) the path is returned unchanged.
+    """
+    path = Path(path)
+    worker = worker or worker_id()
+    if worker is None:
+        return path
+    return path.with_name(f'{path.stem}.{worker}{path.suffix}')
+
+
+def find_shards(path) -> List[Tuple[str, Path]]:
+    """(worker, shard path) pairs of a file, in worker number order"""
+    path = Path(path)
+    if not path.parent.exists():
+        return []
+    pattern = re.compile(re.escape(path.stem) + r'\.(gw\d+)' + re.escape(path.suffix) + '$')
+    shards = []
+    for candidate in path.parent.iterdir():
+        match = pattern.match(candidate.name)
+        if match:
+            shards.append((match.group(1), candidate))
+    return sorted(shards, key=lambda shard: _worker_number(shard[0]))
+
+
+def merge_csv_shards(path) -> int:
+    """Append every worker's CSV rows to the combined file, ordered by timestamp
+
+    Ties are broken by worker number and row order, so the merge is
+    deterministic. Shards are removed afterwards. Returns the row count.
+    """
+    rows = []
+    shards = find_shards(path)
+    for worker, shard in shards:
+        with open(shard, newline='') as f:
+            for index, row in enumerate(csv.reader(f)):
+                if row:
+                    rows.append((row[0], _worker_number(worker), index, row))
+    if shards:
+        rows.sort(key=lambda entry: entry[:3])
+        with open(path, 'a', newline='') as f:
+            csv.writer(f).writerows(entry[3] for entry in rows)
+        _remove(shards)
+    return len(rows)
+
+
+def rotated_backups(path) -> List[Path]:
+    """gzip backups of a rotated log (x.log.1.gz, x.log.2.gz, ...), oldest first"""
+    path = Path(path)
+    if not path.parent.exists():
+        return []
+    pattern = re.compile(re.escape(path.name) + r'\.(\d+)\.gz$')
+    backups = []
+    for candidate in path.parent.iterdir():
+        match = pattern.match(candidate.name)
+        if match:
+            backups.append((int(match.group(1)), candidate))
+    # Rotation renames x.log.K.gz to x.log.K+1.gz, so the highest K is the oldest
+    return [backup for _, backup in sorted(backups, reverse=True)]
+
+
+def merge_log_shards(path) -> int:
+    """Append every worker's execution log records to the combined log, ordered by time
+
+    Each worker's rotated gzip backups are read before its current shard,
+    oldest first. Multi-line records (tracebacks) stay together. Shards and
+    backups are removed afterwards. Returns the record count.
+    """
+    records = []
+    shards = find_shards(path)
+    merged = []
+    for worker, shard in shards:
+        files = rotated_backups(shard) + [shard]
+        merged.extend((worker, f) for f in files)
+        for log_file in files:
+            lines = []
+            with _open_log(log_file) as f:
+                for line in f:
+                    if _LOG_RECORD_START.match(line) and lines:
+                        records.append((lines[0][:23], _worker_number(worker), len(records),
+                                        ''.join(lines)))
+                        lines = []
+                    lines.append(line)
+            if lines:
+                records.append((lines[0][:23], _worker_number(worker), len(records), ''.join(lines)))
+    if shards:
+        records.sort(key=lambda entry: entry[:3])
+        with open(path, 'a') as f:
+            f.writelines(entry[3] for entry in records)
+        _remove(merged)
+    return len(records)
+
+
+def merge_trace_shards(path) -> int:
+    """Combine every worker's CAN trace into one trace file, test segment by test segment
+
+    Replay reads the frames after a test's boundary marker as one run, so
+    frames are not interleaved one by one. Each shard is cut at its markers
+    and the pieces are ordered by their first timestamp, then worker number;
+    records within a piece keep their recorded order. The merged trace
+    replaces path. Shards are removed afterwards. Returns the record count.
+    """
+    shards = find_shards(path)
+    if not shards:
+        return 0
+    pieces = []
+    for worker, shard in shards:
+        records = read_trace(shard)
+        cuts = np.flatnonzero(records['direction'] == DIRECTION_MARK)
+        for piece in np.split(records, cuts):
+            if len(piece):
+                pieces.append((int(piece['timestamp_ns'][0]), _worker_number(worker), len(pieces),
+                               piece))
+    pieces.sort(key=lambda entry: entry[:3])
+    records = np.concatenate([entry[3] for entry in pieces] or [np.empty(0, dtype=TRACE_DTYPE)])
+    write_trace(path, records)
+    _remove(shards)
+
+    logger.info("Merged %d CAN trace shards into %s", len(shards), path)
+    return len(records)
+
+
+def merge_reports(jsonl_paths, json_file, html_file) -> Dict:
+    """Combine the JSON Lines shards of several loggers into one JSON and HTML report
+
+    Results and measurements are ordered by timestamp, then worker number,
+    then record order. Per-shard summary records are ignored and the
+    summary is recomputed. Shards are removed afterwards. Returns the
+    summary.
+    """
+    results = []
+    measurement_records = []
+    shards = [shard for path in jsonl_paths for shard in find_shards(path)]
+    for worker, shard in shards:
+        for index, record in enumerate(iter_jsonl_records(shard)):
+            key = (record.get('timestamp'), _worker_number(worker), str(shard), index)
+            if record.get('type') == 'result':
+                results.append((key, record))
+            elif record.get('type') == 'measurement':
+                measurement_records.append((key, record))
+    if not shards:
+        return {}
+
+    results = [record for _, record in sorted(results, key=lambda entry: entry[0])]
+    measurement_records.sort(key=lambda entry: entry[0])
+    status_counts = {}
+    for record in results:
+        record.pop('type')
+        status_counts[record['status']] = status_counts.get(record['status'], 0) + 1
+    summary = summarize_status_counts(status_counts)
+
+    measurements = MeasurementStore()
+    for _, record in measurement_records:
+        measurements.append(record['test_id'], record['measurement'], record['value'],
+                            record['unit'], record['timestamp'])
+
+    with open(json_file, 'w') as f:
+        json.dump({
+            'generated': datetime.now().isoformat(),
+            'summary': summary,
+            'test_results': results,
+            'measurements': list(measurements.records())
+        }, f, indent=2)
+    render_html_report(html_file, summary, results, measurements)
+    _remove(shards)
+
+    logger.info("Merged %d report shards into %s and %s", len(shards), json_file, html_file)
+    return summary
+
+
+def merge_directory(directory, execution_log: str = 'test_execution.log',
+                    report_name: str = 'combined_report') -> Dict:
+    """Merge every shard found in a report directory at the end of a parallel run
+
+    The execution log shards, with their rotated backups, are merged into
+    execution_log. Other .log shards are DataLogger CSVs and are merged into
+    their base files. All .jsonl shards are combined into report_name.json
+    and report_name.html.
+    """
+    directory = Path(directory)
+    base_paths = set()
+    for candidate in directory.glob('*.gw*.*'):
+        match = _SHARD_NAME.match(candidate.name)
+        if match:
+            base_paths.add(directory / (match.group(1) + match.group(2)))
+
+    jsonl_paths = sorted(path for path in base_paths if path.suffix == '.jsonl')
+    for path in sorted(base_paths - set(jsonl_paths)):
+        if path.name == execution_log:
+            merge_log_shards(path)
+        elif path.suffix == '.log':
+            merge_csv_shards(path)
+    if not jsonl_paths:
+        return {}
+    return merge_reports(jsonl_paths, directory / f'{report_name}.json',
+                         directory / f'{report_name}.html')
+
+
+def _worker_number(worker: str) -> int:
+    """Numeric part of a worker name, so gw10 sorts after gw2"""
+    match = _WORKER_NUMBER.search(worker)
+    return int(match.group(1)) if match else -1
+
+
+def _open_log(path: Path):
+    """Open a log shard or one of its gzip backups for reading text"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt')
+    return open(path)
+
+
+def _remove(shards: List[Tuple[str, Path]]):
+    """Delete merged shard files"""
+    for _, shard in shards:
+        shard.unlink()
@@ -3,186 +3,402 @@ Signal Generator Module
 Generates test signals for CAN bus simulation
 """
 
-import math
 import time
-from typing import Dict, List
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .online_stats import OnlineStatistics
+
+
+# Samples per block when a long series is built from block and in-block factors
+_SERIES_BLOCK = 1024
+
+# Randomized signals, each drawing from its own stream spawned from one seed
+RANDOM_STREAMS = ('noise', 'jitter', 'can_timing')
 
 
 class SignalGenerator:
-    """Generates various test signals for HIL testing"""
+    """Generates various test signals for HIL testing
+    
+    The *_array methods compute whole signals with NumPy and return arrays
+    (float64 by default, or any dtype such as np.float32 to halve memory on
+    long stimuli). The generate_* methods return the same samples as lists.
+    
+    Noise, jitter and CAN timing take an rng. Without one they draw from a
+    fresh, unseeded NumPy Generator. For reproducible signals create a
+    SignalGenerator instance: it owns independent Generator streams spawned
+    from one SeedSequence, and rng(stream) hands them out.
+    """
+    
+    def __init__(self, seed: Optional[int] = None, key: Optional[str] = None):
+        """Spawn this instance's random streams; seed holds the seed to repeat them
+        
+        Without a seed, fresh OS entropy is used. A key (e.g. a pytest node ID
+        or a worker name) derives a separate, independent family of streams
+        from the same seed, so parallel workers never share random state.
+        """
+        spawn_key = () if key is None else (zlib.crc32(key.encode()),)
+        sequence = np.random.SeedSequence(seed, spawn_key=spawn_key)
+        children = sequence.spawn(len(RANDOM_STREAMS))
+        self.seed = sequence.entropy
+        self._streams = {name: np.random.default_rng(child) for name, child in zip(RANDOM_STREAMS, children)}
+    
+    def rng(self, stream: str) -> np.random.Generator:
+        """Generator behind one of the RANDOM_STREAMS"""
+        return self._streams[stream]
+    
+    @staticmethod
+    def generate_ramp_array(start_value: float, end_value: float, duration: float,
+                            step_time: float = 0.01, dtype=np.float64) -> np.ndarray:
+        """Generate linear ramp signal as an array"""
+        num_steps = _num_steps(duration, step_time)
+        return _ramp_samples(start_value, end_value, num_steps, 0, num_steps).astype(dtype, copy=False)
+    
+    @staticmethod
+    def generate_sine_wave_array(amplitude: float, frequency: float, duration: float,
+                                 step_time: float = 0.01, dtype=np.float64) -> np.ndarray:
+        """Generate sine wave signal as an array"""
+        return _sine_samples(amplitude, frequency, step_time, 0,
+                             _num_steps(duration, step_time)).astype(dtype, copy=False)
+    
+    @staticmethod
+    def generate_square_wave_array(low_value: float, high_value: float, frequency: float,
+                                   duration: float, step_time: float = 0.01,
+                                   dtype=np.float64) -> np.ndarray:
+        """Generate square wave signal as an array"""
+        return _square_samples(low_value, high_value, frequency, step_time, 0,
+                               _num_steps(duration, step_time), dtype)
+    
+    @staticmethod
+    def generate_step_response_array(initial_value: float, step_value: float, step_time: float,
+                                     duration: float, step_interval: float = 0.01,
+                                     dtype=np.float64) -> np.ndarray:
+        """Generate step response signal as an array"""
+        values = np.full(_num_steps(duration, step_interval), initial_value, dtype=dtype)
+        values[int(step_time / step_interval):] = step_value
+        return values
+    
+    @staticmethod
+    def generate_noise_array(mean: float, std_dev: float, duration: float,
+                             step_time: float = 0.01, dtype=np.float64,
+                             rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Generate Gaussian noise signal as an array"""
+        rng = np.random.default_rng() if rng is None else rng
+        return rng.normal(mean, std_dev, _num_steps(duration, step_time)).astype(dtype, copy=False)
+    
+    @staticmethod
+    def generate_temperature_ramp_array(start_temp: float, end_temp: float, duration: float,
+                                        overshoot_percent: float = 5.0,
+                                        dtype=np.float64) -> np.ndarray:
+        """Generate realistic temperature ramp with overshoot as an array (10ms steps)"""
+        num_steps = int(duration * 100)
+        # Overshoot peaks at 70% of the ramp time
+        max_temp = end_temp + (end_temp - start_temp) * (overshoot_percent / 100.0)
+        return _overshoot_curve(num_steps, int(num_steps * 0.7), start_temp, max_temp, end_temp,
+                                rise_rate=3, settle_rate=2).astype(dtype, copy=False)
+    
+    @staticmethod
+    def generate_pressure_buildup_array(start_pressure: float, target_pressure: float,
+                                        ramp_time: float, overshoot_percent: float = 10.0,
+                                        step_time: float = 0.01, dtype=np.float64) -> np.ndarray:
+        """Generate realistic pressure buildup curve as an array"""
+        num_steps = _num_steps(ramp_time, step_time)
+        # Overshoot peaks at 80% of the ramp time
+        max_pressure = target_pressure + (target_pressure - start_pressure) * (overshoot_percent / 100.0)
+        values = _overshoot_curve(num_steps, int(num_steps * 0.8), start_pressure, max_pressure,
+                                  target_pressure, rise_rate=4, settle_rate=3)
+        return np.maximum(values, start_pressure, out=values).astype(dtype, copy=False)
+    
+    @staticmethod
+    def generate_jitter_array(base_signal, jitter_std_dev: float, dtype=np.float64,
+                              rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Add Gaussian jitter to a signal, returning an array"""
+        base_signal = np.asarray(base_signal, dtype=np.float64)
+        rng = np.random.default_rng() if rng is None else rng
+        return (base_signal + rng.normal(0, jitter_std_dev, base_signal.shape)).astype(dtype, copy=False)
+    
+    @staticmethod
+    def generate_realistic_can_timing_array(nominal_interval: float, jitter_percent: float,
+                                            num_messages: int, dtype=np.float64,
+                                            rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Generate CAN message intervals with uniform jitter as an array"""
+        max_jitter = nominal_interval * (jitter_percent / 100.0)
+        rng = np.random.default_rng() if rng is None else rng
+        return (nominal_interval + rng.uniform(-max_jitter, max_jitter, num_messages)).astype(dtype, copy=False)
+    
+    @staticmethod
+    def stream_ramp(start_value: float, end_value: float, duration: float, step_time: float = 0.01,
+                    chunk_size: int = 100, dtype=np.float64) -> Iterator[np.ndarray]:
+        """Yield a linear ramp in chunks of chunk_size samples (the last may be shorter)"""
+        num_steps = _num_steps(duration, step_time)
+        for start, count in _chunks(num_steps, chunk_size):
+            yield _ramp_samples(start_value, end_value, num_steps, start, count).astype(dtype, copy=False)
+    
+    @staticmethod
+    def stream_sine_wave(amplitude: float, frequency: float, duration: Optional[float] = None,
+                         step_time: float = 0.01, chunk_size: int = 100,
+                         dtype=np.float64) -> Iterator[np.ndarray]:
+        """Yield a sine wave in chunks of chunk_size samples, endlessly if duration is None"""
+        for start, count in _chunks(_num_steps(duration, step_time), chunk_size):
+            yield _sine_samples(amplitude, frequency, step_time, start, count).astype(dtype, copy=False)
+    
+    @staticmethod
+    def stream_square_wave(low_value: float, high_value: float, frequency: float,
+                           duration: Optional[float] = None, step_time: float = 0.01,
+                           chunk_size: int = 100, dtype=np.float64) -> Iterator[np.ndarray]:
+        """Yield a square wave in chunks of chunk_size samples, endlessly if duration is None"""
+        for start, count in _chunks(_num_steps(duration, step_time), chunk_size):
+            yield _square_samples(low_value, high_value, frequency, step_time, start, count, dtype)
     
     @staticmethod
     def generate_ramp(start_value: float, end_value: float, duration: float, step_time: float = 0.01) -> List[float]:
         """Generate linear ramp signal"""
-        num_steps = int(duration / step_time)
-        values = []
-        for i in range(num_steps):
-            t = i / num_steps if num_steps > 0 else 0
-            value = start_value + (end_value - start_value) * t
-            values.append(value)
-        return values
+        return SignalGenerator.generate_ramp_array(start_value, end_value, duration, step_time).tolist()
     
     @staticmethod
     def generate_sine_wave(amplitude: float, frequency: float, duration: float, step_time: float = 0.01) -> List[float]:
         """Generate sine wave signal"""
-        values = []
-        num_steps = int(duration / step_time)
-        for i in range(num_steps):
-            t = i * step_time
-            value = amplitude * math.sin(2 * math.pi * frequency * t)
-            values.append(value)
-        return values
+        return SignalGenerator.generate_sine_wave_array(amplitude, frequency, duration, step_time).tolist()
     
     @staticmethod
     def generate_square_wave(low_value: float, high_value: float, frequency: float, duration: float, step_time: float = 0.01) -> List[float]:
         """Generate square wave signal"""
-        values = []
-        num_steps = int(duration / step_time)
-        period = 1.0 / frequency if frequency > 0 else 1.0
-        
-        for i in range(num_steps):
-            t = i * step_time
-            phase = (t % period) / period
-            value = high_value if phase < 0.5 else low_value
-            values.append(value)
-        return values
+        return SignalGenerator.generate_square_wave_array(
+            low_value, high_value, frequency, duration, step_time
+        ).tolist()
     
     @staticmethod
     def generate_step_response(initial_value: float, step_value: float, step_time: float, duration: float, step_interval: float = 0.01) -> List[float]:
         """Generate step response signal"""
-        values = []
-        num_steps = int(duration / step_interval)
-        step_index = int(step_time / step_interval)
-        
-        for i in range(num_steps):
-            value = step_value if i >= step_index else initial_value
-            values.append(value)
-        return values
+        return SignalGenerator.generate_step_response_array(
+            initial_value, step_value, step_time, duration, step_interval
+        ).tolist()
     
     @staticmethod
-    def generate_noise(mean: float, std_dev: float, duration: float, step_time: float = 0.01) -> List[float]:
+    def generate_noise(mean: float, std_dev: float, duration: float, step_time: float = 0.01,
+                       rng: Optional[np.random.Generator] = None) -> List[float]:
         """Generate Gaussian noise signal"""
-        import random
-        values = []
-        num_steps = int(duration / step_time)
-        
-        for i in range(num_steps):
-            value = random.gauss(mean, std_dev)
-            values.append(value)
-        return values
+        return SignalGenerator.generate_noise_array(mean, std_dev, duration, step_time, rng=rng).tolist()
     
     @staticmethod
     def generate_temperature_ramp(start_temp: float, end_temp: float, duration: float, overshoot_percent: float = 5.0) -> List[float]:
         """Generate realistic temperature ramp with overshoot"""
-        values = []
-        num_steps = int(duration * 100)  # 10ms steps
-        
-        # Calculate overshoot point (typically at 70% of ramp time)
-        overshoot_point = int(num_steps * 0.7)
-        max_temp = end_temp + (end_temp - start_temp) * (overshoot_percent / 100.0)
-        
-        for i in range(num_steps):
-            if i < overshoot_point:
-                # Fast ramp to overshoot
-                t = i / overshoot_point
-                # Exponential approach
-                value = start_temp + (max_temp - start_temp) * (1 - math.exp(-3 * t))
-            else:
-                # Decay to setpoint
-                t = (i - overshoot_point) / (num_steps - overshoot_point)
-                value = max_temp - (max_temp - end_temp) * (1 - math.exp(-2 * t))
-            
-            values.append(value)
-        
-        return values
+        return SignalGenerator.generate_temperature_ramp_array(
+            start_temp, end_temp, duration, overshoot_percent
+        ).tolist()
     
     @staticmethod
     def generate_pressure_buildup(start_pressure: float, target_pressure: float, ramp_time: float, 
                                  overshoot_percent: float = 10.0, step_time: float = 0.01) -> List[float]:
         """Generate realistic pressure buildup curve"""
-        values = []
-        num_steps = int(ramp_time / step_time)
-        
-        # Calculate overshoot point
-        overshoot_point = int(num_steps * 0.8)
-        max_pressure = target_pressure + (target_pressure - start_pressure) * (overshoot_percent / 100.0)
-        
-        for i in range(num_steps):
-            if i < overshoot_point:
-                # Fast buildup
-                t = i / overshoot_point
-                value = start_pressure + (max_pressure - start_pressure) * (1 - math.exp(-4 * t))
-            else:
-                # Settle to target
-                t = (i - overshoot_point) / (num_steps - overshoot_point)
-                value = max_pressure - (max_pressure - target_pressure) * (1 - math.exp(-3 * t))
-            
-            values.append(max(start_pressure, value))
-        
-        return values
+        return SignalGenerator.generate_pressure_buildup_array(
+            start_pressure, target_pressure, ramp_time, overshoot_percent, step_time
+        ).tolist()
     
     @staticmethod
-    def generate_jitter(base_signal: List[float], jitter_std_dev: float) -> List[float]:
+    def generate_jitter(base_signal: List[float], jitter_std_dev: float,
+                        rng: Optional[np.random.Generator] = None) -> List[float]:
         """Add jitter to a signal"""
-        import random
-        jittered = []
-        for value in base_signal:
-            noisy_value = value + random.gauss(0, jitter_std_dev)
-            jittered.append(noisy_value)
-        return jittered
+        return SignalGenerator.generate_jitter_array(base_signal, jitter_std_dev, rng=rng).tolist()
     
     @staticmethod
-    def generate_realistic_can_timing(nominal_interval: float, jitter_percent: float, num_messages: int) -> List[float]:
+    def generate_realistic_can_timing(nominal_interval: float, jitter_percent: float, num_messages: int,
+                                      rng: Optional[np.random.Generator] = None) -> List[float]:
         """Generate realistic CAN message timing with jitter"""
-        import random
-        intervals = []
-        max_jitter = nominal_interval * (jitter_percent / 100.0)
-        
-        for i in range(num_messages):
-            jitter = random.uniform(-max_jitter, max_jitter)
-            interval = nominal_interval + jitter
-            intervals.append(interval)
-        
-        return intervals
+        return SignalGenerator.generate_realistic_can_timing_array(
+            nominal_interval, jitter_percent, num_messages, rng=rng
+        ).tolist()
+
+
+def _num_steps(duration: Optional[float], step_time: float) -> Optional[int]:
+    """Number of samples in a signal of the given duration (None: unbounded)"""
+    if duration is None:
+        return None
+    return max(int(duration / step_time), 0)
+
+
+def _chunks(num_steps: Optional[int], chunk_size: int) -> Iterator:
+    """Yield (first sample index, sample count) of consecutive chunks"""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    start = 0
+    while num_steps is None or start < num_steps:
+        count = chunk_size if num_steps is None else min(chunk_size, num_steps - start)
+        yield start, count
+        start += count
+
+
+def _ramp_samples(start_value: float, end_value: float, num_steps: int, start: int,
+                  count: int) -> np.ndarray:
+    """Samples start..start+count-1 of a num_steps long linear ramp"""
+    values = np.arange(start, start + count, dtype=np.float64)
+    values *= (end_value - start_value) / max(num_steps, 1)
+    values += start_value
+    return values
+
+
+def _sine_samples(amplitude: float, frequency: float, step_time: float, start: int,
+                  count: int) -> np.ndarray:
+    """Samples start..start+count-1 of a sine wave"""
+    values = _sin_series(2 * np.pi * frequency * step_time, count, start)
+    values *= amplitude
+    return values
+
+
+def _square_samples(low_value: float, high_value: float, frequency: float, step_time: float,
+                    start: int, count: int, dtype) -> np.ndarray:
+    """Samples start..start+count-1 of a square wave"""
+    period = 1.0 / frequency if frequency > 0 else 1.0
+    half_period = period / (2 * step_time)  # in samples
+    levels = np.array([high_value, low_value], dtype=dtype)
+    # Sample i lies in half period floor(i / half_period); even halves are high.
+    # The small offset keeps float noise from moving edges that fall on a sample.
+    if half_period < 2:
+        halves = np.arange(start, start + count) / half_period
+        halves += 1e-9
+        return levels.take(halves.astype(np.int64) & 1)
+    # Long half periods: repeat each level for its run of samples
+    first_half = int(start / half_period + 1e-9)
+    last_half = int((start + count) / half_period + 1e-9)
+    edges = np.ceil(np.arange(first_half + 1, last_half + 1) * half_period - 1e-9).astype(np.int64)
+    runs = np.diff(np.clip(edges, start, start + count), prepend=start, append=start + count)
+    return np.repeat(np.tile(levels, len(runs) // 2 + 1)[first_half % 2:][:len(runs)], runs)
+
+
+def _overshoot_curve(num_steps: int, overshoot_point: int, start: float, peak: float, final: float,
+                     rise_rate: float, settle_rate: float) -> np.ndarray:
+    """Exponential rise from start towards peak, then exponential decay from peak to final"""
+    values = np.empty(num_steps, dtype=np.float64)
+    rise = values[:overshoot_point]
+    if overshoot_point:
+        # start + (peak - start) * (1 - exp(-rate * t)) == peak - (peak - start) * exp(-rate * t)
+        rise[:] = _exp_series(-rise_rate / overshoot_point, overshoot_point)
+        rise *= start - peak
+        rise += peak
+    settle = values[overshoot_point:]
+    settle[:] = _exp_series(-settle_rate / max(num_steps - overshoot_point, 1), len(settle))
+    settle *= peak - final
+    settle += final
+    return values
+
+
+def _block_indices(num_steps: int):
+    """Split 0..num_steps-1 into block offsets and in-block steps: i = offset + step"""
+    block = min(num_steps, _SERIES_BLOCK)
+    return np.arange(-(-num_steps // block), dtype=np.float64) * block, np.arange(block, dtype=np.float64)
+
+
+def _sin_series(omega: float, num_steps: int, start: int = 0) -> np.ndarray:
+    """sin(omega * i) for i in range(start, start + num_steps)
+    
+    With sin(a + b) = sin(a)cos(b) + cos(a)sin(b) over block offsets a and
+    in-block steps b, only about 2 * sqrt(num_steps) sines are evaluated
+    and the rest is a single rank-2 matrix product.
+    """
+    if num_steps == 0:
+        return np.empty(0, dtype=np.float64)
+    offsets, steps = _block_indices(num_steps)
+    offsets += start
+    offsets *= omega
+    steps *= omega
+    products = (np.column_stack((np.sin(offsets), np.cos(offsets)))
+                @ np.vstack((np.cos(steps), np.sin(steps))))
+    return products.ravel()[:num_steps]
+
+
+def _exp_series(rate: float, num_steps: int) -> np.ndarray:
+    """exp(rate * i) for i in range(num_steps), as an outer product of block and step factors"""
+    if num_steps == 0:
+        return np.empty(0, dtype=np.float64)
+    offsets, steps = _block_indices(num_steps)
+    return np.multiply.outer(np.exp(offsets * rate), np.exp(steps * rate)).ravel()[:num_steps]
 
 
 class WaveformAnalyzer:
     """Analyzes waveforms and signals"""
     
     @staticmethod
-    def calculate_statistics(values: List[float]) -> Dict:
-        """Calculate statistics from signal values"""
-        if not values:
-            return {}
+    def calculate_statistics(values) -> Dict:
+        """Calculate statistics (incl. p50/p95/p99) from signal values in one pass
         
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        std_dev = math.sqrt(variance)
+        The percentiles are lower-rank quantiles within 1% of a sample value
+        (see QuantileSketch.quantile); an empty input gives {}. Feed an
+        OnlineStatistics directly to accumulate live readings or chunked
+        streams without keeping them.
+        """
+        stats = OnlineStatistics()
+        stats.update_many(values)
+        return stats.summary()
+    
+    @staticmethod
+    def detect_settling_time(values, final_value: float, tolerance: float = 0.05,
+                             sample_rate: float = 100.0, timestamps=None,
+                             initial_value: Optional[float] = None) -> Optional[float]:
+        """Detect settling time (time to reach final value ±tolerance and stay there)
         
-        return {
-            'mean': mean,
-            'min': min(values),
-            'max': max(values),
-            'std_dev': std_dev,
-            'range': max(values) - min(values),
-            'count': len(values)
-        }
+        The band is ±tolerance of the step size when initial_value is given,
+        as in analyze_step_response, and of the final value otherwise.
+        Returns None if the signal is outside the band at its last sample.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return None
+        times = _sample_times(len(values), sample_rate, timestamps)
+        settle_index = _settle_index(values, final_value,
+                                     _settling_band(initial_value, final_value, tolerance))
+        return None if settle_index is None else float(times[settle_index])
     
     @staticmethod
-    def detect_settling_time(values: List[float], final_value: float, tolerance: float = 0.05) -> float:
-        """Detect settling time (time to reach final value ±tolerance)"""
-        target_min = final_value * (1 - tolerance)
-        target_max = final_value * (1 + tolerance)
+    def analyze_step_response(values, sample_rate: float = 100.0, timestamps=None,
+                              initial_value: Optional[float] = None,
+                              final_value: Optional[float] = None, tolerance: float = 0.05,
+                              rise_limits: Tuple[float, float] = (0.1, 0.9)) -> Dict:
+        """Settling, rise and peak time, overshoot and undershoot of a step response
         
-        for i, value in enumerate(values):
-            if target_min <= value <= target_max:
-                # Check if it stays settled
-                remaining = values[i:]
-                settled = all(target_min <= v <= target_max for v in remaining[::len(remaining)//5])
-                if settled:
-                    return i * 0.01  # Assuming 10ms steps
+        Times are seconds from the first sample, taken from timestamps or
+        sample_rate. initial_value and final_value default to the first and
+        last samples. Settling uses a band of ±tolerance of the step size
+        (of the final value for a zero step), rise time the rise_limits
+        fractions of the step, and overshoot/undershoot are percent of the
+        step beyond the final value / against the step direction. Works for
+        falling steps too. Every metric is one vectorized pass, O(n).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return {}
+        times = _sample_times(len(values), sample_rate, timestamps)
+        initial = float(values[0]) if initial_value is None else initial_value
+        final = float(values[-1]) if final_value is None else final_value
+        step = final - initial
         
-        return None
+        settle_index = _settle_index(values, final, _settling_band(initial, final, tolerance))
+        result = {
+            'initial_value': initial,
+            'final_value': final,
+            'settling_time': None if settle_index is None else float(times[settle_index]),
+            'rise_time': None,
+            'peak_time': None,
+            'peak_value': None,
+            'overshoot_percent': 0.0,
+            'undershoot_percent': 0.0
+        }
+        if step == 0:
+            return result
+        
+        # Response normalized so the step goes from 0 to 1 whatever its sign
+        response = (values - initial) / step
+        peak_index = int(np.argmax(response))
+        result['peak_time'] = float(times[peak_index])
+        result['peak_value'] = float(values[peak_index])
+        result['overshoot_percent'] = max(0.0, (float(response[peak_index]) - 1) * 100)
+        result['undershoot_percent'] = max(0.0, -float(response.min()) * 100)
+        low_index = _first_index(response >= rise_limits[0])
+        high_index = _first_index(response >= rise_limits[1])
+        if low_index is not None and high_index is not None:
+            result['rise_time'] = float(times[high_index] - times[low_index])
+        return result
     
     @staticmethod
     def detect_overshoot(values: List[float], steady_state: float) -> float:
@@ -193,3 +409,43 @@ class WaveformAnalyzer:
         
         overshoot_percent = ((max_value - steady_state) / abs(steady_state)) * 100
         return max(0, overshoot_percent)
+
+
+def _sample_times(num_samples: int, sample_rate: float, timestamps=None) -> np.ndarray:
+    """Seconds since the first sample, from timestamps or a fixed sample rate"""
+    if timestamps is None:
+        return np.arange(num_samples, dtype=np.float64) / sample_rate
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if len(timestamps) != num_samples:
+        raise ValueError("timestamps and values must have the same length")
+    return timestamps - timestamps[0]
+
+
+def _settling_band(initial_value: Optional[float], final_value: float, tolerance: float) -> float:
+    """Half-width of the settling band around final_value
+    
+    tolerance of the step size, or of the final value when there is no
+    initial value or the step is zero.
+    """
+    step = 0.0 if initial_value is None else final_value - initial_value
+    return abs(step or final_value) * tolerance
+
+
+def _settle_index(values: np.ndarray, final_value: float, band: float) -> Optional[int]:
+    """Index from which every sample stays within final_value ± band, or None
+    
+    Scans backwards for the last sample outside the band.
+    """
+    outside = np.abs(values - final_value) > band
+    last_outside = len(values) - 1 - int(np.argmax(outside[::-1]))
+    if not outside[last_outside]:
+        return 0
+    if last_outside == len(values) - 1:
+        return None
+    return last_outside + 1
+
+
+def _first_index(mask: np.ndarray) -> Optional[int]:
+    """Index of the first True entry, or None"""
+    index = int(np.argmax(mask))
+    return index if mask[index] else None